@@ -38,7 +38,13 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # One transaction per revision: revisions with an autocommit block
+    # (CREATE INDEX CONCURRENTLY) then only commit their own work early
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        transaction_per_migration=True
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -60,6 +66,11 @@ async def run_async_migrations() -> None:
 
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
+    # A caller (tests, app.cli.check_schema) may hand us an open connection
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
     asyncio.run(run_async_migrations())
 
 
@@ -0,0 +1,148 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", UUID(as_uuid=True), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("password_hash", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_deleted_at", "users", ["deleted_at"])
+
+    op.create_table(
+        "alerts",
+        sa.Column("id", UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("token_symbol", sa.String(length=50), nullable=False),
+        sa.Column("token_address", sa.String(length=255), nullable=True),
+        sa.Column(
+            "alert_type",
+            sa.Enum("PRICE", "VOLUME", "HOLDER", "LIQUIDITY", name="alerttype"),
+            nullable=False,
+        ),
+        sa.Column(
+            "condition",
+            sa.Enum("ABOVE", "BELOW", "EQUALS", name="alertcondition"),
+            nullable=False,
+        ),
+        sa.Column("threshold_value", sa.Numeric(precision=20, scale=8), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("triggered_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_alerts_id", "alerts", ["id"])
+    op.create_index("ix_alerts_user_id", "alerts", ["user_id"])
+    op.create_index("ix_alerts_token_symbol", "alerts", ["token_symbol"])
+
+    op.create_table(
+        "watchlist",
+        sa.Column("id", UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("token_symbol", sa.String(length=50), nullable=False),
+        sa.Column("token_address", sa.String(length=255), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_watchlist_id", "watchlist", ["id"])
+    op.create_index("ix_watchlist_user_id", "watchlist", ["user_id"])
+    op.create_index("ix_watchlist_token_symbol", "watchlist", ["token_symbol"])
+
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("alert_id", UUID(as_uuid=True), nullable=True),
+        sa.Column("kind", sa.String(length=50), nullable=False),
+        sa.Column("dedupe_key", sa.String(length=255), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "IN_FLIGHT", "SENT", "FAILED", name="outboxstatus"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("claimed_at", sa.DateTime(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["alert_id"], ["alerts.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("dedupe_key"),
+    )
+    op.create_index("ix_notification_outbox_user_id", "notification_outbox", ["user_id"])
+    op.create_index(
+        "ix_notification_outbox_status_next_attempt",
+        "notification_outbox",
+        ["status", "next_attempt_at"],
+    )
+
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("active_alert_count", sa.Integer(), nullable=False),
+        sa.Column("watchlist_count", sa.Integer(), nullable=False),
+        sa.Column("trigger_buckets", sa.JSON(), nullable=False),
+        sa.Column("recent_triggers", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("id", UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("family_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("used_at", sa.DateTime(), nullable=True),
+        sa.Column("revoked_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_refresh_tokens_user_id", "refresh_tokens", ["user_id"])
+    op.create_index("ix_refresh_tokens_family_id", "refresh_tokens", ["family_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("refresh_tokens")
+    op.drop_table("user_stats")
+    op.drop_table("notification_outbox")
+    op.drop_table("watchlist")
+    op.drop_table("alerts")
+    op.drop_table("users")
+    sa.Enum(name="outboxstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="alertcondition").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="alerttype").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,101 @@
+"""hot path indexes
+
+Adds the functional unique index the watchlist model always meant to have,
+a partial index for evaluator loads of active alerts, and (user_id,
+created_at) composites for the listing endpoints. The single-column
+user_id indexes they supersede are dropped.
+
+On PostgreSQL every index is built and dropped CONCURRENTLY outside the
+migration transaction, so writes continue while it runs. A concurrent
+build that fails leaves an INVALID index behind; re-running the upgrade
+drops and rebuilds it.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _drop_invalid_index(name: str) -> None:
+    """Drop a leftover INVALID index from an interrupted concurrent build."""
+    if not _is_postgresql():
+        return
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
+def _create_index(name: str, table: str, columns: list, **kw) -> None:
+    _drop_invalid_index(name)
+    op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+
+def _drop_index(name: str, table: str) -> None:
+    op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    if _is_postgresql():
+        # Rows the unique index would reject (same user, symbol and address);
+        # keep the oldest of each group
+        op.execute(
+            """
+            DELETE FROM watchlist w
+            USING watchlist d
+            WHERE w.user_id = d.user_id
+              AND w.token_symbol = d.token_symbol
+              AND coalesce(w.token_address, '') = coalesce(d.token_address, '')
+              AND (w.created_at, w.id) > (d.created_at, d.id)
+            """
+        )
+
+    with op.get_context().autocommit_block():
+        _create_index(
+            "uq_watchlist_user_token",
+            "watchlist",
+            ["user_id", "token_symbol", sa.text("coalesce(token_address, '')")],
+            unique=True,
+        )
+        _create_index("ix_watchlist_user_created", "watchlist", ["user_id", "created_at"])
+        _create_index("ix_alerts_user_created", "alerts", ["user_id", "created_at"])
+        _create_index(
+            "ix_alerts_active_symbol_type",
+            "alerts",
+            ["token_symbol", "alert_type"],
+            postgresql_where=sa.text("is_active IS true"),
+            sqlite_where=sa.text("is_active = 1"),
+        )
+        _drop_index("ix_watchlist_user_id", "watchlist")
+        _drop_index("ix_alerts_user_id", "alerts")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        _create_index("ix_alerts_user_id", "alerts", ["user_id"])
+        _create_index("ix_watchlist_user_id", "watchlist", ["user_id"])
+        _drop_index("ix_alerts_active_symbol_type", "alerts")
+        _drop_index("ix_alerts_user_created", "alerts")
+        _drop_index("ix_watchlist_user_created", "watchlist")
+        _drop_index("uq_watchlist_user_token", "watchlist")
@@ -0,0 +1,75 @@
+"""alerts archive
+
+Adds the `alerts_archive` table that cold alerts are moved to, and a
+partial index on inactive alerts by age for finding them. The index on
+the existing `alerts` table is built CONCURRENTLY.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "alerts_archive",
+        sa.Column("id", UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("token_symbol", sa.String(length=50), nullable=False),
+        sa.Column("token_address", sa.String(length=255), nullable=True),
+        sa.Column(
+            "alert_type",
+            postgresql.ENUM("PRICE", "VOLUME", "HOLDER", "LIQUIDITY", name="alerttype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "condition",
+            postgresql.ENUM("ABOVE", "BELOW", "EQUALS", name="alertcondition", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("threshold_value", sa.Numeric(precision=20, scale=8), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("triggered_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_alerts_archive_user_created", "alerts_archive", ["user_id", "created_at"])
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_alerts_inactive_updated",
+            "alerts",
+            ["updated_at"],
+            postgresql_where=sa.text("is_active IS false"),
+            sqlite_where=sa.text("is_active = 0"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_alerts_inactive_updated",
+            table_name="alerts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_table("alerts_archive")
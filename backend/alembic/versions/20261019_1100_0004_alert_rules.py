@@ -0,0 +1,53 @@
+"""alert rules
+
+Adds the `alert_rules` table holding compound (AND/OR) alert rules.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "alert_rules",
+        sa.Column("id", UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=True),
+        sa.Column("token_symbol", sa.String(length=50), nullable=False),
+        sa.Column("token_address", sa.String(length=255), nullable=True),
+        sa.Column("expression", sa.JSON(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("triggered_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_alert_rules_active_symbol",
+        "alert_rules",
+        ["token_symbol"],
+        postgresql_where=sa.text("is_active IS true"),
+        sqlite_where=sa.text("is_active = 1"),
+    )
+    op.create_index("ix_alert_rules_user_created", "alert_rules", ["user_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_alert_rules_user_created", table_name="alert_rules")
+    op.drop_index("ix_alert_rules_active_symbol", table_name="alert_rules")
+    op.drop_table("alert_rules")
@@ -0,0 +1,39 @@
+"""moved condition
+
+Adds the `moved` alert condition (percent move within a window) and the
+`window_minutes` column it needs on `alerts` and `alerts_archive`.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # New enum values cannot be used in the transaction that adds them
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE alertcondition ADD VALUE IF NOT EXISTS 'MOVED'")
+
+    op.add_column("alerts", sa.Column("window_minutes", sa.Integer(), nullable=True))
+    op.add_column("alerts_archive", sa.Column("window_minutes", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop an enum value; `MOVED` stays in the type
+    op.execute("DELETE FROM alerts WHERE condition = 'MOVED'")
+    op.execute("DELETE FROM alerts_archive WHERE condition = 'MOVED'")
+    op.drop_column("alerts_archive", "window_minutes")
+    op.drop_column("alerts", "window_minutes")
@@ -0,0 +1,92 @@
+"""listing indexes
+
+Replaces the (user_id, created_at) listing indexes with covering ones for
+the filtered alert and watchlist listings: alerts by creation time with
+the filter columns trailing, by token symbol, and by trigger time
+(partial, triggered alerts only); the watchlist by creation time with the
+symbol for prefix filters.
+
+Built and dropped CONCURRENTLY on PostgreSQL, like 0002.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _drop_invalid_index(name: str) -> None:
+    """Drop a leftover INVALID index from an interrupted concurrent build."""
+    if not _is_postgresql():
+        return
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
+def _create_index(name: str, table: str, columns: list, **kw) -> None:
+    _drop_invalid_index(name)
+    op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+
+def _drop_index(name: str, table: str) -> None:
+    op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        _create_index(
+            "ix_alerts_user_created_filters",
+            "alerts",
+            ["user_id", "created_at", "alert_type", "condition", "is_active", "triggered_at"],
+        )
+        _create_index(
+            "ix_alerts_user_symbol_created",
+            "alerts",
+            ["user_id", "token_symbol", "created_at", "alert_type", "condition", "is_active", "triggered_at"],
+        )
+        _create_index(
+            "ix_alerts_user_triggered",
+            "alerts",
+            ["user_id", "triggered_at", "token_symbol", "alert_type", "condition", "is_active"],
+            postgresql_where=sa.text("triggered_at IS NOT NULL"),
+            sqlite_where=sa.text("triggered_at IS NOT NULL"),
+        )
+        _create_index(
+            "ix_watchlist_user_created_symbol",
+            "watchlist",
+            ["user_id", "created_at", "token_symbol"],
+        )
+        _drop_index("ix_alerts_user_created", "alerts")
+        _drop_index("ix_watchlist_user_created", "watchlist")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        _create_index("ix_watchlist_user_created", "watchlist", ["user_id", "created_at"])
+        _create_index("ix_alerts_user_created", "alerts", ["user_id", "created_at"])
+        _drop_index("ix_watchlist_user_created_symbol", "watchlist")
+        _drop_index("ix_alerts_user_triggered", "alerts")
+        _drop_index("ix_alerts_user_symbol_created", "alerts")
+        _drop_index("ix_alerts_user_created_filters", "alerts")
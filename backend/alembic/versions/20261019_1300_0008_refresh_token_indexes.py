@@ -0,0 +1,70 @@
+"""refresh token maintenance indexes
+
+Adds an index on `refresh_tokens.expires_at` for the expired-token purge
+and a partial index on `revoked_at` (revoked tokens only) for the
+per-worker revocation sync.
+
+Built and dropped CONCURRENTLY on PostgreSQL, like 0002.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _drop_invalid_index(name: str) -> None:
+    """Drop a leftover INVALID index from an interrupted concurrent build."""
+    if not _is_postgresql():
+        return
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
+def _create_index(name: str, table: str, columns: list, **kw) -> None:
+    _drop_invalid_index(name)
+    op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+
+def _drop_index(name: str, table: str) -> None:
+    op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        _create_index("ix_refresh_tokens_expires", "refresh_tokens", ["expires_at"])
+        _create_index(
+            "ix_refresh_tokens_revoked",
+            "refresh_tokens",
+            ["revoked_at"],
+            postgresql_where=sa.text("revoked_at IS NOT NULL"),
+            sqlite_where=sa.text("revoked_at IS NOT NULL"),
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        _drop_index("ix_refresh_tokens_revoked", "refresh_tokens")
+        _drop_index("ix_refresh_tokens_expires", "refresh_tokens")
@@ -1,73 +0,0 @@
-"""SupplyLens Backend - Main FastAPI Application."""
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from app.config import settings
-from app.routers import auth, alerts, watchlist
-
-# Initialize FastAPI app
-app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
-    description="Backend API for SupplyLens Android application"
-)
-
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router)
-app.include_router(alerts.router)
-app.include_router(watchlist.router)
-
-
-@app.get("/healthz")
-async def healthz():
-    """Health check endpoint."""
-    return {"status": "ok"}
-
-
-@app.get("/")
-async def root():
-    """Root endpoint."""
-    return {"ok": True}
-
-
-@app.get("/api/v1/version")
-async def version():
-    """Get API version and build info."""
-    return {
-        "version": settings.APP_VERSION,
-        "app_name": settings.APP_NAME,
-        "environment": settings.APP_ENV
-    }
-
-
-# Global exception handler
-@app.exception_handler(Exception)
-async def global_exception_handler(request: Request, exc: Exception):
-    """Handle unexpected exceptions."""
-    return JSONResponse(
-        status_code=500,
-        content={
-            "success": False,
-            "error": {
-                "code": "INTERNAL_SERVER_ERROR",
-                "message": "An unexpected error occurred"
-            }
-        }
-    )
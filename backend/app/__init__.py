@@ -1,2 +1,14 @@
 """SupplyLens Backend Application."""
 __version__ = "1.0.0"
+
+
+def __getattr__(name):
+    """Expose the FastAPI instance as `app.app` without importing it eagerly.
+
+    `uvicorn app:app` and `from app import app` resolve here; importing
+    submodules such as `app.config` does not pay for the whole API.
+    """
+    if name == "app":
+        from app.main import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,213 @@
+"""Check that every alert and watchlist listing stays on its index as data grows.
+
+Usage:
+    python -m app.cli.bench_listing [--database-url URL] [--sizes 1000,10000,100000] [--users 50] [--json]
+
+Seeds synthetic users, alerts and watchlist rows in steps up to each size,
+then runs the count and page query of every filter and sort combination
+for one user exactly as the listing endpoints build them, recording the
+plan and the time taken. A query that scans a whole table or index, or a
+count that is not answered from the index alone, is reported as a problem
+(exit code 1). Pages that sort are listed but allowed: that happens when a
+filter and the sort order favour different indexes and the planner sorts
+the user's narrower index range instead. Defaults to an in-memory SQLite
+database; point `--database-url` only at a scratch database, since the
+rows it inserts are left in place.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+# SQLite: "SEARCH alerts USING COVERING INDEX ix_..."; PostgreSQL: "Index Only Scan using ix_ on alerts"
+_INDEX = re.compile(r"(?:INDEX|using|Index Scan on) (\w+)")
+_FULL_SCAN = re.compile(r"Seq Scan|\bSCAN (?!CONSTANT)")  # SQLite SCAN walks a whole table or index
+_SORT = re.compile(r"Sort|USE TEMP B-TREE")
+_SYMBOLS = 200
+_PER_USER_WATCHLIST = 40
+
+
+@dataclass
+class PlanCheck:
+    """Plan and timing of one listing query."""
+    case: str
+    query: str
+    indexes: List[str]
+    index_only: bool
+    full_scan: bool
+    sort: bool
+    milliseconds: float
+    plan: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.indexes) and not self.full_scan and (self.index_only or self.query != "count")
+
+
+def classify(plan: List[str]) -> Tuple[List[str], bool, bool, bool]:
+    """(indexes used, index-only, full table scan, explicit sort) from EXPLAIN output."""
+    indexes = []
+    for line in plan:
+        indexes.extend(name for name in _INDEX.findall(line) if name not in indexes)
+    index_only = any("COVERING INDEX" in line or "Index Only Scan" in line for line in plan)
+    full_scan = any(_FULL_SCAN.search(line.strip()) for line in plan)
+    sort = any(_SORT.search(line) for line in plan)
+    return indexes, index_only, full_scan, sort
+
+
+def alert_cases() -> Iterator[Tuple[str, dict]]:
+    """Every combination of alert filters and sorts."""
+    from app.models.alert import AlertType, AlertCondition
+    options = {
+        "token_symbol": "T7",
+        "alert_type": AlertType.PRICE,
+        "condition": AlertCondition.ABOVE,
+        "is_active": True,
+        "triggered_since": datetime.utcnow() - timedelta(days=3),
+    }
+    for sort in ("-created_at", "created_at", "-triggered_at"):
+        for used in itertools.product((False, True), repeat=len(options)):
+            filters = {name: value for (name, value), on in zip(options.items(), used) if on}
+            label = ",".join(filters) or "no filter"
+            yield f"alerts[{label}] sort={sort}", {**filters, "sort": sort}
+
+
+def watchlist_cases() -> Iterator[Tuple[str, dict]]:
+    """Every combination of watchlist filters and sorts."""
+    for sort in ("-created_at", "created_at", "token_symbol"):
+        for prefix in (None, "T1"):
+            label = "symbol_prefix" if prefix else "no filter"
+            yield f"watchlist[{label}] sort={sort}", {"sort": sort, "symbol_prefix": prefix}
+
+
+async def seed(conn: AsyncConnection, users: List[uuid.UUID], alerts: int, rng: random.Random) -> None:
+    """Insert `alerts` alerts spread over `users` (and their watchlists on the first call)."""
+    from app.models.alert import Alert, AlertType, AlertCondition
+    from app.models.user import User
+    from app.models.watchlist import Watchlist
+
+    now = datetime.utcnow()
+    if not (await conn.execute(text("SELECT count(*) FROM watchlist"))).scalar():
+        await conn.execute(insert(User), [
+            {"id": user_id, "email": f"bench-{user_id}@example.com", "password_hash": "x",
+             "created_at": now, "updated_at": now}
+            for user_id in users
+        ])
+        await conn.execute(insert(Watchlist), [
+            {"id": uuid.uuid4(), "user_id": user_id, "token_symbol": f"T{i}",
+             "created_at": now - timedelta(minutes=rng.randint(0, 100000))}
+            for user_id in users for i in range(_PER_USER_WATCHLIST)
+        ])
+
+    types, conditions = list(AlertType), [c for c in AlertCondition if c != AlertCondition.MOVED]
+    for start in range(0, alerts, 5000):
+        rows = []
+        for _ in range(min(5000, alerts - start)):
+            created = now - timedelta(minutes=rng.randint(0, 500000))
+            triggered = created + timedelta(minutes=rng.randint(0, 1000)) if rng.random() < 0.2 else None
+            rows.append({
+                "id": uuid.uuid4(), "user_id": rng.choice(users),
+                "token_symbol": f"T{rng.randrange(_SYMBOLS)}",
+                "alert_type": rng.choice(types), "condition": rng.choice(conditions),
+                "threshold_value": rng.randint(1, 100000), "is_active": rng.random() < 0.7,
+                "triggered_at": triggered, "created_at": created, "updated_at": created,
+            })
+        await conn.execute(insert(Alert), rows)
+
+
+async def check_plans(conn: AsyncConnection, user_id: uuid.UUID) -> List[PlanCheck]:
+    """Run every listing query for one user, capturing its plan and time."""
+    from app.services.listing import alert_listing, watchlist_listing
+    from app.utils.slow_queries import _explain
+
+    plans: List[List[str]] = []
+
+    def _capture(sync_conn, cursor, statement, parameters, context, executemany):
+        plans.append(_explain(sync_conn, statement, parameters) or [])
+
+    checks = []
+    event.listen(conn.sync_engine, "after_cursor_execute", _capture)
+    try:
+        cases = [(name, alert_listing, params) for name, params in alert_cases()]
+        cases += [(name, watchlist_listing, params) for name, params in watchlist_cases()]
+        for name, build, params in cases:
+            for query, statement in zip(("count", "page"), build(user_id, page=1, per_page=20, **params)):
+                started = time.perf_counter()
+                await conn.execute(statement)
+                elapsed = (time.perf_counter() - started) * 1000
+                plan = plans.pop()
+                indexes, index_only, full_scan, sort = classify(plan)
+                checks.append(PlanCheck(name, query, indexes, index_only, full_scan, sort, round(elapsed, 3), plan))
+    finally:
+        event.remove(conn.sync_engine, "after_cursor_execute", _capture)
+    return checks
+
+
+async def run(database_url: str, sizes: List[int], users: int, seed_value: int = 1) -> Dict[int, List[PlanCheck]]:
+    """Seed up to each size in turn and check every listing plan; results per size."""
+    import app.models  # noqa: F401 - register every table on the metadata
+    from app.database import Base
+
+    kwargs = {"poolclass": StaticPool} if database_url.startswith("sqlite") else {}
+    engine = create_async_engine(database_url, **kwargs)
+    rng = random.Random(seed_value)
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    report: Dict[int, List[PlanCheck]] = {}
+    seeded = 0
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        for size in sorted(sizes):
+            async with engine.begin() as conn:
+                await seed(conn, user_ids, size - seeded, rng)
+            seeded = size
+            async with engine.connect() as conn:
+                await conn.execute(text("ANALYZE"))
+                await conn.commit()
+                report[size] = await check_plans(conn, user_ids[0])
+    finally:
+        await engine.dispose()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite://", help="scratch database (default in-memory SQLite)")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="alert counts to grow the table to")
+    parser.add_argument("--users", type=int, default=50, help="users the rows are spread over")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = asyncio.run(run(args.database_url, sizes, args.users))
+    problems = [(size, check) for size, checks in report.items() for check in checks if not check.ok]
+
+    if args.json:
+        print(json.dumps({size: [asdict(check) for check in checks] for size, checks in report.items()}, indent=2))
+        return 1 if problems else 0
+
+    for size, checks in report.items():
+        print(f"\n{size} alerts, {len(checks)} queries")
+        for check in checks:
+            flags = "PROBLEM" if not check.ok else ("index-only" if check.index_only else "index")
+            if check.sort:
+                flags += "+sort"
+            print(f"  {check.milliseconds:8.2f} ms  {flags:<15}  {check.query:<5}  {check.case}  [{', '.join(check.indexes)}]")
+    for size, check in problems:
+        print(f"\nproblem at {size}: {check.case} ({check.query})\n    " + "\n    ".join(check.plan))
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Check that the database schema matches the ORM models.
+
+Usage:
+    python -m app.cli.check_schema [--database-url URL]
+
+Fails (exit code 1) when the database is not at the latest Alembic
+revision or when autogenerate finds differences between the migrated
+schema and `Base.metadata`, i.e. a model change without a migration or
+a migration the models do not reflect. Run it in CI after
+`alembic upgrade head`.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import List, Tuple
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def alembic_config() -> Config:
+    """Alembic config usable from any working directory."""
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return config
+
+
+def compare_schema(connection: Connection) -> Tuple[List[str], List[tuple]]:
+    """Return (missing revisions, schema differences) for a connection."""
+    import app.models  # noqa: F401 - register every table on the metadata
+    from app.database import Base
+
+    context = MigrationContext.configure(connection, opts={"compare_type": True})
+    heads = set(ScriptDirectory.from_config(alembic_config()).get_heads())
+    missing = sorted(heads - set(context.get_current_heads()))
+    return missing, compare_metadata(context, Base.metadata)
+
+
+async def check(database_url: str) -> Tuple[List[str], List[tuple]]:
+    """Compare the schema of the database at `database_url`."""
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    try:
+        async with engine.connect() as connection:
+            return await connection.run_sync(compare_schema)
+    finally:
+        await engine.dispose()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        from app.config import settings
+        database_url = settings.DATABASE_URL
+
+    missing, diffs = asyncio.run(check(database_url))
+    for revision in missing:
+        print(f"not applied: revision {revision}")
+    for diff in diffs:
+        print(f"schema differs: {diff}")
+    if missing or diffs:
+        return 1
+    print("schema matches models")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
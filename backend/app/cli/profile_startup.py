@@ -0,0 +1,135 @@
+"""Report where API cold-start time goes.
+
+Usage:
+    python -m app.cli.profile_startup [--top 20] [--no-lifespan] [--json]
+
+Import time is measured in a fresh interpreter with `-X importtime`, so
+the numbers match what a new container pays. Init time is measured
+in-process by running the app lifespan (warmup steps and background
+workers) once.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+@dataclass
+class ImportRecord:
+    """One line of `-X importtime` output (times in microseconds)."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse `python -X importtime` stderr into records."""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        self_us, cumulative_us, name = fields
+        records.append(ImportRecord(
+            module=name.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=(len(name) - len(name.lstrip()) - 1) // 2
+        ))
+    return records
+
+
+def summarize_imports(records: List[ImportRecord], top: int) -> Dict[str, object]:
+    """Group import cost by top-level package and list the slowest modules."""
+    by_package: Dict[str, int] = defaultdict(int)
+    for record in records:
+        by_package[record.module.split(".")[0]] += record.self_us
+
+    total_us = sum(record.self_us for record in records)
+    slowest = sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]
+    return {
+        "total_seconds": round(total_us / 1e6, 4),
+        "by_package": {
+            name: round(us / 1e6, 4)
+            for name, us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        },
+        "slowest_modules": [
+            {"module": r.module, "cumulative_seconds": round(r.cumulative_us / 1e6, 4)}
+            for r in slowest
+        ],
+    }
+
+
+def measure_imports(target: str = "app.main") -> List[ImportRecord]:
+    """Import `target` in a fresh interpreter and parse its import timings."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy()
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {target} failed:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+async def measure_init(run_lifespan: bool = True) -> Dict[str, object]:
+    """Import the app in-process and optionally run its lifespan once."""
+    started = time.perf_counter()
+    from app.main import app
+    report: Dict[str, object] = {"import_app_seconds": round(time.perf_counter() - started, 4)}
+
+    if run_lifespan:
+        started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            report["lifespan_startup_seconds"] = round(time.perf_counter() - started, 4)
+            report["warmup_steps"] = getattr(app.state, "startup_report", {})
+    return report
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=20, help="rows to show per section")
+    parser.add_argument("--no-lifespan", action="store_true", help="skip running warmup/lifespan (no DB needed)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = {
+        "imports": summarize_imports(measure_imports(), args.top),
+        "init": asyncio.run(measure_init(run_lifespan=not args.no_lifespan)),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    imports = report["imports"]
+    print(f"Import time (fresh interpreter): {imports['total_seconds']:.3f}s")
+    print("\nBy package (self time):")
+    for name, seconds in imports["by_package"].items():
+        print(f"  {seconds * 1000:9.1f} ms  {name}")
+    print("\nSlowest modules (cumulative):")
+    for row in imports["slowest_modules"]:
+        print(f"  {row['cumulative_seconds'] * 1000:9.1f} ms  {row['module']}")
+
+    init = report["init"]
+    print(f"\nIn-process `import app.main`: {init['import_app_seconds'] * 1000:.1f} ms")
+    if "lifespan_startup_seconds" in init:
+        print(f"Lifespan startup: {init['lifespan_startup_seconds'] * 1000:.1f} ms")
+        for name, step in init["warmup_steps"].items():
+            status = "ok" if step["ok"] else f"FAILED ({step['error']})"
+            print(f"  {step['seconds'] * 1000:9.1f} ms  {name}  {status}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
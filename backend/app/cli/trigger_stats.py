@@ -0,0 +1,94 @@
+"""Aggregate alert trigger statistics across all alerts and the archive.
+
+Usage:
+    python -m app.cli.trigger_stats [--database-url URL] [--output trigger-stats.json.gz]
+                                    [--workers 4] [--chunks 64] [--min-alerts 10]
+
+Splits `alerts` and `alerts_archive` into primary-key ranges and
+aggregates each range in a process pool; every worker streams its range
+through a server-side cursor into a mergeable partial (counts and
+quantile sketches), and the partials are merged as they finish. Memory
+stays at a few partials however many rows there are. Writes per-token
+and per-type trigger rates, time-to-trigger quantiles and the densest
+threshold bands per token, type and condition as JSON (gzipped when the
+output ends in `.gz`). Reads only; run it against a replica where one
+exists. Alerts archived while it runs may be counted twice or missed.
+"""
+import argparse
+import gzip
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from app.services.trigger_stats import TriggerStats
+
+TABLES = ("alerts", "alerts_archive")
+
+
+def run(database_url: str, workers: int, chunks: int, partition_size: int = 10000) -> "TriggerStats":
+    """Aggregate every key range of every table; `workers=0` runs them in this process."""
+    from app.services.trigger_stats import TriggerStats, aggregate_range, key_ranges
+
+    tasks = [(database_url, table, low, high, partition_size) for table in TABLES for low, high in key_ranges(chunks)]
+    stats = TriggerStats()
+    if workers == 0:
+        for task in tasks:
+            stats.merge(aggregate_range(*task))
+        return stats
+
+    # Spawned workers open their own connections; nothing is inherited from this process
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for future in as_completed([pool.submit(aggregate_range, *task) for task in tasks]):
+            stats.merge(future.result())
+    return stats
+
+
+def write_results(path: str, report: Dict[str, Any]) -> None:
+    """Write the report as compact JSON, gzipped for a `.gz` path."""
+    data = json.dumps(report, separators=(",", ":")).encode()
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wb") as output:
+        output.write(data)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="database to read (default DATABASE_URL)")
+    parser.add_argument("--output", default="trigger-stats.json.gz", help="results file")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="worker processes (0 = inline)")
+    parser.add_argument("--chunks", type=int, default=64, help="key ranges per table")
+    parser.add_argument("--partition-size", type=int, default=10000, help="rows fetched per round trip")
+    parser.add_argument("--min-alerts", type=int, default=10, help="smallest group given threshold clusters")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url
+    if database_url is None:
+        from app.config import settings
+        database_url = settings.DATABASE_URL
+    if database_url.startswith("sqlite") and (":memory:" in database_url or database_url.endswith("://")):
+        parser.error("an in-memory database cannot be shared with worker processes")
+
+    started = time.perf_counter()
+    stats = run(database_url, args.workers, args.chunks, args.partition_size)
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "tables": list(TABLES),
+        "chunks": args.chunks,
+        "seconds": round(elapsed, 3),
+        **stats.summary(min_alerts=args.min_alerts),
+    }
+    write_results(args.output, report)
+    print(f"{stats.rows} alerts aggregated in {elapsed:.1f}s -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 """Application configuration using Pydantic Settings."""
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -13,6 +13,16 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    SQL_COUNT_STATEMENTS: Optional[bool] = None  # None = on when APP_ENV is "dev"
+    SLOW_QUERY_LOG_ENABLED: bool = True  # per-fingerprint timings, see /api/v1/admin/slow-queries
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 500
+    SLOW_QUERY_CAPTURE_PLANS: bool = False  # EXPLAIN the slowest sample of each fingerprint
     
     # JWT
     JWT_SECRET_KEY: str
@@ -29,7 +39,104 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_AUTH_PER_15MIN: int = 5
-    
+
+    # Load shedding (adaptive concurrency limit per worker)
+    LOAD_SHEDDING_ENABLED: bool = True
+    LOAD_SHEDDING_INITIAL_LIMIT: int = 20
+    LOAD_SHEDDING_MIN_LIMIT: int = 4
+    LOAD_SHEDDING_MAX_LIMIT: int = 200
+    LOAD_SHEDDING_RETRY_AFTER_SECONDS: int = 1
+
+    # Idempotency keys (create/update endpoints)
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # how long a key's response is replayed
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # an unfinished request holds its key this long
+    IDEMPOTENCY_CACHE_MAX_ENTRIES: int = 10000  # per-worker replay cache
+
+    # Response encoding
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024  # gzip bodies at least this large
+    RESPONSE_COMPRESSION_LEVEL: int = 6
+
+    # Market data
+    MARKET_DATA_PROVIDER: str = "fake"  # "http" for a real upstream
+    MARKET_DATA_BASE_URL: str = ""
+    MARKET_DATA_API_KEY: str = ""
+    MARKET_DATA_TIMEOUT_SECONDS: float = 5.0
+    MARKET_DATA_MAX_CONNECTIONS: int = 20
+    MARKET_DATA_BATCH_SIZE: int = 100
+    QUOTE_TTL_SECONDS: float = 15.0  # served without revalidation
+    QUOTE_MAX_AGE_SECONDS: float = 60.0  # older cached quotes are not served
+    QUOTE_CACHE_MAX_SYMBOLS: int = 10000
+
+    # Live prices (WebSocket subscriptions)
+    LIVE_PRICES_ENABLED: bool = True
+    LIVE_PRICES_INTERVAL_SECONDS: float = 2.0  # quote cache poll; upstream only after QUOTE_TTL_SECONDS
+    LIVE_PRICES_MAX_SUBSCRIPTIONS: int = 100  # symbols per connection
+    LIVE_PRICES_SEND_TIMEOUT_SECONDS: float = 10.0  # a client not reading for this long is dropped
+    LIVE_PRICES_MAX_CONTROL_MESSAGES: int = 32  # unread acknowledgements before a client is dropped
+
+    # Backtesting
+    BACKTEST_SERIES_DIR: str = "data/series"  # <SYMBOL>.npz historical series
+    BACKTEST_MAX_POINTS: int = 600000  # a year of minute data fits
+    BACKTEST_MAX_ALERTS: int = 200  # of the user's alerts replayed per request
+    BACKTEST_CACHE_MAX_SERIES: int = 16  # stored series kept in memory per worker
+
+    # Archival
+    ALERT_ARCHIVE_TRIGGERED_AFTER_DAYS: int = 7
+    ALERT_ARCHIVE_INACTIVE_AFTER_DAYS: int = 30
+    ALERT_ARCHIVE_BATCH_SIZE: int = 500
+    ALERT_ARCHIVE_MAX_BATCHES: int = 100  # per run; the next run continues
+
+    # Account deletion
+    ACCOUNT_PURGE_BATCH_SIZE: int = 1000
+
+    # Account export
+    EXPORT_CHUNK_SIZE: int = 500  # rows read per pooled connection checkout
+
+    # Trending tokens
+    POPULARITY_TOP_K_MAX: int = 100  # longest trending list served
+
+    # Scheduler
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LEADER_LOCK: str = "auto"  # postgres | file | none; auto picks by DATABASE_URL
+    SCHEDULER_LOCK_KEY: int = 73402131  # pg advisory lock key
+    SCHEDULER_LOCK_FILE: str = "/tmp/supplylens-scheduler.lock"
+    SCHEDULER_JITTER_SECONDS: float = 5.0
+    MARKET_EVALUATION_INTERVAL_SECONDS: float = 30.0
+    ACCOUNT_PURGE_INTERVAL_SECONDS: float = 300.0
+    POPULARITY_RECONCILE_INTERVAL_SECONDS: float = 300.0
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: float = 3600.0
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 10.0  # how long other workers may accept a revoked login
+    TOKEN_PURGE_INTERVAL_SECONDS: float = 3600.0
+    ALERT_ARCHIVE_CRON: str = "15 3 * * *"
+    USER_STATS_RECONCILE_CRON: str = "45 3 * * *"
+
+    # Startup
+    WARMUP_ENABLED: bool = True
+    WARMUP_POOL_CONNECTIONS: int = 5
+    WARMUP_STEP_TIMEOUT_SECONDS: float = 5.0
+
+    # Admin
+    ADMIN_API_KEY: str = ""  # Empty disables admin endpoints
+
+    # Sampling profiler (off unless a rate or routes are set)
+    PROFILER_SAMPLE_RATE: float = 0.0  # fraction of requests profiled
+    PROFILER_ROUTES: List[str] = []  # route templates, e.g. "/api/v1/alerts"
+    PROFILER_INTERVAL_MS: float = 5.0
+    PROFILER_MAX_STACKS_PER_ROUTE: int = 5000
+
+    # Notifications
+    PUSH_PROVIDER: str = "log"
+    NOTIFICATIONS_ENABLED: bool = True
+    NOTIFICATION_WORKERS: int = 2
+    NOTIFICATION_BATCH_SIZE: int = 100
+    NOTIFICATION_SEND_TIMEOUT_SECONDS: float = 10.0
+    NOTIFICATION_MAX_ATTEMPTS: int = 8
+    NOTIFICATION_RETRY_BASE_SECONDS: float = 2.0
+    NOTIFICATION_RETRY_MAX_SECONDS: float = 600.0
+    NOTIFICATION_POLL_INTERVAL_SECONDS: float = 1.0
+    NOTIFICATION_LEASE_SECONDS: int = 120
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,16 +1,87 @@
 """Database configuration and session management."""
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
+from app.utils.metrics import metrics
+from app.utils.query_counter import install_query_counter
+from app.utils.slow_queries import install_slow_query_log
+
+# Pool metrics
+_pool_wait = metrics.histogram("db_pool_wait_seconds")
+_pool_checkout = metrics.histogram("db_pool_checkout_seconds")
+_pool_timeouts = metrics.counter("db_pool_timeouts_total")
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection.
+
+    The measured wait covers the whole checkout: queueing for a free
+    connection, opening an overflow connection and the pre-ping.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            _pool_timeouts.inc()
+            raise
+        finally:
+            _pool_wait.observe(time.perf_counter() - started)
+
+
+def engine_options(url: str) -> dict:
+    """Engine keyword arguments for a database URL.
+
+    SQLite (used for tests and local runs) gets SQLAlchemy's default pool;
+    everything else gets the configured, instrumented queue pool.
+    """
+    options = {"echo": settings.APP_ENV == "dev"}
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS
+    )
+    return options
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """Record checkout durations and expose pool occupancy gauges."""
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            _pool_checkout.observe(time.perf_counter() - started)
+
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        capacity = max(1, pool.size() + max(0, pool._max_overflow))
+        metrics.gauge("db_pool_size", func=pool.size)
+        metrics.gauge("db_pool_checked_out", func=pool.checkedout)
+        metrics.gauge("db_pool_saturation", func=lambda: pool.checkedout() / capacity)
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.APP_ENV == "dev",
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+instrument_pool(engine)
+install_query_counter(engine)
+if settings.SLOW_QUERY_LOG_ENABLED:
+    install_slow_query_log(engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -25,13 +96,49 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_writes(session):
+    session.info.pop("has_writes", None)
+
+
+def session_has_writes(session: AsyncSession) -> bool:
+    """Whether the session holds uncommitted changes (pending or flushed)."""
+    return bool(
+        session.new or session.dirty or session.deleted
+        or session.sync_session.info.get("has_writes")
+    )
+
+
+def get_session_factory() -> async_sessionmaker:
+    """Get the session factory for work that outlives the request session."""
+    return AsyncSessionLocal
+
+
 # Dependency for FastAPI
 async def get_db():
-    """Get database session."""
+    """Get database session.
+
+    The session checks out a pooled connection only when the handler first
+    executes a statement, and commits only if something was written; read-only
+    requests just return the connection to the pool.
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            if session_has_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -0,0 +1,174 @@
+"""SupplyLens Backend - Main FastAPI Application."""
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.util import get_remote_address
+from slowapi.errors import RateLimitExceeded
+from app.config import settings
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.load_shedding import LoadSheddingMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.query_budget import QueryCountMiddleware
+from app.middleware.slow_queries import StatementRouteMiddleware
+from app.routers import auth, alerts, alert_rules, watchlist, dashboard, tokens, prices, admin
+from app.utils.metrics import metrics
+from app.utils.wire_format import NegotiatedResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the worker, then start and stop background workers and jobs."""
+    started = time.perf_counter()
+    app.state.ready = False
+
+    app.state.startup_report = {}
+    if settings.WARMUP_ENABLED:
+        from app.services.warmup import run_warmup
+        app.state.startup_report = await run_warmup(app)
+
+    dispatcher = None
+    if settings.NOTIFICATIONS_ENABLED:
+        from app.services.notifications import NotificationDispatcher, get_push_provider
+        dispatcher = NotificationDispatcher(get_push_provider())
+        await dispatcher.start()
+    app.state.notification_dispatcher = dispatcher
+
+    hub = None
+    if settings.LIVE_PRICES_ENABLED:
+        from app.services.live_prices import price_hub
+        from app.services.market_data import get_market_data_client
+        hub = price_hub
+        await hub.start(get_market_data_client())
+
+    scheduler = None
+    if settings.SCHEDULER_ENABLED:
+        from app.services.scheduler import Scheduler, get_leader_lock
+        from app.services import jobs  # noqa: F401 - registers the jobs
+        scheduler = Scheduler(leader=get_leader_lock())
+        await scheduler.start()
+    app.state.scheduler = scheduler
+
+    metrics.gauge("startup_seconds").set(time.perf_counter() - started)
+    app.state.ready = True
+
+    yield
+
+    app.state.ready = False
+
+    if scheduler is not None:
+        await scheduler.stop()
+
+    if dispatcher is not None:
+        await dispatcher.stop()
+
+    if hub is not None:
+        await hub.stop()
+
+    from app.services.market_data import close_market_data_client
+    await close_market_data_client()
+
+
+# Initialize FastAPI app
+app = FastAPI(
+    title=settings.APP_NAME,
+    version=settings.APP_VERSION,
+    description="Backend API for SupplyLens Android application",
+    default_response_class=NegotiatedResponse,
+    lifespan=lifespan
+)
+
+# Initialize rate limiter
+limiter = Limiter(key_func=get_remote_address)
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.ALLOWED_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# SQL statement counting (debug mode / tests)
+app.add_middleware(QueryCountMiddleware)
+
+# Route attribution for the slow-query log
+app.add_middleware(StatementRouteMiddleware)
+
+# Replay retried create/update requests sent with an Idempotency-Key
+app.add_middleware(IdempotencyMiddleware)
+
+# Compress large responses for clients sending Accept-Encoding: gzip
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+    compresslevel=settings.RESPONSE_COMPRESSION_LEVEL,
+)
+
+# Sampling profiler for selected requests (admin toggle, header or sample rate)
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost: shed excess load before any other work is done
+app.add_middleware(LoadSheddingMiddleware)
+
+# Include routers
+app.include_router(auth.router)
+app.include_router(alerts.router)
+app.include_router(alert_rules.router)
+app.include_router(watchlist.router)
+app.include_router(dashboard.router)
+app.include_router(tokens.router)
+app.include_router(prices.router)
+app.include_router(admin.router)
+
+
+@app.get("/healthz")
+async def healthz():
+    """Health check endpoint."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz(request: Request):
+    """Readiness check: 503 until startup warmup has finished."""
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
+
+
+@app.get("/")
+async def root():
+    """Root endpoint."""
+    return {"ok": True}
+
+
+@app.get("/api/v1/version")
+async def version():
+    """Get API version and build info."""
+    return {
+        "version": settings.APP_VERSION,
+        "app_name": settings.APP_NAME,
+        "environment": settings.APP_ENV
+    }
+
+
+# Global exception handler
+@app.exception_handler(Exception)
+async def global_exception_handler(request: Request, exc: Exception):
+    """Handle unexpected exceptions."""
+    return JSONResponse(
+        status_code=500,
+        content={
+            "success": False,
+            "error": {
+                "code": "INTERNAL_SERVER_ERROR",
+                "message": "An unexpected error occurred"
+            }
+        }
+    )
@@ -0,0 +1,166 @@
+"""`Idempotency-Key` handling for create and update requests."""
+import json
+from typing import List, Optional
+from uuid import UUID
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.database import get_session_factory
+from app.services.idempotency import (
+    ClaimOutcome, StoredResponse, claim_key, complete_key, release_key, request_hash, response_cache
+)
+from app.utils.metrics import metrics
+
+_METHODS = {"POST", "PUT", "PATCH"}
+# Auth and admin endpoints are not per-user resources
+_EXCLUDED_PREFIXES = ("/api/v1/auth/", "/api/v1/admin/")
+MAX_KEY_LENGTH = 255
+
+_ERRORS = {
+    "IDEMPOTENCY_KEY_INVALID": (400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"),
+    "IDEMPOTENCY_KEY_IN_USE": (409, "A request with this Idempotency-Key is still being processed"),
+    "IDEMPOTENCY_KEY_REUSED": (422, "This Idempotency-Key was already used for a different request"),
+}
+
+
+def _authenticated_user(authorization: Optional[str]) -> Optional[UUID]:
+    """User id of a valid access token, or None (the endpoint then answers 401)."""
+    from app.services.security import verify_access_token
+
+    verified = verify_access_token(authorization)
+    return verified[0] if verified is not None else None
+
+
+async def _send_bytes(send: Send, status: int, content_type: Optional[str], body: bytes, headers=()) -> None:
+    raw_headers = [(b"content-length", str(len(body)).encode()), *headers]
+    if content_type:
+        raw_headers.append((b"content-type", content_type.encode()))
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_error(send: Send, code: str) -> None:
+    status, message = _ERRORS[code]
+    body = json.dumps({"success": False, "error": {"code": code, "message": message}}).encode()
+    headers = [(b"retry-after", b"1")] if status == 409 else []
+    await _send_bytes(send, status, "application/json", body, headers)
+
+
+async def _replay(send: Send, stored: StoredResponse) -> None:
+    metrics.counter("idempotency_replays_total").inc()
+    await _send_bytes(
+        send, stored.status_code, stored.content_type, stored.body, [(b"idempotent-replayed", b"true")]
+    )
+
+
+class IdempotencyMiddleware:
+    """Run each create/update request with a given `Idempotency-Key` at most once.
+
+    Keys are scoped to the authenticated user. The first request claims the
+    key in `idempotency_keys`; its response is stored before the last body
+    chunk reaches the client, so a retry sent after seeing any response
+    replays it byte for byte (with `Idempotent-Replayed: true`). A retry
+    while the first request still runs gets 409, reusing a key for another
+    request 422. Responses with a 4xx/5xx status (bad input, rate limits,
+    crashes) are not stored and leave the key free for a corrected retry;
+    business errors use 200 with `success: false` and are stored.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.IDEMPOTENCY_ENABLED
+            or scope["method"] not in _METHODS
+            or scope["path"].startswith(_EXCLUDED_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(key) <= MAX_KEY_LENGTH:
+            await _send_error(send, "IDEMPOTENCY_KEY_INVALID")
+            return
+        user_id = _authenticated_user(headers.get("authorization"))
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Buffer the body to fingerprint it, then hand it on unchanged
+        chunks: List[bytes] = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+        digest = request_hash(scope["method"], scope["path"], scope.get("query_string", b""), body)
+
+        stored = response_cache.get((user_id, key))
+        if stored is not None:
+            if stored.request_hash != digest:
+                await _send_error(send, "IDEMPOTENCY_KEY_REUSED")
+            else:
+                await _replay(send, stored)
+            return
+
+        # Honour dependency overrides, so tests can point this at their database
+        app = scope.get("app")
+        overrides = getattr(app, "dependency_overrides", {})
+        session_factory = overrides.get(get_session_factory, get_session_factory)()
+
+        outcome, stored = await claim_key(session_factory, user_id, key, digest)
+        if outcome is ClaimOutcome.REPLAY:
+            response_cache.put((user_id, key), stored)
+            await _replay(send, stored)
+            return
+        if outcome is ClaimOutcome.IN_PROGRESS:
+            await _send_error(send, "IDEMPOTENCY_KEY_IN_USE")
+            return
+        if outcome is ClaimOutcome.MISMATCH:
+            await _send_error(send, "IDEMPOTENCY_KEY_REUSED")
+            return
+
+        await self._run(scope, receive, send, body, session_factory, user_id, key, digest)
+
+    async def _run(self, scope, receive, send, body, session_factory, user_id, key, digest) -> None:
+        sent_body = False
+
+        async def receive_body() -> Message:
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status = 500
+        content_type = None
+        response_chunks: List[bytes] = []
+        completed = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, content_type, completed
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                content_type = Headers(raw=message.get("headers", [])).get("content-type")
+            elif message["type"] == "http.response.body":
+                response_chunks.append(message.get("body", b""))
+                if not message.get("more_body", False) and status < 400:
+                    stored = StoredResponse(digest, status, content_type, b"".join(response_chunks))
+                    await complete_key(session_factory, user_id, key, stored)
+                    completed = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_wrapper)
+        finally:
+            if not completed:
+                await release_key(session_factory, user_id, key)
@@ -0,0 +1,217 @@
+"""Adaptive concurrency limiting and priority load shedding."""
+import enum
+import json
+import math
+import time
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.utils.metrics import metrics
+
+
+class Priority(enum.IntEnum):
+    """Admission priority of a request; higher values are shed last."""
+    LOW = 0  # expensive auth writes (bcrypt)
+    NORMAL = 1  # other writes
+    HIGH = 2  # reads and token refresh
+    CRITICAL = 3  # health checks, never limited
+
+
+_CRITICAL_PATHS = {"/healthz", "/readyz"}
+_EXPENSIVE_AUTH = {
+    ("POST", "/api/v1/auth/register"),
+    ("POST", "/api/v1/auth/login"),
+    ("DELETE", "/api/v1/auth/me"),
+}
+_HIGH_PRIORITY = {
+    ("POST", "/api/v1/auth/refresh"),
+    ("POST", "/api/v1/auth/logout"),
+}
+
+
+def classify(method: str, path: str) -> Priority:
+    """Priority of a request from its method and path."""
+    if path in _CRITICAL_PATHS:
+        return Priority.CRITICAL
+    if (method, path) in _EXPENSIVE_AUTH:
+        return Priority.LOW
+    if method in ("GET", "HEAD", "OPTIONS") or (method, path) in _HIGH_PRIORITY:
+        return Priority.HIGH
+    if path.startswith("/api/v1/admin"):
+        return Priority.HIGH
+    return Priority.NORMAL
+
+
+class AdaptiveLimiter:
+    """Gradient concurrency limit driven by observed request latency.
+
+    Two moving averages of latency are kept: a short one reacting within a
+    few requests and a long one approximating the no-load latency. While
+    the short average stays within `tolerance` of the long one the limit
+    grows by roughly its square root per update (probing for headroom);
+    once requests start queueing behind the DB pool or bcrypt the short
+    average rises and the limit shrinks in proportion. Failed or timed-out
+    requests cut the limit multiplicatively.
+
+    Lower priorities may only use part of the limit, so under pressure
+    expensive auth writes are rejected first, then other writes, while
+    reads and token refresh keep being admitted.
+    """
+
+    # Share of the limit each priority may fill
+    SHARES = {Priority.LOW: 0.5, Priority.NORMAL: 0.8, Priority.HIGH: 1.0}
+
+    def __init__(
+        self,
+        initial_limit: Optional[int] = None,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        *,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        backoff_ratio: float = 0.9,
+        short_window: int = 10,
+        long_window: int = 500
+    ):
+        self.min_limit = min_limit or settings.LOAD_SHEDDING_MIN_LIMIT
+        self.max_limit = max_limit or settings.LOAD_SHEDDING_MAX_LIMIT
+        self.limit = float(initial_limit or settings.LOAD_SHEDDING_INITIAL_LIMIT)
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.backoff_ratio = backoff_ratio
+        self._short_alpha = 2.0 / (short_window + 1)
+        self._long_alpha = 2.0 / (long_window + 1)
+        self.short_latency = 0.0
+        self.long_latency = 0.0
+        self.inflight = 0
+
+    def try_acquire(self, priority: Priority) -> bool:
+        """Admit a request if its priority's share of the limit has room."""
+        if priority is Priority.CRITICAL:
+            return True
+        if self.inflight >= max(1, int(self.limit * self.SHARES[priority])):
+            return False
+        self.inflight += 1
+        return True
+
+    def release(self, latency: Optional[float], failed: bool = False) -> None:
+        """Record a finished request and adapt the limit.
+
+        A `latency` of None frees the slot without a latency sample.
+        """
+        inflight = self.inflight
+        self.inflight -= 1
+        if failed:
+            self._set_limit(self.limit * self.backoff_ratio)
+            return
+        if latency is None:
+            return
+
+        if self.long_latency == 0.0:
+            self.short_latency = self.long_latency = latency
+            return
+        self.short_latency += self._short_alpha * (latency - self.short_latency)
+        self.long_latency += self._long_alpha * (latency - self.long_latency)
+        if self.long_latency > 2 * self.short_latency:
+            # Latency fell for good (e.g. after an incident); forget the old baseline
+            self.long_latency = 2 * self.short_latency
+
+        if inflight < self.limit / 2:
+            return  # not using the limit, so latency says nothing about it
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_latency / max(self.short_latency, 1e-9)))
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self._set_limit(self.limit * (1 - self.smoothing) + target * self.smoothing)
+
+    def _set_limit(self, value: float) -> None:
+        self.limit = max(float(self.min_limit), min(float(self.max_limit), value))
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait before retrying."""
+        return max(settings.LOAD_SHEDDING_RETRY_AFTER_SECONDS, math.ceil(self.short_latency))
+
+
+def _overloaded_body() -> bytes:
+    return json.dumps({
+        "success": False,
+        "error": {
+            "code": "SERVICE_OVERLOADED",
+            "message": "The service is busy, please retry shortly"
+        }
+    }).encode()
+
+
+class LoadSheddingMiddleware:
+    """Reject requests beyond the adaptive concurrency limit with 503.
+
+    Rejection happens before any routing, database or password work, so an
+    overloaded worker answers excess requests in microseconds with a
+    `Retry-After` header instead of letting them time out in a queue.
+    Responses with a 5xx status count as failures for the limit.
+
+    Streamed responses (those sent without a `Content-Length`, such as the
+    account export) give their slot back once the headers are sent and
+    leave no latency sample: how long the body takes depends on the client
+    downloading it, and a slow download would otherwise shrink the limit.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Optional[AdaptiveLimiter] = None):
+        self.app = app
+        self.limiter = limiter or AdaptiveLimiter()
+        metrics.gauge("load_shedding_limit", func=lambda: self.limiter.limit)
+        metrics.gauge("load_shedding_inflight", func=lambda: self.limiter.inflight)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.LOAD_SHEDDING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        priority = classify(scope["method"], scope["path"])
+        if priority is Priority.CRITICAL:
+            await self.app(scope, receive, send)
+            return
+
+        if not self.limiter.try_acquire(priority):
+            metrics.counter("load_shedding_rejected_total").inc()
+            metrics.counter(f"load_shedding_rejected_{priority.name.lower()}_total").inc()
+            await self._reject(send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        released = False
+
+        def release(sample: bool = True) -> None:
+            nonlocal released
+            if not released:
+                released = True
+                latency = time.perf_counter() - started if sample else None
+                self.limiter.release(latency, failed=status >= 500)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if not any(name.lower() == b"content-length" for name, _ in message.get("headers", [])):
+                    release(sample=False)
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                release()  # background tasks run after this; they keep no slot
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            release()
+
+    async def _reject(self, send: Send) -> None:
+        body = _overloaded_body()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.limiter.retry_after()).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,73 @@
+"""Middleware selecting requests for the sampling profiler."""
+import random
+import secrets
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.services.profiler import SamplingProfiler, profiler as default_profiler
+
+PROFILE_HEADER = b"x-profile"
+ADMIN_KEY_HEADER = b"x-admin-key"
+
+
+def _requested_by_header(scope: Scope) -> bool:
+    """`X-Profile: 1` together with a valid `X-Admin-Key`."""
+    if not settings.ADMIN_API_KEY:
+        return False
+    wanted = admin_key = None
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            wanted = value
+        elif name == ADMIN_KEY_HEADER:
+            admin_key = value
+    if wanted not in (b"1", b"true") or admin_key is None:
+        return False
+    return secrets.compare_digest(admin_key, settings.ADMIN_API_KEY.encode())
+
+
+class ProfilingMiddleware:
+    """Profile selected requests and aggregate their stacks per route.
+
+    Selection costs one header scan per request when the profiler is not
+    armed; nothing else runs for unprofiled requests. Profiled responses
+    carry an `X-Profile-Samples` header.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: SamplingProfiler = None):
+        self.app = app
+        self.profiler = profiler or default_profiler
+
+    def _selected(self, scope: Scope) -> bool:
+        if _requested_by_header(scope):
+            return True
+        if not self.profiler.armed:
+            return False
+        if self.profiler.sample_rate > 0 and random.random() < self.profiler.sample_rate:
+            return True
+        if self.profiler.routes:
+            for route in scope["app"].router.routes:
+                if getattr(route, "path", None) in self.profiler.routes:
+                    if route.matches(scope)[0] is Match.FULL:
+                        return True
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        session = self.profiler.start()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Profile-Samples"] = str(session.total)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            name = getattr(route, "path", None) or "[unmatched]"
+            self.profiler.stop(session, f"{scope['method']} {name}")
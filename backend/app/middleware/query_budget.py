@@ -0,0 +1,68 @@
+"""Middleware reporting SQL statements per request and checking budgets."""
+import logging
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.utils import query_counter
+from app.utils.query_counter import BudgetViolation, count_statements, get_statement_budget
+
+logger = logging.getLogger(__name__)
+
+
+def counting_enabled() -> bool:
+    """Statement counting is on in debug mode unless configured explicitly."""
+    if settings.SQL_COUNT_STATEMENTS is not None:
+        return settings.SQL_COUNT_STATEMENTS
+    return settings.APP_ENV == "dev"
+
+
+class QueryCountMiddleware:
+    """Count statements per request when enabled.
+
+    Adds an `X-SQL-Statements` header, logs the count per route and records
+    a `BudgetViolation` when the route declared a smaller `statement_budget`.
+    When disabled the request passes straight through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not counting_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        with count_statements(capture=True) as counter:
+            # Background tasks run after the response; they are not the endpoint's cost
+            finished_at = None
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal finished_at
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-SQL-Statements"] = str(counter.count)
+                elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                    finished_at = counter.count
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        count = counter.count if finished_at is None else finished_at
+
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return
+
+        name = getattr(endpoint, "__name__", repr(endpoint))
+        logger.debug("%s %s: %d SQL statements", scope["method"], name, count)
+
+        budget = get_statement_budget(endpoint)
+        if budget is not None and count > budget:
+            violation = BudgetViolation(
+                endpoint=name,
+                budget=budget,
+                count=count,
+                statements=counter.statements[:count]
+            )
+            query_counter.violations.append(violation)
+            logger.warning("SQL statement budget exceeded: %s", violation)
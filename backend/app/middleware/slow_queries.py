@@ -0,0 +1,21 @@
+"""Middleware attributing SQL statement timings to routes."""
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.utils.slow_queries import current_scope
+
+
+class StatementRouteMiddleware:
+    """Expose the request scope to the slow-query log for route attribution."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
@@ -1,6 +1,15 @@
 """Database models."""
 from app.models.user import User
 from app.models.alert import Alert, AlertType, AlertCondition
+from app.models.alert_archive import ArchivedAlert
+from app.models.alert_rule import AlertRule
 from app.models.watchlist import Watchlist
+from app.models.notification import NotificationOutbox, OutboxStatus
+from app.models.user_stats import UserStats
+from app.models.refresh_token import RefreshTokenRecord
+from app.models.idempotency import IdempotencyRecord
 
-__all__ = ["User", "Alert", "AlertType", "AlertCondition", "Watchlist"]
+__all__ = [
+    "User", "Alert", "AlertType", "AlertCondition", "ArchivedAlert", "AlertRule", "Watchlist",
+    "NotificationOutbox", "OutboxStatus", "UserStats", "RefreshTokenRecord", "IdempotencyRecord"
+]
@@ -2,7 +2,7 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean, Numeric, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Numeric, ForeignKey, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -21,6 +21,7 @@ class AlertCondition(str, enum.Enum):
     ABOVE = "above"
     BELOW = "below"
     EQUALS = "equals"
+    MOVED = "moved"  # moved by threshold_value percent within window_minutes
 
 
 class Alert(Base):
@@ -29,12 +30,13 @@ class Alert(Base):
     __tablename__ = "alerts"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     token_symbol = Column(String(50), nullable=False, index=True)
     token_address = Column(String(255), nullable=True)
     alert_type = Column(Enum(AlertType), nullable=False)
     condition = Column(Enum(AlertCondition), nullable=False)
     threshold_value = Column(Numeric(20, 8), nullable=False)
+    window_minutes = Column(Integer, nullable=True)  # only for AlertCondition.MOVED
     is_active = Column(Boolean, default=True, nullable=False)
     triggered_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -43,5 +45,41 @@ class Alert(Base):
     # Relationships
     user = relationship("User", back_populates="alerts")
     
+    __table_args__ = (
+        # Evaluator: active alerts for a batch of tokens, per alert type
+        Index(
+            "ix_alerts_active_symbol_type",
+            token_symbol,
+            alert_type,
+            postgresql_where=is_active.is_(True),
+            sqlite_where=is_active.is_(True)
+        ),
+        # Listing: WHERE user_id = ? [AND type/condition/active] ORDER BY created_at;
+        # trailing columns let the filters be checked inside the index
+        Index(
+            "ix_alerts_user_created_filters",
+            user_id, created_at, alert_type, condition, is_active, triggered_at
+        ),
+        # Listing: WHERE user_id = ? AND token_symbol = ? ... ORDER BY created_at
+        Index(
+            "ix_alerts_user_symbol_created",
+            user_id, token_symbol, created_at, alert_type, condition, is_active, triggered_at
+        ),
+        # Listing: WHERE user_id = ? AND triggered_at >= ? ... ORDER BY triggered_at
+        Index(
+            "ix_alerts_user_triggered",
+            user_id, triggered_at, token_symbol, alert_type, condition, is_active,
+            postgresql_where=triggered_at.is_not(None),
+            sqlite_where=triggered_at.is_not(None)
+        ),
+        # Archival: inactive alerts by age
+        Index(
+            "ix_alerts_inactive_updated",
+            updated_at,
+            postgresql_where=is_active.is_(False),
+            sqlite_where=is_active.is_(False)
+        ),
+    )
+    
     def __repr__(self):
         return f"<Alert {self.token_symbol} {self.alert_type.value} {self.condition.value} {self.threshold_value}>"
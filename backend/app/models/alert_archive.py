@@ -0,0 +1,38 @@
+"""Archived alert database model."""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Numeric, ForeignKey, Enum, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from app.models.alert import AlertType, AlertCondition
+
+
+class ArchivedAlert(Base):
+    """Cold copy of an alert moved out of the hot `alerts` table.
+
+    Same columns as `Alert` (the id is kept) plus the time it was archived.
+    Nothing on the hot path reads this table; listings only include it
+    when asked to.
+    """
+
+    __tablename__ = "alerts_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token_symbol = Column(String(50), nullable=False)
+    token_address = Column(String(255), nullable=True)
+    alert_type = Column(Enum(AlertType), nullable=False)
+    condition = Column(Enum(AlertCondition), nullable=False)
+    threshold_value = Column(Numeric(20, 8), nullable=False)
+    window_minutes = Column(Integer, nullable=True)
+    is_active = Column(Boolean, nullable=False)
+    triggered_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_alerts_archive_user_created", user_id, created_at),
+    )
+
+    def __repr__(self):
+        return f"<ArchivedAlert {self.token_symbol} {self.alert_type.value} {self.condition.value}>"
@@ -0,0 +1,43 @@
+"""Compound alert rule database model."""
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class AlertRule(Base):
+    """AND/OR combination of alert conditions on one token.
+
+    `expression` is a tree of groups `{"op": "and" | "or", "conditions": [...]}`
+    whose leaves are `{"alert_type", "condition", "threshold_value"}`, the
+    same primitives a single `Alert` uses (thresholds stored as strings).
+    """
+
+    __tablename__ = "alert_rules"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(100), nullable=True)
+    token_symbol = Column(String(50), nullable=False)
+    token_address = Column(String(255), nullable=True)
+    expression = Column(JSON, nullable=False)
+    is_active = Column(Boolean, default=True, nullable=False)
+    triggered_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Evaluator: active rules for a batch of tokens
+        Index(
+            "ix_alert_rules_active_symbol",
+            token_symbol,
+            postgresql_where=is_active.is_(True),
+            sqlite_where=is_active.is_(True)
+        ),
+        # Listing: WHERE user_id = ? ORDER BY created_at DESC
+        Index("ix_alert_rules_user_created", user_id, created_at),
+    )
+
+    def __repr__(self):
+        return f"<AlertRule {self.token_symbol} {self.name or self.id}>"
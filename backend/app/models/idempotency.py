@@ -0,0 +1,34 @@
+"""Idempotency key database model."""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, LargeBinary, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class IdempotencyRecord(Base):
+    """Outcome of a create/update request sent with an `Idempotency-Key`.
+
+    The row is inserted before the request runs (claiming the key) and
+    completed with the response afterwards; a row without `status_code`
+    is still in progress. Retries with the same key and request replay the
+    stored response instead of running again.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # sha256 of method, path, query and body
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Purge: expired keys
+        Index("ix_idempotency_keys_expires", expires_at),
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyRecord {self.key} status={self.status_code}>"
@@ -0,0 +1,47 @@
+"""Notification outbox database model."""
+import uuid
+import enum
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, Enum, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class OutboxStatus(str, enum.Enum):
+    """Delivery state of an outbox message."""
+    PENDING = "pending"
+    IN_FLIGHT = "in_flight"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class NotificationOutbox(Base):
+    """Push notification waiting for delivery.
+
+    Rows are written in the same transaction as the state change that
+    produced them, so a notification exists if and only if that change
+    committed. The dispatcher delivers them asynchronously.
+    """
+
+    __tablename__ = "notification_outbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    alert_id = Column(UUID(as_uuid=True), ForeignKey("alerts.id", ondelete="SET NULL"), nullable=True)
+    kind = Column(String(50), nullable=False)
+    dedupe_key = Column(String(255), nullable=False, unique=True)
+    payload = Column(JSON, nullable=False)
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    claimed_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<NotificationOutbox {self.kind} {self.status.value}>"
@@ -0,0 +1,41 @@
+"""Refresh token database model."""
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class RefreshTokenRecord(Base):
+    """An issued refresh token.
+
+    Every token belongs to a family started at login; each refresh uses up
+    the presented token and issues its successor in the same family.
+    Presenting a used token again means it leaked, so the whole family is
+    revoked.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # the token's `jti`
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Purge: expired tokens
+        Index("ix_refresh_tokens_expires", expires_at),
+        # Revocation sync: families revoked since the last run
+        Index(
+            "ix_refresh_tokens_revoked",
+            revoked_at,
+            postgresql_where=revoked_at.is_not(None),
+            sqlite_where=revoked_at.is_not(None)
+        ),
+    )
+
+    def __repr__(self):
+        return f"<RefreshTokenRecord {self.id} family={self.family_id}>"
@@ -17,10 +17,17 @@ class User(Base):
     password_hash = Column(String(255), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    deleted_at = Column(DateTime, nullable=True, index=True)  # Set when deletion is requested
     
-    # Relationships
-    alerts = relationship("Alert", back_populates="user", cascade="all, delete-orphan")
-    watchlist_items = relationship("Watchlist", back_populates="user", cascade="all, delete-orphan")
+    # Relationships (never lazy-loaded: query children explicitly to avoid N+1).
+    # passive_deletes leaves child rows to the ON DELETE CASCADE foreign keys
+    # instead of loading them into the session when a user is deleted.
+    alerts = relationship(
+        "Alert", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise"
+    )
+    watchlist_items = relationship(
+        "Watchlist", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise"
+    )
     
     def __repr__(self):
         return f"<User {self.email}>"
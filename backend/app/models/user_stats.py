@@ -0,0 +1,42 @@
+"""Per-user dashboard counters."""
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, JSON, event, insert
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from app.models.user import User
+
+
+class UserStats(Base):
+    """Counters maintained by the alert and watchlist mutation paths.
+
+    `trigger_buckets` maps the start of an hour (epoch seconds, as a string)
+    to the number of alerts triggered in that hour, pruned to the last 24
+    hours. `recent_triggers` holds the newest triggers, newest first.
+    """
+
+    __tablename__ = "user_stats"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    active_alert_count = Column(Integer, default=0, nullable=False)
+    watchlist_count = Column(Integer, default=0, nullable=False)
+    trigger_buckets = Column(JSON, default=dict, nullable=False)
+    recent_triggers = Column(JSON, default=list, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<UserStats {self.user_id} alerts={self.active_alert_count} watchlist={self.watchlist_count}>"
+
+
+@event.listens_for(User, "after_insert")
+def _create_user_stats(mapper, connection, target):
+    """Every new user starts with a zeroed counters row."""
+    connection.execute(
+        insert(UserStats.__table__).values(
+            user_id=target.id,
+            active_alert_count=0,
+            watchlist_count=0,
+            trigger_buckets={},
+            recent_triggers=[],
+            updated_at=datetime.utcnow()
+        )
+    )
@@ -1,7 +1,7 @@
 """Watchlist database model."""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, UniqueConstraint, func
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -13,7 +13,7 @@ class Watchlist(Base):
     __tablename__ = "watchlist"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     token_symbol = Column(String(50), nullable=False, index=True)
     token_address = Column(String(255), nullable=True)
     notes = Column(Text, nullable=True)
@@ -22,14 +22,18 @@ class Watchlist(Base):
     # Relationships
     user = relationship("User", back_populates="watchlist_items")
     
-    # Unique constraint: user cannot add same token twice
     __table_args__ = (
-        UniqueConstraint(
-            'user_id', 
-            'token_symbol', 
-            func.coalesce('token_address', ''),
-            name='uq_user_token'
+        # User cannot add same token twice; a missing address counts as ''
+        # (a plain unique constraint would let NULL addresses repeat)
+        Index(
+            "uq_watchlist_user_token",
+            user_id,
+            token_symbol,
+            func.coalesce(token_address, ""),
+            unique=True
         ),
+        # Listing: WHERE user_id = ? [AND token_symbol LIKE 'prefix%'] ORDER BY created_at
+        Index("ix_watchlist_user_created_symbol", user_id, created_at, token_symbol),
     )
     
     def __repr__(self):
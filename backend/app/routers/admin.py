@@ -0,0 +1,110 @@
+"""Admin router for operational endpoints."""
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.database import get_session_factory
+from app.schemas.admin import ProfilerSettings
+from app.schemas.responses import StandardResponse
+from app.services.archival import archive_cold_alerts
+from app.services.profiler import profiler
+from app.services.security import require_admin
+from app.utils.metrics import metrics
+from app.utils.slow_queries import slow_query_log
+from app.utils.responses import success_response
+
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)]
+)
+
+
+@router.get("/metrics", response_model=StandardResponse[dict])
+async def get_metrics(prefix: str = ""):
+    """Get a snapshot of in-process metrics."""
+    return success_response(
+        data=metrics.snapshot(prefix),
+        message="Metrics retrieved successfully"
+    )
+
+
+@router.post("/archive/alerts", response_model=StandardResponse[dict])
+async def archive_alerts(
+    background_tasks: BackgroundTasks,
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """Start moving cold alerts to the archive in background batches."""
+    background_tasks.add_task(archive_cold_alerts, session_factory)
+    return success_response(
+        data={"scheduled": True},
+        message="Alert archival scheduled successfully"
+    )
+
+
+@router.get("/jobs", response_model=StandardResponse[dict])
+async def get_jobs(request: Request):
+    """Get the state of scheduled background jobs in this worker."""
+    scheduler = getattr(request.app.state, "scheduler", None)
+    return success_response(
+        data=scheduler.status() if scheduler is not None else {},
+        message="Jobs retrieved successfully"
+    )
+
+
+@router.get("/profiler", response_model=StandardResponse[dict])
+async def get_profiler():
+    """Get profiler settings and the routes profiled so far in this worker."""
+    return success_response(
+        data={
+            "sample_rate": profiler.sample_rate,
+            "routes": sorted(profiler.routes),
+            "profiles": profiler.report(),
+        },
+        message="Profiler state retrieved successfully"
+    )
+
+
+@router.put("/profiler", response_model=StandardResponse[dict])
+async def configure_profiler(body: ProfilerSettings):
+    """Change which requests are profiled in this worker."""
+    profiler.configure(sample_rate=body.sample_rate, routes=body.routes)
+    return success_response(
+        data={"sample_rate": profiler.sample_rate, "routes": sorted(profiler.routes)},
+        message="Profiler updated successfully"
+    )
+
+
+@router.get("/profiler/collapsed", response_class=PlainTextResponse)
+async def get_collapsed_stacks(route: Optional[str] = None):
+    """Collapsed stacks for flame graphs; one route ("GET /api/v1/alerts") or all."""
+    return PlainTextResponse(profiler.collapsed(route))
+
+
+@router.delete("/profiler", response_model=StandardResponse[dict])
+async def reset_profiler():
+    """Discard collected profiles."""
+    profiler.reset()
+    return success_response(data={}, message="Profiles cleared successfully")
+
+
+@router.get("/slow-queries", response_model=StandardResponse[list])
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query(
+        "total_seconds",
+        pattern="^(total_seconds|p99_seconds|max_seconds|count|slow_count)$"
+    )
+):
+    """Get the heaviest statement fingerprints per route in this worker."""
+    return success_response(
+        data=slow_query_log.top(limit, order_by),
+        message="Slow queries retrieved successfully"
+    )
+
+
+@router.delete("/slow-queries", response_model=StandardResponse[dict])
+async def reset_slow_queries():
+    """Discard collected statement timings."""
+    slow_query_log.reset()
+    return success_response(data={}, message="Slow queries cleared successfully")
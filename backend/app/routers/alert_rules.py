@@ -0,0 +1,155 @@
+"""Compound alert rules router for CRUD operations."""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, delete
+from uuid import UUID
+from app.database import get_db
+from app.models.user import User
+from app.models.alert_rule import AlertRule
+from app.schemas.alert_rule import AlertRuleCreate, AlertRuleUpdate, AlertRuleResponse
+from app.schemas.responses import StandardResponse, PaginatedResponse
+from app.services.security import get_current_user
+from app.utils.responses import success_response, error_response, paginated_response
+from app.utils.query_counter import statement_budget
+
+router = APIRouter(prefix="/api/v1/alert-rules", tags=["Alert Rules"])
+
+
+@router.get("", response_model=PaginatedResponse[AlertRuleResponse])
+@statement_budget(3)
+async def list_alert_rules(
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List user's compound alert rules with pagination."""
+    count_result = await db.execute(
+        select(func.count()).select_from(AlertRule).where(AlertRule.user_id == current_user.id)
+    )
+    total = count_result.scalar()
+
+    offset = (page - 1) * per_page
+    result = await db.execute(
+        select(AlertRule)
+        .where(AlertRule.user_id == current_user.id)
+        .order_by(AlertRule.created_at.desc())
+        .offset(offset)
+        .limit(per_page)
+    )
+    rules = result.scalars().all()
+
+    return paginated_response(
+        data=[AlertRuleResponse.model_validate(rule) for rule in rules],
+        page=page,
+        per_page=per_page,
+        total=total,
+        message="Alert rules retrieved successfully"
+    )
+
+
+@router.post("", response_model=StandardResponse[AlertRuleResponse])
+@statement_budget(2)
+async def create_alert_rule(
+    rule_data: AlertRuleCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a new compound alert rule."""
+    new_rule = AlertRule(
+        user_id=current_user.id,
+        **rule_data.model_dump(mode="json")
+    )
+
+    db.add(new_rule)
+    await db.commit()
+
+    return success_response(
+        data=AlertRuleResponse.model_validate(new_rule),
+        message="Alert rule created successfully"
+    )
+
+
+@router.get("/{rule_id}", response_model=StandardResponse[AlertRuleResponse])
+@statement_budget(2)
+async def get_alert_rule(
+    rule_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a specific compound alert rule."""
+    result = await db.execute(
+        select(AlertRule).where(AlertRule.id == rule_id, AlertRule.user_id == current_user.id)
+    )
+    rule = result.scalar_one_or_none()
+
+    if not rule:
+        return error_response(
+            code="ALERT_RULE_NOT_FOUND",
+            message="Alert rule not found"
+        )
+
+    return success_response(
+        data=AlertRuleResponse.model_validate(rule),
+        message="Alert rule retrieved successfully"
+    )
+
+
+@router.put("/{rule_id}", response_model=StandardResponse[AlertRuleResponse])
+@statement_budget(3)
+async def update_alert_rule(
+    rule_id: UUID,
+    rule_data: AlertRuleUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update a compound alert rule."""
+    result = await db.execute(
+        select(AlertRule).where(AlertRule.id == rule_id, AlertRule.user_id == current_user.id)
+    )
+    rule = result.scalar_one_or_none()
+
+    if not rule:
+        return error_response(
+            code="ALERT_RULE_NOT_FOUND",
+            message="Alert rule not found"
+        )
+
+    update_data = rule_data.model_dump(mode="json", exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(rule, field, value)
+
+    await db.commit()
+
+    return success_response(
+        data=AlertRuleResponse.model_validate(rule),
+        message="Alert rule updated successfully"
+    )
+
+
+@router.delete("/{rule_id}", response_model=StandardResponse[dict])
+@statement_budget(2)
+async def delete_alert_rule(
+    rule_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a compound alert rule."""
+    result = await db.execute(
+        delete(AlertRule)
+        .where(AlertRule.id == rule_id, AlertRule.user_id == current_user.id)
+        .returning(AlertRule.id)
+    )
+
+    if result.scalar_one_or_none() is None:
+        return error_response(
+            code="ALERT_RULE_NOT_FOUND",
+            message="Alert rule not found"
+        )
+
+    await db.commit()
+
+    return success_response(
+        data={"deleted": True},
+        message="Alert rule deleted successfully"
+    )
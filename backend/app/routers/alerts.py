@@ -1,47 +1,113 @@
 """Alerts router for CRUD operations."""
+import time
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, delete, union_all, cast, null, DateTime
 from uuid import UUID
-from typing import List
+from datetime import datetime
+from typing import List, Optional
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
-from app.models.alert import Alert
-from app.schemas.alert import AlertCreate, AlertUpdate, AlertResponse, AlertToggle
+from app.models.alert import Alert, AlertType, AlertCondition
+from app.models.alert_archive import ArchivedAlert
+from app.schemas.alert import AlertCreate, AlertUpdate, AlertResponse, AlertToggle, window_error
+from app.schemas.backtest import BacktestRequest, BacktestReport, BacktestResult, SeriesSummary
 from app.schemas.responses import StandardResponse, PaginatedResponse
+from app.services import backtest
 from app.services.security import get_current_user
+from app.services.counters import adjust_counters
+from app.services.listing import AlertSort, alert_filters, alert_listing, order_by
+from app.services.popularity import popularity
+from app.utils.metrics import metrics
 from app.utils.responses import success_response, error_response, paginated_response
+from app.utils.query_counter import statement_budget
 
 router = APIRouter(prefix="/api/v1/alerts", tags=["Alerts"])
 
 
-@router.get("", response_model=PaginatedResponse[AlertResponse])
+@router.get(
+    "",
+    response_model=PaginatedResponse[AlertResponse],
+    response_model_exclude_unset=True
+)
+@statement_budget(3)
 async def list_alerts(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    token_symbol: Optional[str] = Query(None, min_length=1, max_length=50),
+    alert_type: Optional[AlertType] = Query(None),
+    condition: Optional[AlertCondition] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    triggered_since: Optional[datetime] = Query(None, description="Only alerts triggered at or after this time"),
+    sort: AlertSort = Query("-created_at", description="-created_at, created_at or -triggered_at (triggered alerts only)"),
+    include_archived: bool = Query(False, description="Also list alerts moved to the archive"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List user's alerts with pagination."""
-    # Get total count
-    count_result = await db.execute(
-        select(func.count()).select_from(Alert).where(Alert.user_id == current_user.id)
+    """List user's alerts with optional filters, sorting and pagination."""
+    filters = dict(
+        token_symbol=token_symbol,
+        alert_type=alert_type,
+        condition=condition,
+        is_active=is_active,
+        triggered_since=triggered_since,
+        sort=sort
     )
+    if include_archived:
+        return await _list_with_archive(db, current_user.id, page, per_page, filters)
+    
+    count_query, page_query = alert_listing(current_user.id, page=page, per_page=per_page, **filters)
+    
+    # Get total count
+    count_result = await db.execute(count_query)
     total = count_result.scalar()
     
     # Get paginated data
+    result = await db.execute(page_query)
+    alerts = result.scalars().all()
+    
+    return paginated_response(
+        data=[AlertResponse.model_validate(alert) for alert in alerts],
+        page=page,
+        per_page=per_page,
+        total=total,
+        message="Alerts retrieved successfully"
+    )
+
+
+async def _list_with_archive(db: AsyncSession, user_id: UUID, page: int, per_page: int, filters: dict):
+    """List live and archived alerts together, filtered and sorted alike."""
+    live_conditions = [Alert.user_id == user_id, *alert_filters(Alert, **filters)]
+    archived_conditions = [ArchivedAlert.user_id == user_id, *alert_filters(ArchivedAlert, **filters)]
+    total_result = await db.execute(
+        select(
+            select(func.count()).select_from(Alert).where(*live_conditions).scalar_subquery()
+            + select(func.count()).select_from(ArchivedAlert).where(*archived_conditions).scalar_subquery()
+        )
+    )
+    total = total_result.scalar()
+    
+    columns = [column.name for column in Alert.__table__.columns]
+    archived = select(*(getattr(ArchivedAlert, name) for name in columns), ArchivedAlert.archived_at).where(
+        *archived_conditions
+    )
+    live = select(*(getattr(Alert, name) for name in columns), cast(null(), DateTime)).where(
+        *live_conditions
+    )
+    combined = union_all(archived, live).subquery()
+    
     offset = (page - 1) * per_page
     result = await db.execute(
-        select(Alert)
-        .where(Alert.user_id == current_user.id)
-        .order_by(Alert.created_at.desc())
+        select(combined)
+        .order_by(order_by(combined.c, filters["sort"]))
         .offset(offset)
         .limit(per_page)
     )
-    alerts = result.scalars().all()
     
     return paginated_response(
-        data=[AlertResponse.model_validate(alert) for alert in alerts],
+        data=[AlertResponse.model_validate(dict(row._mapping)) for row in result],
         page=page,
         per_page=per_page,
         total=total,
@@ -50,6 +116,7 @@ async def list_alerts(
 
 
 @router.post("", response_model=StandardResponse[AlertResponse])
+@statement_budget(3)
 async def create_alert(
     alert_data: AlertCreate,
     current_user: User = Depends(get_current_user),
@@ -62,8 +129,10 @@ async def create_alert(
     )
     
     db.add(new_alert)
+    if new_alert.is_active:
+        await adjust_counters(db, current_user.id, active_alerts=1)
     await db.commit()
-    await db.refresh(new_alert)
+    popularity.alerted.add(new_alert.token_symbol)
     
     return success_response(
         data=AlertResponse.model_validate(new_alert),
@@ -71,7 +140,96 @@ async def create_alert(
     )
 
 
+@router.post("/backtest", response_model=StandardResponse[BacktestReport])
+@statement_budget(2)
+async def backtest_alerts(
+    request: BacktestRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Replay a token's history against a proposed alert or the user's alerts.
+
+    With `alert`, only that (unsaved) alert is replayed; otherwise the
+    user's alerts are, optionally only those on `token_symbol`. The
+    history is the uploaded `series` for its token and the stored series
+    for every other token. Nothing is saved or triggered.
+    """
+    if not backtest.available():
+        return error_response(
+            code="BACKTEST_UNAVAILABLE",
+            message="Backtesting is not available on this server"
+        )
+
+    truncated = False
+    if request.alert is not None:
+        alert = request.alert
+        targets = [backtest.Target(None, alert.token_symbol, backtest.Condition(
+            alert.alert_type, alert.condition, alert.threshold_value, alert.window_minutes
+        ))]
+    else:
+        query = select(
+            Alert.id, Alert.token_symbol, Alert.alert_type, Alert.condition,
+            Alert.threshold_value, Alert.window_minutes
+        ).where(Alert.user_id == current_user.id)
+        if request.token_symbol is not None:
+            query = query.where(Alert.token_symbol == request.token_symbol)
+        query = query.order_by(Alert.created_at.desc()).limit(settings.BACKTEST_MAX_ALERTS + 1)
+        rows = (await db.execute(query)).all()
+        truncated = len(rows) > settings.BACKTEST_MAX_ALERTS
+        targets = [
+            backtest.Target(row.id, row.token_symbol, backtest.Condition(
+                row.alert_type, row.condition, row.threshold_value, row.window_minutes
+            ))
+            for row in rows[:settings.BACKTEST_MAX_ALERTS]
+        ]
+
+    uploaded = None
+    if request.series is not None:
+        columns = {
+            alert_type: getattr(request.series, alert_type.value)
+            for alert_type in AlertType
+            if getattr(request.series, alert_type.value) is not None
+        }
+        symbol = request.alert.token_symbol if request.alert is not None else request.token_symbol
+        try:
+            uploaded = backtest.Series.from_arrays(symbol, request.series.timestamps, columns)
+        except backtest.SeriesError as exc:
+            return error_response(code="BACKTEST_INVALID_SERIES", message=str(exc))
+
+    started = time.perf_counter()
+    try:
+        results, replayed, missing = await run_in_threadpool(
+            backtest.run_backtest, targets, uploaded, request.start, request.end
+        )
+    except backtest.SeriesError as exc:
+        return error_response(code="BACKTEST_INVALID_SERIES", message=str(exc))
+    metrics.histogram("backtest_seconds").observe(time.perf_counter() - started)
+
+    report = BacktestReport(
+        results=[
+            BacktestResult(
+                alert_id=target.alert_id,
+                token_symbol=target.token_symbol,
+                alert_type=target.condition.alert_type,
+                condition=target.condition.condition,
+                threshold_value=target.condition.threshold,
+                window_minutes=target.condition.window_minutes,
+                **summary
+            )
+            for target, summary in results
+        ],
+        series=[SeriesSummary(**item) for item in replayed],
+        missing_series=missing,
+        truncated=truncated
+    )
+    return success_response(
+        data=report,
+        message="Backtest completed successfully"
+    )
+
+
 @router.get("/{alert_id}", response_model=StandardResponse[AlertResponse])
+@statement_budget(2)
 async def get_alert(
     alert_id: UUID,
     current_user: User = Depends(get_current_user),
@@ -96,6 +254,7 @@ async def get_alert(
 
 
 @router.put("/{alert_id}", response_model=StandardResponse[AlertResponse])
+@statement_budget(4)
 async def update_alert(
     alert_id: UUID,
     alert_data: AlertUpdate,
@@ -114,13 +273,29 @@ async def update_alert(
             message="Alert not found"
         )
     
-    # Update fields
     update_data = alert_data.model_dump(exclude_unset=True)
+    condition = update_data.get("condition", alert.condition)
+    if "condition" in update_data and condition != AlertCondition.MOVED:
+        update_data.setdefault("window_minutes", None)
+    error = window_error(condition, update_data.get("window_minutes", alert.window_minutes))
+    if error:
+        return error_response(
+            code="ALERT_INVALID_WINDOW",
+            message=error
+        )
+    
+    # Update fields
+    was_active = alert.is_active
+    old_symbol = alert.token_symbol
     for field, value in update_data.items():
         setattr(alert, field, value)
     
+    if alert.is_active != was_active:
+        await adjust_counters(db, current_user.id, active_alerts=1 if alert.is_active else -1)
     await db.commit()
-    await db.refresh(alert)
+    if alert.token_symbol != old_symbol:
+        popularity.alerted.add(old_symbol, -1)
+        popularity.alerted.add(alert.token_symbol)
     
     return success_response(
         data=AlertResponse.model_validate(alert),
@@ -129,6 +304,7 @@ async def update_alert(
 
 
 @router.delete("/{alert_id}", response_model=StandardResponse[dict])
+@statement_budget(3)
 async def delete_alert(
     alert_id: UUID,
     current_user: User = Depends(get_current_user),
@@ -136,18 +312,23 @@ async def delete_alert(
 ):
     """Delete an alert."""
     result = await db.execute(
-        select(Alert).where(Alert.id == alert_id, Alert.user_id == current_user.id)
+        delete(Alert)
+        .where(Alert.id == alert_id, Alert.user_id == current_user.id)
+        .returning(Alert.is_active, Alert.token_symbol)
     )
-    alert = result.scalar_one_or_none()
+    row = result.one_or_none()
     
-    if not alert:
+    if row is None:
         return error_response(
             code="ALERT_NOT_FOUND",
             message="Alert not found"
         )
     
-    await db.delete(alert)
+    was_active, token_symbol = row
+    if was_active:
+        await adjust_counters(db, current_user.id, active_alerts=-1)
     await db.commit()
+    popularity.alerted.add(token_symbol, -1)
     
     return success_response(
         data={"deleted": True},
@@ -156,6 +337,7 @@ async def delete_alert(
 
 
 @router.patch("/{alert_id}/toggle", response_model=StandardResponse[AlertResponse])
+@statement_budget(3)
 async def toggle_alert(
     alert_id: UUID,
     toggle_data: AlertToggle,
@@ -163,20 +345,37 @@ async def toggle_alert(
     db: AsyncSession = Depends(get_db)
 ):
     """Toggle alert active status."""
+    # UPDATE ... RETURNING only matches when the state actually changes,
+    # which tells us whether the active-alert counter needs adjusting
     result = await db.execute(
-        select(Alert).where(Alert.id == alert_id, Alert.user_id == current_user.id)
+        update(Alert)
+        .where(
+            Alert.id == alert_id,
+            Alert.user_id == current_user.id,
+            Alert.is_active != toggle_data.is_active
+        )
+        .values(is_active=toggle_data.is_active)
+        .returning(Alert)
+        .execution_options(populate_existing=True)
     )
     alert = result.scalar_one_or_none()
     
+    if alert is not None:
+        await adjust_counters(db, current_user.id, active_alerts=1 if toggle_data.is_active else -1)
+    else:
+        # Already in the requested state, or not found
+        result = await db.execute(
+            select(Alert).where(Alert.id == alert_id, Alert.user_id == current_user.id)
+        )
+        alert = result.scalar_one_or_none()
+    
     if not alert:
         return error_response(
             code="ALERT_NOT_FOUND",
             message="Alert not found"
         )
     
-    alert.is_active = toggle_data.is_active
     await db.commit()
-    await db.refresh(alert)
     
     return success_response(
         data=AlertResponse.model_validate(alert),
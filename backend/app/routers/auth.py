@@ -1,15 +1,23 @@
 """Authentication router."""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from uuid import UUID
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, get_session_factory
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse
-from app.schemas.auth import Token
+from app.schemas.auth import Token, RefreshToken
 from app.schemas.responses import StandardResponse
-from app.services.auth import get_password_hash, verify_password, create_access_token, create_refresh_token, decode_token
+from app.services.auth import get_password_hash, verify_password, decode_token
+from app.services.tokens import issue_tokens, rotate_refresh_token, revoke_family
 from app.services.security import get_current_user
+from app.services.account_deletion import request_account_deletion, purge_user
+from app.services.export import MEDIA_TYPE as EXPORT_MEDIA_TYPE, export_account
 from app.utils.responses import success_response, error_response
+from app.utils.query_counter import statement_budget
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
@@ -17,15 +25,24 @@ limiter = Limiter(key_func=get_remote_address)
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
 
 
+def auth_rate_limit() -> str:
+    """Per-client limit of the credential endpoints, read on every request."""
+    return f"{settings.RATE_LIMIT_AUTH_PER_15MIN}/15minutes"
+
+
 @router.post("/register", response_model=StandardResponse[UserResponse])
-@limiter.limit("5/15minutes")
+@limiter.limit(auth_rate_limit)
+@statement_budget(3)
 async def register(
+    request: Request,
     user_data: UserCreate,
     db: AsyncSession = Depends(get_db)
 ):
     """Register a new user."""
     # Check if user already exists
-    result = await db.execute(select(User).where(User.email == user_data.email))
+    result = await db.execute(
+        select(User).where(User.email == user_data.email, User.deleted_at.is_(None))
+    )
     existing_user = result.scalar_one_or_none()
     
     if existing_user:
@@ -43,7 +60,6 @@ async def register(
     
     db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
     
     return success_response(
         data=UserResponse.model_validate(new_user),
@@ -52,8 +68,10 @@ async def register(
 
 
 @router.post("/login", response_model=StandardResponse[Token])
-@limiter.limit("5/15minutes")
+@limiter.limit(auth_rate_limit)
+@statement_budget(2)
 async def login(
+    request: Request,
     credentials: UserLogin,
     db: AsyncSession = Depends(get_db)
 ):
@@ -62,26 +80,127 @@ async def login(
     result = await db.execute(select(User).where(User.email == credentials.email))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(credentials.password, user.password_hash):
+    if not user or user.deleted_at is not None or not verify_password(credentials.password, user.password_hash):
         return error_response(
             code="AUTH_INVALID_CREDENTIALS",
             message="Invalid email or password"
         )
     
-    # Create tokens
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    # Create tokens (starts a new refresh token family)
+    tokens = issue_tokens(db, user.id)
+    await db.commit()
     
     return success_response(
-        data=Token(access_token=access_token, refresh_token=refresh_token),
+        data=tokens,
         message="Login successful"
     )
 
 
+@router.post("/refresh", response_model=StandardResponse[Token])
+@statement_budget(2)
+async def refresh(
+    token_data: RefreshToken,
+    db: AsyncSession = Depends(get_db)
+):
+    """Exchange a refresh token for a new token pair.
+
+    Each refresh token works once. Presenting a used one revokes every
+    token issued from the same login.
+    """
+    payload = decode_token(token_data.refresh_token)
+    tokens = None
+    if payload is not None and payload.get("type") == "refresh":
+        tokens = await rotate_refresh_token(db, payload)
+    
+    if tokens is None:
+        return error_response(
+            code="AUTH_INVALID_REFRESH_TOKEN",
+            message="Invalid or expired refresh token"
+        )
+    
+    return success_response(
+        data=tokens,
+        message="Token refreshed successfully"
+    )
+
+
+@router.post("/logout", response_model=StandardResponse[dict])
+@statement_budget(1)
+async def logout(
+    token_data: RefreshToken,
+    db: AsyncSession = Depends(get_db)
+):
+    """Revoke the refresh token family of the current login."""
+    payload = decode_token(token_data.refresh_token)
+    if payload is None or payload.get("type") != "refresh" or "fam" not in payload:
+        return error_response(
+            code="AUTH_INVALID_REFRESH_TOKEN",
+            message="Invalid or expired refresh token"
+        )
+    
+    try:
+        family_id = UUID(payload["fam"])
+    except ValueError:
+        return error_response(
+            code="AUTH_INVALID_REFRESH_TOKEN",
+            message="Invalid or expired refresh token"
+        )
+    
+    await revoke_family(db, family_id)
+    
+    return success_response(
+        data={"logged_out": True},
+        message="Logged out successfully"
+    )
+
+
 @router.get("/me", response_model=StandardResponse[UserResponse])
+@statement_budget(1)
 async def get_me(current_user: User = Depends(get_current_user)):
     """Get current user information."""
     return success_response(
         data=UserResponse.model_validate(current_user),
         message="User retrieved successfully"
     )
+
+
+@router.get("/me/export", response_class=StreamingResponse)
+@statement_budget(1)
+async def export_me(
+    current_user: User = Depends(get_current_user),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """Export the current user's alerts, watchlist and trigger history as NDJSON.
+
+    The request session is closed before streaming starts; rows are read
+    in chunks on connections held only while each chunk is read.
+    """
+    filename = f"supplylens-export-{datetime.utcnow():%Y%m%d}.ndjson"
+    return StreamingResponse(
+        export_account(session_factory, current_user),
+        media_type=EXPORT_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.delete("/me", response_model=StandardResponse[dict])
+@statement_budget(2)
+async def delete_me(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """Delete the current user's account.
+
+    The account is deactivated and its email freed for a new registration
+    immediately; its data is purged in background batches after the
+    response is sent.
+    """
+    await request_account_deletion(db, current_user.id)
+    background_tasks.add_task(purge_user, session_factory, current_user.id)
+    
+    return success_response(
+        data={"deleted": True},
+        message="Account deletion scheduled successfully"
+    )
@@ -0,0 +1,39 @@
+"""Dashboard router for per-user summaries."""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.models.user import User
+from app.models.user_stats import UserStats
+from app.schemas.dashboard import DashboardSummary
+from app.schemas.responses import StandardResponse
+from app.services.counters import reconcile_user_stats, triggered_since
+from app.services.security import get_current_user
+from app.utils.query_counter import statement_budget
+from app.utils.responses import success_response
+
+router = APIRouter(prefix="/api/v1/dashboard", tags=["Dashboard"])
+
+
+@router.get("/summary", response_model=StandardResponse[DashboardSummary])
+@statement_budget(2)
+async def get_dashboard_summary(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the current user's dashboard summary."""
+    stats = await db.get(UserStats, current_user.id)
+    if stats is None:
+        # Users created before counters existed get their row rebuilt once
+        stats = await reconcile_user_stats(db, current_user.id)
+
+    summary = DashboardSummary(
+        active_alert_count=stats.active_alert_count,
+        triggered_last_24h=triggered_since(stats),
+        watchlist_count=stats.watchlist_count,
+        recent_triggers=stats.recent_triggers
+    )
+
+    return success_response(
+        data=summary,
+        message="Dashboard summary retrieved successfully"
+    )
@@ -0,0 +1,109 @@
+"""Prices router for live price subscriptions."""
+import asyncio
+import logging
+from datetime import datetime
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import settings
+from app.database import get_session_factory
+from app.schemas.live_prices import PriceSubscription
+from app.services.live_prices import ChannelOverflow, ClientChannel, price_hub
+from app.services.security import authenticate_bearer
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/v1/prices", tags=["Prices"])
+
+
+def _error(code: str, message: str) -> dict:
+    return {"type": "error", "error": {"code": code, "message": message}}
+
+
+async def _send_loop(websocket: WebSocket, channel: ClientChannel) -> None:
+    """Drain the client's channel at the client's pace; give up on a client that stops reading."""
+    while True:
+        for message in await channel.next_messages():
+            try:
+                await asyncio.wait_for(websocket.send_json(message), timeout=settings.LIVE_PRICES_SEND_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                metrics.counter("live_prices_slow_clients_dropped_total").inc()
+                return
+
+
+async def _receive_loop(websocket: WebSocket, channel: ClientChannel) -> None:
+    """Apply subscribe/unsubscribe messages until the client goes away."""
+    while True:
+        text = await websocket.receive_text()
+        try:
+            request = PriceSubscription.model_validate_json(text)
+        except ValidationError:
+            channel.send_control(_error(
+                "LIVE_PRICES_INVALID_MESSAGE",
+                'Expected {"action": "subscribe" | "unsubscribe", "symbols": [...]}'
+            ))
+            continue
+
+        if request.action == "subscribe":
+            if len(channel.symbols | set(request.symbols)) > settings.LIVE_PRICES_MAX_SUBSCRIPTIONS:
+                channel.send_control(_error(
+                    "LIVE_PRICES_TOO_MANY_SYMBOLS",
+                    f"At most {settings.LIVE_PRICES_MAX_SUBSCRIPTIONS} symbols per connection"
+                ))
+                continue
+            price_hub.subscribe(channel, request.symbols)
+        else:
+            price_hub.unsubscribe(channel, request.symbols)
+        channel.send_control({"type": "subscriptions", "symbols": sorted(channel.symbols)})
+
+
+async def _expire(expires_at: datetime) -> None:
+    await asyncio.sleep(max(0.0, (expires_at - datetime.utcnow()).total_seconds()))
+
+
+@router.websocket("/live")
+async def live_prices(
+    websocket: WebSocket,
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """Stream live prices of the tokens a client subscribes to.
+
+    Authenticate with `Authorization: Bearer <access token>`. Client
+    messages are `{"action": "subscribe" | "unsubscribe", "symbols": [...]}`;
+    the server answers with `{"type": "subscriptions", "symbols": [...]}`
+    and sends `{"type": "prices", "data": [...]}` with the latest quote of
+    each changed token. The connection is closed (1008) when the access
+    token expires; reconnect with a fresh one.
+    """
+    authenticated = await authenticate_bearer(websocket.headers.get("authorization"), session_factory)
+    if authenticated is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    _, expires_at = authenticated
+
+    await websocket.accept()
+    channel = ClientChannel()
+    price_hub.connect(channel)
+    tasks = [
+        asyncio.create_task(_receive_loop(websocket, channel)),
+        asyncio.create_task(_send_loop(websocket, channel)),
+        asyncio.create_task(_expire(expires_at)),
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        price_hub.disconnect(channel)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    receiver = tasks[0]
+    if receiver in done and isinstance(receiver.exception(), WebSocketDisconnect):
+        return
+    if receiver in done and not isinstance(receiver.exception(), ChannelOverflow):
+        logger.warning("live price connection failed: %r", receiver.exception())
+    try:
+        # Expired token, a client that stopped reading or one flooding us with requests
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    except Exception:
+        pass  # the client is already gone
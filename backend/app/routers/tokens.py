@@ -0,0 +1,32 @@
+"""Tokens router for cross-user token statistics."""
+from fastapi import APIRouter, Depends, Query
+from app.config import settings
+from app.models.user import User
+from app.schemas.trending import TokenCount, TrendingTokens
+from app.schemas.responses import StandardResponse
+from app.services.popularity import popularity
+from app.services.security import get_current_user
+from app.utils.query_counter import statement_budget
+from app.utils.responses import success_response
+
+router = APIRouter(prefix="/api/v1/tokens", tags=["Tokens"])
+
+
+@router.get("/trending", response_model=StandardResponse[TrendingTokens])
+@statement_budget(1)
+async def get_trending_tokens(
+    limit: int = Query(10, ge=1, le=settings.POPULARITY_TOP_K_MAX),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the most watched and most alerted tokens across all users."""
+    # Served from in-memory counters; only the auth lookup hits the database
+    trending = TrendingTokens(
+        most_watched=[TokenCount(token_symbol=s, count=c) for s, c in popularity.watched.top(limit)],
+        most_alerted=[TokenCount(token_symbol=s, count=c) for s, c in popularity.alerted.top(limit)],
+        reconciled_at=popularity.reconciled_at
+    )
+
+    return success_response(
+        data=trending,
+        message="Trending tokens retrieved successfully"
+    )
@@ -1,48 +1,67 @@
 """Watchlist router for CRUD operations."""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update, delete
 from sqlalchemy.exc import IntegrityError
 from uuid import UUID
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.models.user import User
 from app.models.watchlist import Watchlist
-from app.schemas.watchlist import WatchlistCreate, WatchlistUpdate, WatchlistResponse
+from app.schemas.watchlist import WatchlistCreate, WatchlistUpdate, WatchlistResponse, QuoteResponse
 from app.schemas.responses import StandardResponse, PaginatedResponse
 from app.services.security import get_current_user
+from app.services.counters import adjust_counters
+from app.services.listing import WatchlistSort, watchlist_listing
+from app.services.market_data import MarketDataClient, get_market_data_client
+from app.services.popularity import popularity
 from app.utils.responses import success_response, error_response, paginated_response
+from app.utils.query_counter import statement_budget
 
 router = APIRouter(prefix="/api/v1/watchlist", tags=["Watchlist"])
 
 
-@router.get("", response_model=PaginatedResponse[WatchlistResponse])
+@router.get(
+    "",
+    response_model=PaginatedResponse[WatchlistResponse],
+    response_model_exclude_unset=True
+)
+@statement_budget(3)
 async def list_watchlist(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    symbol_prefix: Optional[str] = Query(None, min_length=1, max_length=50, description="Only tokens whose symbol starts with this"),
+    sort: WatchlistSort = Query("-created_at", description="-created_at, created_at or token_symbol"),
+    include_quotes: bool = Query(False, description="Embed the latest cached price, 24h change and volume"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    market_data: MarketDataClient = Depends(get_market_data_client)
 ):
-    """List user's watchlist with pagination."""
-    # Get total count
-    count_result = await db.execute(
-        select(func.count()).select_from(Watchlist).where(Watchlist.user_id == current_user.id)
+    """List user's watchlist with optional symbol prefix, sorting and pagination."""
+    count_query, page_query = watchlist_listing(
+        current_user.id, page=page, per_page=per_page, sort=sort, symbol_prefix=symbol_prefix
     )
+    
+    # Get total count
+    count_result = await db.execute(count_query)
     total = count_result.scalar()
     
     # Get paginated data
-    offset = (page - 1) * per_page
-    result = await db.execute(
-        select(Watchlist)
-        .where(Watchlist.user_id == current_user.id)
-        .order_by(Watchlist.created_at.desc())
-        .offset(offset)
-        .limit(per_page)
-    )
+    result = await db.execute(page_query)
     items = result.scalars().all()
+    data = [WatchlistResponse.model_validate(item) for item in items]
+    
+    if include_quotes:
+        # Release the pooled connection before a possible upstream wait
+        await db.close()
+        # One batched lookup for the whole page; cache misses share one upstream call
+        quotes = await market_data.get_quotes(item.token_symbol for item in data)
+        for item in data:
+            quote = quotes.get(item.token_symbol)
+            item.quote = QuoteResponse.model_validate(quote) if quote else None
     
     return paginated_response(
-        data=[WatchlistResponse.model_validate(item) for item in items],
+        data=data,
         page=page,
         per_page=per_page,
         total=total,
@@ -51,6 +70,7 @@ async def list_watchlist(
 
 
 @router.post("", response_model=StandardResponse[WatchlistResponse])
+@statement_budget(3)
 async def add_to_watchlist(
     item_data: WatchlistCreate,
     current_user: User = Depends(get_current_user),
@@ -64,14 +84,15 @@ async def add_to_watchlist(
     
     try:
         db.add(new_item)
+        await adjust_counters(db, current_user.id, watchlist=1)
         await db.commit()
-        await db.refresh(new_item)
     except IntegrityError:
         await db.rollback()
         return error_response(
             code="WATCHLIST_DUPLICATE",
             message="This token is already in your watchlist"
         )
+    popularity.watched.add(new_item.token_symbol)
     
     return success_response(
         data=WatchlistResponse.model_validate(new_item),
@@ -80,6 +101,7 @@ async def add_to_watchlist(
 
 
 @router.get("/{item_id}", response_model=StandardResponse[WatchlistResponse])
+@statement_budget(2)
 async def get_watchlist_item(
     item_id: UUID,
     current_user: User = Depends(get_current_user),
@@ -104,6 +126,7 @@ async def get_watchlist_item(
 
 
 @router.put("/{item_id}", response_model=StandardResponse[WatchlistResponse])
+@statement_budget(2)
 async def update_watchlist_item(
     item_id: UUID,
     item_data: WatchlistUpdate,
@@ -111,8 +134,19 @@ async def update_watchlist_item(
     db: AsyncSession = Depends(get_db)
 ):
     """Update watchlist item (notes only)."""
+    if item_data.notes is None:
+        statement = select(Watchlist)
+    else:
+        # Update notes with a single UPDATE ... RETURNING
+        statement = (
+            update(Watchlist)
+            .values(notes=item_data.notes)
+            .returning(Watchlist)
+            .execution_options(populate_existing=True)
+        )
+    
     result = await db.execute(
-        select(Watchlist).where(Watchlist.id == item_id, Watchlist.user_id == current_user.id)
+        statement.where(Watchlist.id == item_id, Watchlist.user_id == current_user.id)
     )
     item = result.scalar_one_or_none()
     
@@ -122,12 +156,7 @@ async def update_watchlist_item(
             message="Watchlist item not found"
         )
     
-    # Update notes
-    if item_data.notes is not None:
-        item.notes = item_data.notes
-    
     await db.commit()
-    await db.refresh(item)
     
     return success_response(
         data=WatchlistResponse.model_validate(item),
@@ -136,6 +165,7 @@ async def update_watchlist_item(
 
 
 @router.delete("/{item_id}", response_model=StandardResponse[dict])
+@statement_budget(3)
 async def remove_from_watchlist(
     item_id: UUID,
     current_user: User = Depends(get_current_user),
@@ -143,18 +173,21 @@ async def remove_from_watchlist(
 ):
     """Remove item from watchlist."""
     result = await db.execute(
-        select(Watchlist).where(Watchlist.id == item_id, Watchlist.user_id == current_user.id)
+        delete(Watchlist)
+        .where(Watchlist.id == item_id, Watchlist.user_id == current_user.id)
+        .returning(Watchlist.token_symbol)
     )
-    item = result.scalar_one_or_none()
+    token_symbol = result.scalar_one_or_none()
     
-    if not item:
+    if token_symbol is None:
         return error_response(
             code="WATCHLIST_ITEM_NOT_FOUND",
             message="Watchlist item not found"
         )
     
-    await db.delete(item)
+    await adjust_counters(db, current_user.id, watchlist=-1)
     await db.commit()
+    popularity.watched.add(token_symbol, -1)
     
     return success_response(
         data={"deleted": True},
@@ -1,14 +1,28 @@
 """Pydantic schemas for request/response validation."""
 from app.schemas.user import UserCreate, UserResponse, UserLogin
 from app.schemas.alert import AlertCreate, AlertUpdate, AlertResponse, AlertToggle
-from app.schemas.watchlist import WatchlistCreate, WatchlistUpdate, WatchlistResponse
+from app.schemas.alert_rule import (
+    RuleCondition, RuleGroup, AlertRuleCreate, AlertRuleUpdate, AlertRuleResponse
+)
+from app.schemas.watchlist import WatchlistCreate, WatchlistUpdate, WatchlistResponse, QuoteResponse
 from app.schemas.auth import Token, TokenData, RefreshToken
+from app.schemas.dashboard import RecentTrigger, DashboardSummary
+from app.schemas.trending import TokenCount, TrendingTokens
+from app.schemas.live_prices import PriceSubscription
+from app.schemas.backtest import SeriesUpload, BacktestRequest, BacktestResult, SeriesSummary, BacktestReport
+from app.schemas.admin import ProfilerSettings
 from app.schemas.responses import StandardResponse, PaginatedResponse
 
 __all__ = [
     "UserCreate", "UserResponse", "UserLogin",
     "AlertCreate", "AlertUpdate", "AlertResponse", "AlertToggle",
-    "WatchlistCreate", "WatchlistUpdate", "WatchlistResponse",
+    "RuleCondition", "RuleGroup", "AlertRuleCreate", "AlertRuleUpdate", "AlertRuleResponse",
+    "WatchlistCreate", "WatchlistUpdate", "WatchlistResponse", "QuoteResponse",
     "Token", "TokenData", "RefreshToken",
+    "RecentTrigger", "DashboardSummary",
+    "TokenCount", "TrendingTokens",
+    "PriceSubscription",
+    "SeriesUpload", "BacktestRequest", "BacktestResult", "SeriesSummary", "BacktestReport",
+    "ProfilerSettings",
     "StandardResponse", "PaginatedResponse"
 ]
@@ -0,0 +1,9 @@
+"""Admin schemas for validation."""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class ProfilerSettings(BaseModel):
+    """Schema for changing which requests are profiled."""
+    sample_rate: Optional[float] = Field(None, ge=0, le=1)
+    routes: Optional[List[str]] = None
@@ -1,11 +1,22 @@
 """Alert schemas for validation."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 from uuid import UUID
 from typing import Optional
 from decimal import Decimal
 from app.models.alert import AlertType, AlertCondition
 
+MAX_WINDOW_MINUTES = 1440
+
+
+def window_error(condition: Optional[AlertCondition], window_minutes: Optional[int]) -> Optional[str]:
+    """Why a condition/window combination is invalid, or None when it is fine."""
+    if condition == AlertCondition.MOVED and window_minutes is None:
+        return "window_minutes is required for the moved condition"
+    if condition != AlertCondition.MOVED and window_minutes is not None:
+        return "window_minutes is only allowed with the moved condition"
+    return None
+
 
 class AlertCreate(BaseModel):
     """Schema for creating an alert."""
@@ -14,7 +25,16 @@ class AlertCreate(BaseModel):
     alert_type: AlertType
     condition: AlertCondition
     threshold_value: Decimal = Field(..., gt=0)
+    window_minutes: Optional[int] = Field(None, ge=1, le=MAX_WINDOW_MINUTES)
     is_active: bool = True
+    
+    @model_validator(mode="after")
+    def validate_window(self):
+        """Require a window exactly for percent-move alerts."""
+        error = window_error(self.condition, self.window_minutes)
+        if error:
+            raise ValueError(error)
+        return self
 
 
 class AlertUpdate(BaseModel):
@@ -24,6 +44,7 @@ class AlertUpdate(BaseModel):
     alert_type: Optional[AlertType] = None
     condition: Optional[AlertCondition] = None
     threshold_value: Optional[Decimal] = Field(None, gt=0)
+    window_minutes: Optional[int] = Field(None, ge=1, le=MAX_WINDOW_MINUTES)
     is_active: Optional[bool] = None
 
 
@@ -41,10 +62,12 @@ class AlertResponse(BaseModel):
     alert_type: AlertType
     condition: AlertCondition
     threshold_value: Decimal
+    window_minutes: Optional[int] = None
     is_active: bool
     triggered_at: Optional[datetime]
     created_at: datetime
     updated_at: datetime
+    archived_at: Optional[datetime] = None  # only sent when archived alerts are requested
     
     class Config:
         from_attributes = True
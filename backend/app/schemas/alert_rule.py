@@ -0,0 +1,102 @@
+"""Compound alert rule schemas for validation."""
+from pydantic import BaseModel, Field, field_validator, model_validator
+from datetime import datetime
+from uuid import UUID
+from typing import List, Literal, Optional, Union
+from decimal import Decimal
+from app.models.alert import AlertType, AlertCondition
+from app.schemas.alert import MAX_WINDOW_MINUTES, window_error
+
+MAX_RULE_DEPTH = 4
+MAX_RULE_CONDITIONS = 16
+
+
+class RuleCondition(BaseModel):
+    """Schema for one primitive condition of a rule."""
+    alert_type: AlertType
+    condition: AlertCondition
+    threshold_value: Decimal = Field(..., gt=0)
+    window_minutes: Optional[int] = Field(None, ge=1, le=MAX_WINDOW_MINUTES)
+
+    @model_validator(mode="after")
+    def validate_window(self):
+        """Require a window exactly for percent-move conditions."""
+        error = window_error(self.condition, self.window_minutes)
+        if error:
+            raise ValueError(error)
+        return self
+
+
+class RuleGroup(BaseModel):
+    """Schema for an AND/OR group of conditions or nested groups."""
+    op: Literal["and", "or"]
+    conditions: List[Union["RuleGroup", RuleCondition]] = Field(..., min_length=2)
+
+
+RuleGroup.model_rebuild()
+
+
+def _measure(node: Union[RuleGroup, RuleCondition], depth: int = 1) -> tuple:
+    """(depth, number of primitive conditions) of an expression."""
+    if isinstance(node, RuleCondition):
+        return depth - 1, 1
+    measured = [_measure(child, depth + 1) for child in node.conditions]
+    return max(d for d, _ in measured), sum(n for _, n in measured)
+
+
+def _validate_expression(expression: Optional[RuleGroup]) -> Optional[RuleGroup]:
+    if expression is None:
+        return expression
+    depth, count = _measure(expression)
+    if depth > MAX_RULE_DEPTH:
+        raise ValueError(f"Rules may nest at most {MAX_RULE_DEPTH} groups deep")
+    if count > MAX_RULE_CONDITIONS:
+        raise ValueError(f"Rules may have at most {MAX_RULE_CONDITIONS} conditions")
+    return expression
+
+
+class AlertRuleCreate(BaseModel):
+    """Schema for creating a compound alert rule."""
+    name: Optional[str] = Field(None, max_length=100)
+    token_symbol: str = Field(..., min_length=1, max_length=50)
+    token_address: Optional[str] = Field(None, max_length=255)
+    expression: RuleGroup
+    is_active: bool = True
+
+    @field_validator("expression")
+    @classmethod
+    def validate_expression_size(cls, v):
+        """Bound rule depth and size."""
+        return _validate_expression(v)
+
+
+class AlertRuleUpdate(BaseModel):
+    """Schema for updating a compound alert rule."""
+    name: Optional[str] = Field(None, max_length=100)
+    token_symbol: Optional[str] = Field(None, min_length=1, max_length=50)
+    token_address: Optional[str] = Field(None, max_length=255)
+    expression: Optional[RuleGroup] = None
+    is_active: Optional[bool] = None
+
+    @field_validator("expression")
+    @classmethod
+    def validate_expression_size(cls, v):
+        """Bound rule depth and size."""
+        return _validate_expression(v)
+
+
+class AlertRuleResponse(BaseModel):
+    """Schema for compound alert rule response."""
+    id: UUID
+    user_id: UUID
+    name: Optional[str]
+    token_symbol: str
+    token_address: Optional[str]
+    expression: RuleGroup
+    is_active: bool
+    triggered_at: Optional[datetime]
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,68 @@
+"""Backtest schemas for validation."""
+from pydantic import BaseModel, Field, model_validator
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+from typing import List, Optional
+from app.config import settings
+from app.models.alert import AlertType, AlertCondition
+from app.schemas.alert import AlertCreate
+
+
+class SeriesUpload(BaseModel):
+    """Schema for a historical series sent with a backtest (columnar, UTC epoch seconds)."""
+    timestamps: List[float] = Field(..., min_length=1, max_length=settings.BACKTEST_MAX_POINTS)
+    price: Optional[List[float]] = None
+    volume: Optional[List[float]] = None
+    holder: Optional[List[float]] = None
+    liquidity: Optional[List[float]] = None
+
+
+class BacktestRequest(BaseModel):
+    """Schema for a backtest: a proposed alert, or the user's alerts (on one token or all)."""
+    alert: Optional[AlertCreate] = None
+    token_symbol: Optional[str] = Field(None, min_length=1, max_length=50)
+    series: Optional[SeriesUpload] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def validate_target(self):
+        """An uploaded series belongs to exactly one token."""
+        if self.alert is not None and self.token_symbol is not None and self.alert.token_symbol != self.token_symbol:
+            raise ValueError("token_symbol must match the alert's token_symbol")
+        if self.series is not None and self.alert is None and self.token_symbol is None:
+            raise ValueError("token_symbol is required with an uploaded series")
+        return self
+
+
+class BacktestResult(BaseModel):
+    """Schema for how often one alert would have fired over a series."""
+    alert_id: Optional[UUID]  # None for the proposed alert
+    token_symbol: str
+    alert_type: AlertType
+    condition: AlertCondition
+    threshold_value: Decimal
+    window_minutes: Optional[int]
+    fires: int
+    matched_points: int
+    first_triggered_at: Optional[datetime]
+    first_observed_value: Optional[float]
+    last_triggered_at: Optional[datetime]
+
+
+class SeriesSummary(BaseModel):
+    """Schema for a replayed series."""
+    token_symbol: str
+    points: int
+    start: Optional[datetime]
+    end: Optional[datetime]
+    source: str  # "upload" or "store"
+
+
+class BacktestReport(BaseModel):
+    """Schema for the backtest response."""
+    results: List[BacktestResult]
+    series: List[SeriesSummary]
+    missing_series: List[str]
+    truncated: bool
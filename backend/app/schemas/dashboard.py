@@ -0,0 +1,26 @@
+"""Dashboard schemas for validation."""
+from pydantic import BaseModel
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+from typing import List, Optional
+from app.models.alert import AlertType, AlertCondition
+
+
+class RecentTrigger(BaseModel):
+    """Schema for a recently triggered alert."""
+    alert_id: UUID
+    token_symbol: str
+    alert_type: AlertType
+    condition: AlertCondition
+    threshold_value: Decimal
+    observed_value: Optional[Decimal]
+    triggered_at: datetime
+
+
+class DashboardSummary(BaseModel):
+    """Schema for the dashboard summary response."""
+    active_alert_count: int
+    triggered_last_24h: int
+    watchlist_count: int
+    recent_triggers: List[RecentTrigger]
@@ -0,0 +1,12 @@
+"""Live price subscription schemas for validation."""
+from pydantic import BaseModel, Field, StringConstraints
+from typing import List, Literal
+from typing_extensions import Annotated
+
+Symbol = Annotated[str, StringConstraints(min_length=1, max_length=50)]
+
+
+class PriceSubscription(BaseModel):
+    """Schema for a client message changing its live price subscriptions."""
+    action: Literal["subscribe", "unsubscribe"]
+    symbols: List[Symbol] = Field(..., min_length=1, max_length=100)
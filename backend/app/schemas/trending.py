@@ -0,0 +1,17 @@
+"""Trending token schemas for validation."""
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+
+class TokenCount(BaseModel):
+    """Schema for a token and how many users track it."""
+    token_symbol: str
+    count: int
+
+
+class TrendingTokens(BaseModel):
+    """Schema for the most watched and most alerted tokens."""
+    most_watched: List[TokenCount]
+    most_alerted: List[TokenCount]
+    reconciled_at: Optional[datetime]
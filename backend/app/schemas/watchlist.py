@@ -3,6 +3,7 @@ from pydantic import BaseModel, Field
 from datetime import datetime
 from uuid import UUID
 from typing import Optional
+from decimal import Decimal
 
 
 class WatchlistCreate(BaseModel):
@@ -17,6 +18,17 @@ class WatchlistUpdate(BaseModel):
     notes: Optional[str] = Field(None, max_length=5000)
 
 
+class QuoteResponse(BaseModel):
+    """Schema for the latest market data of a token."""
+    price: Optional[Decimal]
+    change_24h: Optional[Decimal]
+    volume_24h: Optional[Decimal]
+    as_of: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 class WatchlistResponse(BaseModel):
     """Schema for watchlist response."""
     id: UUID
@@ -25,6 +37,7 @@ class WatchlistResponse(BaseModel):
     token_address: Optional[str]
     notes: Optional[str]
     created_at: datetime
+    quote: Optional[QuoteResponse] = None  # only sent when quotes are requested
     
     class Config:
         from_attributes = True
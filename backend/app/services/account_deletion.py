@@ -0,0 +1,119 @@
+"""Account deletion: tombstone on request, purge in background batches."""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.models.user import User
+from app.models.alert import Alert
+from app.models.alert_archive import ArchivedAlert
+from app.models.alert_rule import AlertRule
+from app.models.watchlist import Watchlist
+from app.models.notification import NotificationOutbox
+from app.models.refresh_token import RefreshTokenRecord
+from app.services.popularity import popularity
+
+logger = logging.getLogger(__name__)
+
+# Child tables purged in chunks before the user row. Anything not listed
+# here is removed by the ON DELETE CASCADE foreign keys with the user row.
+PURGE_ORDER = (NotificationOutbox, RefreshTokenRecord, ArchivedAlert, AlertRule, Alert, Watchlist)
+
+
+def tombstone_email(user_id: UUID) -> str:
+    """Unique placeholder address a deleted account holds until it is purged."""
+    return f"deleted+{user_id}@invalid"
+
+
+async def request_account_deletion(db: AsyncSession, user_id: UUID) -> None:
+    """Tombstone a user; authentication rejects them from now on.
+
+    The email is rewritten on the tombstone, so it can be registered
+    again right away rather than once the purge has run.
+    """
+    await db.execute(
+        update(User)
+        .where(User.id == user_id, User.deleted_at.is_(None))
+        .values(deleted_at=datetime.utcnow(), email=tombstone_email(user_id))
+    )
+    await db.commit()
+
+
+async def purge_user(
+    session_factory: async_sessionmaker,
+    user_id: UUID,
+    batch_size: Optional[int] = None
+) -> int:
+    """Delete a tombstoned user's rows in short, fixed-size transactions.
+
+    Each chunk deletes at most `batch_size` rows by primary key and commits,
+    so no single transaction holds locks or a pooled connection for long
+    and memory use does not depend on account size. Safe to re-run after a
+    crash: it simply continues with whatever rows are left.
+    """
+    batch_size = batch_size or settings.ACCOUNT_PURGE_BATCH_SIZE
+    deleted = 0
+
+    async with session_factory() as session:
+        result = await session.execute(
+            select(User.id).where(User.id == user_id, User.deleted_at.is_not(None))
+        )
+        if result.scalar_one_or_none() is None:
+            return 0
+
+    # Deleted watchlist entries and alerts leave the trending counts
+    popularity_counters = {Watchlist: popularity.watched, Alert: popularity.alerted}
+
+    for model in PURGE_ORDER:
+        counter = popularity_counters.get(model)
+        while True:
+            async with session_factory() as session:
+                chunk = select(model.id).where(model.user_id == user_id).limit(batch_size)
+                statement = (
+                    delete(model)
+                    .where(model.id.in_(chunk))
+                    .execution_options(synchronize_session=False)
+                )
+                if counter is None:
+                    result = await session.execute(statement)
+                    rowcount = result.rowcount
+                else:
+                    result = await session.execute(statement.returning(model.token_symbol))
+                    symbols = result.scalars().all()
+                    rowcount = len(symbols)
+                await session.commit()
+            if counter is not None:
+                for symbol in symbols:
+                    counter.add(symbol, -1)
+            deleted += rowcount
+            if rowcount < batch_size:
+                break
+            await asyncio.sleep(0)  # let request handlers run between chunks
+
+    async with session_factory() as session:
+        result = await session.execute(
+            delete(User)
+            .where(User.id == user_id, User.deleted_at.is_not(None))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    deleted += result.rowcount
+
+    logger.info("purged user %s (%d rows)", user_id, deleted)
+    return deleted
+
+
+async def purge_pending_deletions(session_factory: async_sessionmaker, limit: int = 100) -> int:
+    """Purge tombstoned users left over from interrupted background purges."""
+    async with session_factory() as session:
+        result = await session.execute(
+            select(User.id).where(User.deleted_at.is_not(None)).limit(limit)
+        )
+        user_ids = result.scalars().all()
+
+    for user_id in user_ids:
+        await purge_user(session_factory, user_id)
+    return len(user_ids)
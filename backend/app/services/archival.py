@@ -0,0 +1,102 @@
+"""Archival of cold alerts into `alerts_archive`."""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, insert, delete, literal, or_, and_
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import settings
+from app.models.alert import Alert
+from app.models.alert_archive import ArchivedAlert
+from app.services.popularity import popularity
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Columns copied verbatim from `alerts` to `alerts_archive`
+_COPIED = (
+    "id", "user_id", "token_symbol", "token_address", "alert_type", "condition",
+    "threshold_value", "window_minutes", "is_active", "triggered_at", "created_at", "updated_at",
+)
+
+
+def cold_alerts_filter(now: Optional[datetime] = None):
+    """Condition selecting alerts old enough to archive.
+
+    Triggered alerts go after ALERT_ARCHIVE_TRIGGERED_AFTER_DAYS, inactive
+    never-triggered ones after ALERT_ARCHIVE_INACTIVE_AFTER_DAYS without
+    changes. Active alerts are never archived.
+    """
+    now = now or datetime.utcnow()
+    triggered_before = now - timedelta(days=settings.ALERT_ARCHIVE_TRIGGERED_AFTER_DAYS)
+    inactive_before = now - timedelta(days=settings.ALERT_ARCHIVE_INACTIVE_AFTER_DAYS)
+    return and_(
+        Alert.is_active.is_(False),
+        Alert.updated_at < max(triggered_before, inactive_before),
+        or_(
+            and_(Alert.triggered_at.is_not(None), Alert.triggered_at < triggered_before),
+            and_(Alert.triggered_at.is_(None), Alert.updated_at < inactive_before),
+        ),
+    )
+
+
+async def archive_cold_alerts(
+    session_factory: async_sessionmaker,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> int:
+    """Move cold alerts to the archive in short, fixed-size transactions.
+
+    Each chunk copies up to `batch_size` rows with INSERT ... SELECT and
+    deletes them from `alerts` in the same transaction, so a row is always
+    in exactly one table. Interrupting a run loses nothing; the next run
+    continues with whatever is still cold. Returns the number of rows moved.
+    """
+    batch_size = batch_size or settings.ALERT_ARCHIVE_BATCH_SIZE
+    max_batches = max_batches or settings.ALERT_ARCHIVE_MAX_BATCHES
+    now = now or datetime.utcnow()
+    condition = cold_alerts_filter(now)
+    moved = 0
+
+    for _ in range(max_batches):
+        async with session_factory() as session:
+            result = await session.execute(
+                select(Alert.id)
+                .where(condition)
+                .order_by(Alert.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)  # rows being edited wait for the next run
+            )
+            ids = result.scalars().all()
+            if not ids:
+                break
+
+            columns = [getattr(Alert, name) for name in _COPIED]
+            await session.execute(
+                insert(ArchivedAlert).from_select(
+                    list(_COPIED) + ["archived_at"],
+                    select(*columns, literal(now, ArchivedAlert.archived_at.type)).where(Alert.id.in_(ids))
+                )
+            )
+            result = await session.execute(
+                delete(Alert)
+                .where(Alert.id.in_(ids))
+                .returning(Alert.token_symbol)
+                .execution_options(synchronize_session=False)
+            )
+            symbols = result.scalars().all()
+            await session.commit()
+
+        for symbol in symbols:
+            popularity.alerted.add(symbol, -1)
+
+        moved += len(ids)
+        metrics.counter("alerts_archived_total").inc(len(ids))
+        if len(ids) < batch_size:
+            break
+        await asyncio.sleep(0)  # let request handlers run between chunks
+
+    if moved:
+        logger.info("archived %d cold alerts", moved)
+    return moved
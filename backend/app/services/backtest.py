@@ -0,0 +1,347 @@
+"""Replay of historical metric series against alerts.
+
+Each alert is evaluated over the whole series at once with numpy: a
+comparison for above/below/equals, and for percent moves the window low
+and high of every point from a sparse table built one level at a time
+(O(n log w) time, O(n) memory). Regularly spaced series, such as minute
+bars, have windows of a fixed number of points and need only contiguous
+slices; irregular ones locate each window start with a binary search.
+Percent moves are computed once per metric and window and identical
+conditions once per series, like the live evaluator's plans. Values are
+compared as float64, so `equals` matches only exactly representable values.
+
+Series come from the request or from `BACKTEST_SERIES_DIR`, which holds
+one `<SYMBOL>.npz` per token with a `timestamps` array (UTC epoch
+seconds, increasing) and one array per metric (`price`, `volume`,
+`holder`, `liquidity`).
+"""
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.config import settings
+from app.models.alert import AlertType, AlertCondition
+from app.utils.metrics import metrics
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is in requirements.txt
+    np = None
+
+# Symbols that can name a file in the series directory
+_SAFE_SYMBOL = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9._-]*$")
+
+
+def available() -> bool:
+    """Whether backtesting can run in this worker."""
+    return np is not None
+
+
+class SeriesError(ValueError):
+    """A series that cannot be replayed."""
+
+
+@dataclass
+class Series:
+    """Historical values of one token: timestamps and one array per metric."""
+    symbol: str
+    timestamps: "np.ndarray"  # float64 UTC epoch seconds, increasing
+    values: Dict[AlertType, "np.ndarray"]  # float64, same length as timestamps
+    step: Optional[float] = None  # seconds between points, when regularly spaced
+
+    @classmethod
+    def from_arrays(cls, symbol: str, timestamps: Iterable[float], values: Dict[AlertType, Iterable[float]]) -> "Series":
+        """Validate and convert raw arrays."""
+        stamps = np.asarray(timestamps, dtype=np.float64)
+        if stamps.ndim != 1 or stamps.size == 0:
+            raise SeriesError("timestamps must be a non-empty list")
+        if stamps.size > settings.BACKTEST_MAX_POINTS:
+            raise SeriesError(f"series longer than {settings.BACKTEST_MAX_POINTS} points")
+        step = None
+        if stamps.size > 1:
+            gaps = np.diff(stamps)
+            if not np.all(gaps > 0):
+                raise SeriesError("timestamps must be strictly increasing")
+            if np.all(gaps == gaps[0]):
+                step = float(gaps[0])
+        arrays = {}
+        for alert_type, column in values.items():
+            array = np.asarray(column, dtype=np.float64)
+            if array.shape != stamps.shape:
+                raise SeriesError(f"{alert_type.value} must have one value per timestamp")
+            arrays[alert_type] = array
+        return cls(symbol, stamps, arrays, step)
+
+    def between(self, start: Optional[datetime], end: Optional[datetime]) -> "Series":
+        """The part of the series within [start, end] (naive datetimes are UTC)."""
+        low = 0 if start is None else np.searchsorted(self.timestamps, _epoch(start), side="left")
+        high = self.timestamps.size if end is None else np.searchsorted(self.timestamps, _epoch(end), side="right")
+        if low == 0 and high == self.timestamps.size:
+            return self
+        return Series(self.symbol, self.timestamps[low:high], {t: v[low:high] for t, v in self.values.items()}, self.step)
+
+
+def _epoch(moment: datetime) -> float:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - datetime(1970, 1, 1)).total_seconds()
+
+
+def _moment(epoch: float) -> datetime:
+    return datetime.utcfromtimestamp(float(epoch))
+
+
+class SeriesStore:
+    """Series files of a directory, the most recently used kept in memory."""
+
+    def __init__(self, directory: Optional[str] = None, max_series: Optional[int] = None):
+        self.directory = Path(directory or settings.BACKTEST_SERIES_DIR)
+        self.max_series = max_series or settings.BACKTEST_CACHE_MAX_SERIES
+        self._cache: "OrderedDict[str, Tuple[float, Series]]" = OrderedDict()
+        self._lock = threading.Lock()  # loads run in the thread pool
+
+    def load(self, symbol: str) -> Optional[Series]:
+        """The stored series of a token, or None."""
+        if not _SAFE_SYMBOL.match(symbol):
+            return None
+        path = self.directory / f"{symbol}.npz"
+        try:
+            modified = path.stat().st_mtime
+        except OSError:
+            return None
+
+        with self._lock:
+            cached = self._cache.get(symbol)
+            if cached is not None and cached[0] == modified:
+                self._cache.move_to_end(symbol)
+                return cached[1]
+
+        try:
+            with np.load(path) as data:
+                values = {t: data[t.value] for t in AlertType if t.value in data.files}
+                series = Series.from_arrays(symbol, data["timestamps"], values)
+        except SeriesError as exc:
+            raise SeriesError(f"stored series of {symbol}: {exc}") from exc
+        except (OSError, KeyError, ValueError) as exc:
+            raise SeriesError(f"stored series of {symbol} is unreadable") from exc
+        metrics.counter("backtest_series_loaded_total").inc()
+
+        with self._lock:
+            self._cache[symbol] = (modified, series)
+            self._cache.move_to_end(symbol)
+            while len(self._cache) > self.max_series:
+                self._cache.popitem(last=False)
+        return series
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+# Stored series of this worker
+series_store = SeriesStore()
+
+
+def window_extrema(
+    timestamps: "np.ndarray",
+    values: "np.ndarray",
+    seconds: float,
+    step: Optional[float] = None
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Min and max of `values` over the `seconds` up to and including each point.
+
+    A point's window starts at the first value no older than `seconds`,
+    as in the live sliding windows. Level k of a sparse table holds the
+    extrema of every run of 2**k values; each point is answered from the
+    level that fits its window, two overlapping runs covering it exactly.
+    Levels are built and consumed in turn, so only one is kept at a time.
+    With a regular `step` every window has the same number of points.
+    """
+    if step is not None:
+        return _fixed_extrema(values, int(seconds // step) + 1)
+
+    n = values.size
+    ends = np.arange(n)
+    starts = np.searchsorted(timestamps, timestamps - seconds, side="left")
+    lengths = ends - starts + 1
+    levels = np.floor(np.log2(lengths)).astype(np.int64)
+    longest = lengths.max()
+    lows = np.empty(n)
+    highs = np.empty(n)
+
+    level_min, level_max = values, values
+    span, level = 1, 0
+    while True:
+        selected = np.flatnonzero(levels == level)
+        if selected.size:
+            left, right = starts[selected], selected - span + 1
+            lows[selected] = np.minimum(level_min[left], level_min[right])
+            highs[selected] = np.maximum(level_max[left], level_max[right])
+        if 2 * span > longest:
+            break
+        level_min = np.minimum(level_min[:-span], level_min[span:])
+        level_max = np.maximum(level_max[:-span], level_max[span:])
+        span, level = 2 * span, level + 1
+    return lows, highs
+
+
+def _fixed_extrema(values: "np.ndarray", count: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """`window_extrema` over the last `count` points: one sparse-table level, no gathers."""
+    n = values.size
+    count = min(count, n)
+    level_min, level_max = values, values
+    span = 1
+    while 2 * span <= count:
+        level_min = np.minimum(level_min[:-span], level_min[span:])
+        level_max = np.maximum(level_max[:-span], level_max[span:])
+        span *= 2
+
+    lows = np.empty(n)
+    highs = np.empty(n)
+    # Full windows: the runs starting at i - count + 1 and at i - span + 1
+    np.minimum(level_min[:n - count + 1], level_min[count - span:], out=lows[count - 1:])
+    np.maximum(level_max[:n - count + 1], level_max[count - span:], out=highs[count - 1:])
+    # The first points see everything before them
+    np.minimum.accumulate(values[:count - 1], out=lows[:count - 1])
+    np.maximum.accumulate(values[:count - 1], out=highs[:count - 1])
+    return lows, highs
+
+
+def _percent_move(current: "np.ndarray", low: "np.ndarray", high: "np.ndarray") -> "np.ndarray":
+    """Vectorized `app.services.windows.percent_move`."""
+    move = np.zeros(current.size)
+    fall = np.zeros(current.size)
+    np.divide(current - low, low, out=move, where=low > 0)
+    np.divide(high - current, high, out=fall, where=high > 0)
+    np.maximum(move, fall, out=move)
+    move *= 100
+    return move
+
+
+@dataclass(frozen=True)
+class Condition:
+    """What an alert checks; equal conditions are evaluated once per series."""
+    alert_type: AlertType
+    condition: AlertCondition
+    threshold: Decimal
+    window_minutes: Optional[int] = None
+
+
+class Replay:
+    """Evaluates conditions against one series, sharing matches and percent moves."""
+
+    def __init__(self, series: Series):
+        self.series = series
+        self._matches: Dict[Condition, Optional["np.ndarray"]] = {}
+        self._moves: Dict[Tuple[AlertType, int], "np.ndarray"] = {}
+
+    def matches(self, condition: Condition) -> Optional["np.ndarray"]:
+        """Boolean array of the points where the condition holds; None without that metric."""
+        if condition not in self._matches:
+            self._matches[condition] = self._evaluate(condition)
+        return self._matches[condition]
+
+    def _evaluate(self, condition: Condition) -> Optional["np.ndarray"]:
+        values = self.series.values.get(condition.alert_type)
+        if values is None:
+            return None
+        threshold = float(condition.threshold)
+        if condition.condition == AlertCondition.ABOVE:
+            return values > threshold
+        if condition.condition == AlertCondition.BELOW:
+            return values < threshold
+        if condition.condition == AlertCondition.EQUALS:
+            return values == threshold
+
+        key = (condition.alert_type, condition.window_minutes)
+        if key not in self._moves:
+            low, high = window_extrema(
+                self.series.timestamps, values, condition.window_minutes * 60, self.series.step
+            )
+            self._moves[key] = _percent_move(values, low, high)
+        return self._moves[key] >= threshold
+
+    @staticmethod
+    def empty() -> Dict[str, Any]:
+        """Summary of a condition that never held."""
+        return {"fires": 0, "matched_points": 0, "first_triggered_at": None,
+                "first_observed_value": None, "last_triggered_at": None}
+
+    def summarize(self, condition: Condition) -> Dict[str, Any]:
+        """How often the condition would have fired over the series.
+
+        `fires` counts the times it became true (as if the alert re-armed
+        after each trigger); `matched_points` the points where it held.
+        """
+        matched = self.matches(condition)
+        if matched is None or not matched.any():
+            return self.empty()
+        edges = np.flatnonzero(matched & ~np.concatenate(([False], matched[:-1])))
+        values = self.series.values[condition.alert_type]
+        return {
+            "fires": int(edges.size),
+            "matched_points": int(np.count_nonzero(matched)),
+            "first_triggered_at": _moment(self.series.timestamps[edges[0]]),
+            "first_observed_value": float(values[edges[0]]),
+            "last_triggered_at": _moment(self.series.timestamps[edges[-1]]),
+        }
+
+
+def backtest(series: Series, targets: Iterable[Tuple[Any, Condition]]) -> List[Tuple[Any, Dict[str, Any]]]:
+    """Summaries of every (target, condition) over one series, in order."""
+    replay = Replay(series)
+    return [(target, replay.summarize(condition)) for target, condition in targets]
+
+
+@dataclass(frozen=True)
+class Target:
+    """An alert to replay: a saved one (with its id) or a proposed one (id None)."""
+    alert_id: Any
+    token_symbol: str
+    condition: Condition
+
+
+def run_backtest(
+    targets: List[Target],
+    uploaded: Optional[Series] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    store: Optional[SeriesStore] = None
+) -> Tuple[List[Tuple[Target, Dict[str, Any]]], List[Dict[str, Any]], List[str]]:
+    """Replay targets against the uploaded series or their tokens' stored ones.
+
+    Returns (target summaries, replayed series, tokens without a series).
+    CPU-bound; the endpoint runs it in the thread pool.
+    """
+    store = store or series_store
+    by_symbol: "OrderedDict[str, List[Target]]" = OrderedDict()
+    for target in targets:
+        by_symbol.setdefault(target.token_symbol, []).append(target)
+
+    results, replayed, missing = [], [], []
+    for symbol, symbol_targets in by_symbol.items():
+        if uploaded is not None and uploaded.symbol == symbol:
+            series, source = uploaded, "upload"
+        else:
+            series, source = store.load(symbol), "store"
+        if series is None:
+            missing.append(symbol)
+            continue
+        series = series.between(start, end)
+        points = series.timestamps.size
+        replayed.append({
+            "token_symbol": symbol,
+            "points": points,
+            "start": _moment(series.timestamps[0]) if points else None,
+            "end": _moment(series.timestamps[-1]) if points else None,
+            "source": source,
+        })
+        if points:
+            results.extend(backtest(series, ((target, target.condition) for target in symbol_targets)))
+        else:
+            results.extend((target, Replay.empty()) for target in symbol_targets)
+    return results, replayed, missing
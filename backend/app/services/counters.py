@@ -0,0 +1,187 @@
+"""Maintenance of per-user dashboard counters."""
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Optional
+from uuid import UUID
+from sqlalchemy import select, update, func, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.models.alert import Alert
+from app.models.alert_archive import ArchivedAlert
+from app.models.user import User
+from app.models.watchlist import Watchlist
+from app.models.user_stats import UserStats
+
+RECENT_TRIGGERS_LIMIT = 10
+TRIGGER_WINDOW = timedelta(hours=24)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _hour_bucket(moment: datetime) -> int:
+    """Start of the hour containing naive-UTC `moment`, as epoch seconds."""
+    return int((moment.replace(minute=0, second=0, microsecond=0) - _EPOCH).total_seconds())
+
+
+async def adjust_counters(
+    db: AsyncSession,
+    user_id: UUID,
+    *,
+    active_alerts: int = 0,
+    watchlist: int = 0
+) -> None:
+    """Apply counter deltas in the caller's transaction (one UPDATE).
+
+    Users without a counters row yet are skipped; their row is rebuilt
+    from the tables by `reconcile_user_stats` on first read.
+    """
+    values = {}
+    if active_alerts:
+        values["active_alert_count"] = UserStats.active_alert_count + active_alerts
+    if watchlist:
+        values["watchlist_count"] = UserStats.watchlist_count + watchlist
+    if not values:
+        return
+
+    await db.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_trigger(stats: UserStats, alert: Alert, observed_value: Decimal, now: datetime) -> None:
+    """Count a triggered alert on a loaded counters row."""
+    cutoff = _hour_bucket(now - TRIGGER_WINDOW)
+    bucket = str(_hour_bucket(now))
+    buckets = {k: v for k, v in (stats.trigger_buckets or {}).items() if int(k) > cutoff}
+    buckets[bucket] = buckets.get(bucket, 0) + 1
+
+    entry = {
+        "alert_id": str(alert.id),
+        "token_symbol": alert.token_symbol,
+        "alert_type": alert.alert_type.value,
+        "condition": alert.condition.value,
+        "threshold_value": str(alert.threshold_value),
+        "observed_value": str(observed_value),
+        "triggered_at": now.isoformat(),
+    }
+
+    # Assign new objects so the JSON columns are detected as changed
+    stats.trigger_buckets = buckets
+    stats.recent_triggers = ([entry] + list(stats.recent_triggers or []))[:RECENT_TRIGGERS_LIMIT]
+
+
+def triggered_since(stats: UserStats, now: Optional[datetime] = None) -> int:
+    """Number of triggers in the last 24 hours (hour granularity)."""
+    cutoff = _hour_bucket((now or datetime.utcnow()) - TRIGGER_WINDOW)
+    return sum(count for hour, count in (stats.trigger_buckets or {}).items() if int(hour) > cutoff)
+
+
+def _triggered_alerts(user_id: UUID):
+    """Triggered alerts of a user, live and archived."""
+    def triggered(table):
+        return select(
+            table.id, table.token_symbol, table.alert_type, table.condition,
+            table.threshold_value, table.triggered_at
+        ).where(table.user_id == user_id, table.triggered_at.is_not(None))
+    return union_all(triggered(Alert), triggered(ArchivedAlert)).subquery()
+
+
+def _trigger_key(entry: dict):
+    return entry["alert_id"], datetime.fromisoformat(entry["triggered_at"])
+
+
+async def reconcile_user_stats(db: AsyncSession, user_id: UUID) -> UserStats:
+    """Rebuild a user's counters from the alert, archive and watchlist tables.
+
+    The counters row is locked before counting, so a concurrent
+    `adjust_counters` delta or evaluator trigger either commits before the
+    counts are taken or waits and applies on top of them. Recorded
+    triggers are kept (they carry the observed value and earlier triggers
+    of re-armed alerts) and merged with those rebuilt from the tables.
+    """
+    now = datetime.utcnow()
+
+    stats = (await db.execute(
+        select(UserStats).where(UserStats.user_id == user_id).with_for_update()
+    )).scalar_one_or_none()
+
+    active = await db.execute(
+        select(func.count()).select_from(Alert)
+        .where(Alert.user_id == user_id, Alert.is_active.is_(True))
+    )
+    watchlist = await db.execute(
+        select(func.count()).select_from(Watchlist).where(Watchlist.user_id == user_id)
+    )
+    triggered = _triggered_alerts(user_id)
+    recent = await db.execute(
+        select(triggered)
+        .order_by(triggered.c.triggered_at.desc())
+        .limit(RECENT_TRIGGERS_LIMIT)
+    )
+    in_window = await db.execute(
+        select(triggered.c.triggered_at).where(triggered.c.triggered_at >= now - TRIGGER_WINDOW)
+    )
+
+    buckets: Dict[str, int] = {}
+    for (triggered_at,) in in_window.all():
+        key = str(_hour_bucket(triggered_at))
+        buckets[key] = buckets.get(key, 0) + 1
+
+    entries = {}
+    for alert in recent.all():
+        entry = {
+            "alert_id": str(alert.id),
+            "token_symbol": alert.token_symbol,
+            "alert_type": alert.alert_type.value,
+            "condition": alert.condition.value,
+            "threshold_value": str(alert.threshold_value),
+            "observed_value": None,
+            "triggered_at": alert.triggered_at.isoformat(),
+        }
+        entries[_trigger_key(entry)] = entry
+    if stats is not None:
+        for entry in stats.recent_triggers or []:
+            entries[_trigger_key(entry)] = entry
+    recent_triggers = [
+        entries[key]
+        for key in sorted(entries, key=lambda key: key[1], reverse=True)[:RECENT_TRIGGERS_LIMIT]
+    ]
+
+    if stats is None:
+        stats = UserStats(user_id=user_id)
+        db.add(stats)
+    stats.active_alert_count = active.scalar()
+    stats.watchlist_count = watchlist.scalar()
+    stats.trigger_buckets = buckets
+    stats.recent_triggers = recent_triggers
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request created the row first; use theirs
+        await db.rollback()
+        stats = await db.get(UserStats, user_id)
+
+    return stats
+
+
+async def reconcile_all_user_stats(session_factory: async_sessionmaker, batch_size: int = 500) -> int:
+    """Rebuild counters for every live user, walking users in id order."""
+    last_id = None
+    count = 0
+    while True:
+        async with session_factory() as session:
+            query = select(User.id).where(User.deleted_at.is_(None)).order_by(User.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(User.id > last_id)
+            user_ids = (await session.execute(query)).scalars().all()
+            for user_id in user_ids:
+                await reconcile_user_stats(session, user_id)
+        if not user_ids:
+            return count
+        count += len(user_ids)
+        last_id = user_ids[-1]
+        await asyncio.sleep(0)  # let request handlers run between batches
@@ -0,0 +1,262 @@
+"""Alert evaluation service."""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Union
+from sqlalchemy import select, union, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.alert import Alert, AlertType
+from app.models.alert_rule import AlertRule
+from app.models.notification import NotificationOutbox
+from app.models.user_stats import UserStats
+from app.services.counters import record_trigger
+from app.services.market_data import MarketDataClient
+from app.services.quotes import Quote, quote_cache
+from app.services.rules import compile_plans, expression_types
+from app.services.windows import metric_windows
+
+# Observed metric values per token symbol, e.g. {"BTC": {AlertType.PRICE: Decimal("64000")}}
+TokenMetrics = Dict[str, Dict[AlertType, Decimal]]
+
+
+def trigger_alert(
+    db: AsyncSession,
+    alert: Alert,
+    observed_value: Decimal,
+    now: Optional[datetime] = None,
+    stats: Optional[UserStats] = None
+) -> NotificationOutbox:
+    """Mark an alert as triggered and enqueue its notification.
+
+    The outbox row (and the owner's dashboard counters, when `stats` is
+    given) change in the same session as the `triggered_at` update, so all
+    of them commit or roll back together. Delivery happens later in the
+    notification dispatcher.
+    """
+    now = now or datetime.utcnow()
+    if stats is not None:
+        if alert.is_active:
+            stats.active_alert_count -= 1
+        record_trigger(stats, alert, observed_value, now)
+    alert.triggered_at = now
+    alert.is_active = False
+
+    message = NotificationOutbox(
+        user_id=alert.user_id,
+        alert_id=alert.id,
+        kind="alert_triggered",
+        dedupe_key=f"alert_triggered:{alert.id}:{now.isoformat()}",
+        payload={
+            "alert_id": str(alert.id),
+            "token_symbol": alert.token_symbol,
+            "alert_type": alert.alert_type.value,
+            "condition": alert.condition.value,
+            "threshold_value": str(alert.threshold_value),
+            "observed_value": str(observed_value),
+            "triggered_at": now.isoformat(),
+        },
+        next_attempt_at=now,
+        created_at=now
+    )
+    db.add(message)
+    return message
+
+
+def trigger_rule(
+    db: AsyncSession,
+    rule: AlertRule,
+    observed: Dict[AlertType, Decimal],
+    now: Optional[datetime] = None
+) -> NotificationOutbox:
+    """Mark a compound rule as triggered and enqueue its notification."""
+    now = now or datetime.utcnow()
+    rule.triggered_at = now
+    rule.is_active = False
+
+    message = NotificationOutbox(
+        user_id=rule.user_id,
+        alert_id=None,
+        kind="rule_triggered",
+        dedupe_key=f"rule_triggered:{rule.id}:{now.isoformat()}",
+        payload={
+            "rule_id": str(rule.id),
+            "name": rule.name,
+            "token_symbol": rule.token_symbol,
+            "expression": rule.expression,
+            "observed_values": {
+                alert_type.value: str(observed[alert_type])
+                for alert_type in expression_types(rule.expression)
+                if alert_type in observed
+            },
+            "triggered_at": now.isoformat(),
+        },
+        next_attempt_at=now,
+        created_at=now
+    )
+    db.add(message)
+    return message
+
+
+def _observed_quote(symbol: str, values: Dict[AlertType, Decimal], now: datetime) -> Quote:
+    """Quote for observed values; what they lack is kept from the cached quote.
+
+    The kept 24h values are only as fresh as the cached quote, so the new
+    quote is stamped `now` only while that one is within
+    `QUOTE_MAX_AGE_SECONDS`. An older quote keeps its `as_of`, so readers
+    still treat it as stale and the market-data client revalidates it.
+    """
+    cached = quote_cache.get(symbol)
+    if cached is None:
+        return Quote(
+            symbol=symbol,
+            price=values[AlertType.PRICE],
+            change_24h=None,
+            volume_24h=values.get(AlertType.VOLUME),
+            as_of=now
+        )
+    fresh = cached.as_of >= now - timedelta(seconds=settings.QUOTE_MAX_AGE_SECONDS)
+    return Quote(
+        symbol=symbol,
+        price=values[AlertType.PRICE],
+        change_24h=cached.change_24h,
+        volume_24h=values.get(AlertType.VOLUME, cached.volume_24h),
+        as_of=now if fresh else cached.as_of
+    )
+
+
+async def _claim(db: AsyncSession, model, targets: List, now: datetime) -> Set:
+    """Deactivate the targets still active and return their ids.
+
+    The targets were loaded without a lock, so one may have been toggled
+    off (or triggered by another evaluator) since. The conditional UPDATE
+    only claims rows that are still active, and only claimed rows are
+    triggered, so an alert is never counted out of `active_alert_count`
+    twice. The loaded objects are left as they were: `trigger_alert` still
+    sees them active and sets the same values again.
+    """
+    result = await db.execute(
+        update(model)
+        .where(model.id.in_([target.id for target in targets]), model.is_active.is_(True))
+        .values(is_active=False, triggered_at=now)
+        .returning(model.id)
+        .execution_options(synchronize_session=False)
+    )
+    return set(result.scalars().all())
+
+
+async def evaluate_alerts(
+    db: AsyncSession,
+    metrics: TokenMetrics,
+    record_quotes: bool = False
+) -> List[Union[Alert, AlertRule]]:
+    """Evaluate active alerts and rules for the given tokens and trigger the matching ones.
+
+    Alerts and compound rules are compiled into one plan per token, so each
+    distinct condition is checked once per call. Plans are rebuilt from
+    the rows loaded on every call rather than cached: alerts change on any
+    worker while this runs on the leader, and the plan targets are the
+    rows triggered in this session. Compiling costs about as much as
+    loading the rows (~10 µs per alert). Observed values also feed
+    the sliding windows of `MOVED` conditions in this worker. Triggered
+    alerts, rules and their outbox rows are committed in one transaction.
+    Callers whose prices did not come from the market-data client (pushed
+    or replayed observations) pass `record_quotes=True` so they also
+    refresh the shared quote cache; `evaluate_market` leaves it off, since
+    its quotes are already cached.
+    """
+    if not metrics:
+        return []
+
+    now = datetime.utcnow()
+    if record_quotes:
+        quote_cache.put_many(
+            _observed_quote(symbol, values, now)
+            for symbol, values in metrics.items()
+            if AlertType.PRICE in values
+        )
+
+    symbols = list(metrics.keys())
+    alert_result = await db.execute(
+        select(Alert).where(Alert.is_active.is_(True), Alert.token_symbol.in_(symbols))
+    )
+    rule_result = await db.execute(
+        select(AlertRule).where(AlertRule.is_active.is_(True), AlertRule.token_symbol.in_(symbols))
+    )
+    plans = compile_plans(alert_result.scalars().all(), rule_result.scalars().all(), metric_windows)
+    for symbol, values in metrics.items():
+        metric_windows.observe(symbol, values)
+    metric_windows.prune()
+
+    matches = []
+    matched_rules = []
+    for symbol, plan in plans.items():
+        observed = metrics.get(symbol, {})
+        for target in plan.evaluate(observed, metric_windows):
+            if isinstance(target, AlertRule):
+                matched_rules.append((target, observed))
+            else:
+                matches.append((target, observed[target.alert_type]))
+
+    if matches:
+        claimed = await _claim(db, Alert, [alert for alert, _ in matches], now)
+        matches = [(alert, observed) for alert, observed in matches if alert.id in claimed]
+    if matched_rules:
+        claimed = await _claim(db, AlertRule, [rule for rule, _ in matched_rules], now)
+        matched_rules = [(rule, observed) for rule, observed in matched_rules if rule.id in claimed]
+
+    if not matches and not matched_rules:
+        await db.commit()
+        return []
+
+    stats_by_user = {}
+    if matches:
+        stats_result = await db.execute(
+            select(UserStats)
+            .where(UserStats.user_id.in_({alert.user_id for alert, _ in matches}))
+            .with_for_update()
+        )
+        stats_by_user = {stats.user_id: stats for stats in stats_result.scalars().all()}
+
+    triggered = []
+    for alert, observed in matches:
+        trigger_alert(db, alert, observed, now=now, stats=stats_by_user.get(alert.user_id))
+        triggered.append(alert)
+    for rule, observed in matched_rules:
+        trigger_rule(db, rule, observed, now=now)
+        triggered.append(rule)
+
+    await db.commit()
+
+    return triggered
+
+
+def quotes_to_metrics(quotes: Dict[str, Quote]) -> TokenMetrics:
+    """Convert market-data quotes into evaluator metrics."""
+    token_metrics: TokenMetrics = {}
+    for symbol, quote in quotes.items():
+        values = {}
+        if quote.price is not None:
+            values[AlertType.PRICE] = quote.price
+        if quote.volume_24h is not None:
+            values[AlertType.VOLUME] = quote.volume_24h
+        if values:
+            token_metrics[symbol] = values
+    return token_metrics
+
+
+async def evaluate_market(db: AsyncSession, market_data: MarketDataClient) -> List[Alert]:
+    """Fetch current quotes for every actively watched token and evaluate alerts."""
+    result = await db.execute(
+        union(
+            select(Alert.token_symbol).where(Alert.is_active.is_(True)),
+            select(AlertRule.token_symbol).where(AlertRule.is_active.is_(True))
+        )
+    )
+    symbols = result.scalars().all()
+    if not symbols:
+        return []
+
+    # End the read transaction before waiting on the upstream
+    await db.rollback()
+    quotes = await market_data.get_quotes(symbols)
+    return await evaluate_alerts(db, quotes_to_metrics(quotes))
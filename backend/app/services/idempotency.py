@@ -0,0 +1,244 @@
+"""Idempotency keys: replay the outcome of retried create/update requests.
+
+The first request with a key claims it with an insert into
+`idempotency_keys` and stores its response there when done, so a retry
+reaching any worker finds it. Completed responses are also kept in a
+bounded per-worker cache, so a retry to the same worker is answered
+without touching the database.
+"""
+import asyncio
+import enum
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Hashable, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, update, delete, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import settings
+from app.models.idempotency import IdempotencyRecord
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """A completed response as replayed to retries."""
+    request_hash: str
+    status_code: int
+    content_type: Optional[str]
+    body: bytes
+
+
+class ResponseCache:
+    """Completed responses by (user id, key), bounded to `max_entries`.
+
+    Least recently used entries go first and entries expire after
+    `ttl_seconds`; everything runs on the event loop, so no locking.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries or settings.IDEMPOTENCY_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.IDEMPOTENCY_TTL_SECONDS
+        self._entries: "OrderedDict[Hashable, Tuple[float, StoredResponse]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, key: Hashable, response: StoredResponse, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._entries[key] = (now + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires <= (time.monotonic() if now is None else now):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Replay cache of this worker
+response_cache = ResponseCache()
+
+
+class ClaimOutcome(str, enum.Enum):
+    """What to do with a request carrying an idempotency key."""
+    CLAIMED = "claimed"  # first use: run the request
+    REPLAY = "replay"  # completed before: send the stored response
+    IN_PROGRESS = "in_progress"  # another request with this key is still running
+    MISMATCH = "mismatch"  # the key was used for a different request
+
+
+def request_hash(method: str, path: str, query: bytes, body: bytes) -> str:
+    """Fingerprint of a request, so a key cannot be reused for another one."""
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _outcome(record: IdempotencyRecord, digest: str) -> Tuple[ClaimOutcome, Optional[StoredResponse]]:
+    if record.request_hash != digest:
+        return ClaimOutcome.MISMATCH, None
+    if record.status_code is None:
+        return ClaimOutcome.IN_PROGRESS, None
+    return ClaimOutcome.REPLAY, StoredResponse(
+        record.request_hash, record.status_code, record.content_type, record.response_body or b""
+    )
+
+
+async def claim_key(
+    session_factory: async_sessionmaker,
+    user_id: UUID,
+    key: str,
+    digest: str,
+    now: Optional[datetime] = None
+) -> Tuple[ClaimOutcome, Optional[StoredResponse]]:
+    """Claim a key for a new request, or find what became of its earlier use.
+
+    The insert is tried first, since most keys are fresh; a conflicting
+    row is read only when the key was seen before. Expired rows, and rows
+    whose request never finished within IDEMPOTENCY_LOCK_SECONDS, are
+    taken over with a compare-and-set on `created_at`.
+    """
+    now = now or datetime.utcnow()
+    async with session_factory() as session:
+        session.add(IdempotencyRecord(
+            user_id=user_id,
+            key=key,
+            request_hash=digest,
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+        ))
+        try:
+            await session.commit()
+            return ClaimOutcome.CLAIMED, None
+        except IntegrityError:
+            await session.rollback()
+
+        result = await session.execute(
+            select(IdempotencyRecord).where(IdempotencyRecord.user_id == user_id, IdempotencyRecord.key == key)
+        )
+        record = result.scalar_one_or_none()
+        if record is None:
+            return ClaimOutcome.IN_PROGRESS, None  # purged in between; the client retries
+
+        abandoned = record.status_code is None and (
+            record.created_at <= now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+        )
+        if record.expires_at > now and not abandoned:
+            return _outcome(record, digest)
+
+        result = await session.execute(
+            update(IdempotencyRecord)
+            .where(
+                IdempotencyRecord.user_id == user_id,
+                IdempotencyRecord.key == key,
+                IdempotencyRecord.created_at == record.created_at
+            )
+            .values(
+                request_hash=digest,
+                status_code=None,
+                content_type=None,
+                response_body=None,
+                created_at=now,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        if result.rowcount == 1:
+            return ClaimOutcome.CLAIMED, None
+        return ClaimOutcome.IN_PROGRESS, None
+
+
+async def complete_key(
+    session_factory: async_sessionmaker,
+    user_id: UUID,
+    key: str,
+    response: StoredResponse
+) -> None:
+    """Store the response of a claimed key for later retries."""
+    async with session_factory() as session:
+        await session.execute(
+            update(IdempotencyRecord)
+            .where(
+                IdempotencyRecord.user_id == user_id,
+                IdempotencyRecord.key == key,
+                IdempotencyRecord.request_hash == response.request_hash,
+                IdempotencyRecord.status_code.is_(None)
+            )
+            .values(
+                status_code=response.status_code,
+                content_type=response.content_type,
+                response_body=response.body
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    response_cache.put((user_id, key), response)
+
+
+async def release_key(session_factory: async_sessionmaker, user_id: UUID, key: str) -> None:
+    """Give a claimed key back after a failed request, so a retry runs it again."""
+    async with session_factory() as session:
+        await session.execute(
+            delete(IdempotencyRecord)
+            .where(
+                IdempotencyRecord.user_id == user_id,
+                IdempotencyRecord.key == key,
+                IdempotencyRecord.status_code.is_(None)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+
+async def purge_expired_keys(
+    session_factory: async_sessionmaker,
+    batch_size: int = 1000,
+    now: Optional[datetime] = None
+) -> int:
+    """Delete expired keys in short, fixed-size transactions; returns how many."""
+    now = now or datetime.utcnow()
+    purged = 0
+    while True:
+        async with session_factory() as session:
+            chunk = (
+                select(IdempotencyRecord.user_id, IdempotencyRecord.key)
+                .where(IdempotencyRecord.expires_at <= now)
+                .limit(batch_size)
+            )
+            rows = (await session.execute(chunk)).all()
+            if rows:
+                await session.execute(
+                    delete(IdempotencyRecord)
+                    .where(tuple_(IdempotencyRecord.user_id, IdempotencyRecord.key).in_(rows))
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+        purged += len(rows)
+        if len(rows) < batch_size:
+            break
+        await asyncio.sleep(0)  # let request handlers run between chunks
+
+    metrics.counter("idempotency_keys_purged_total").inc(purged)
+    if purged:
+        logger.info("purged %d expired idempotency keys", purged)
+    return purged
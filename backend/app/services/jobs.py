@@ -0,0 +1,119 @@
+"""Background jobs run by the in-app scheduler.
+
+Importing this module registers the jobs; the app lifespan does so only
+when the scheduler is enabled.
+"""
+from sqlalchemy import select, union
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.alert import Alert
+from app.models.alert_rule import AlertRule
+from app.models.watchlist import Watchlist
+from app.services.scheduler import scheduled_job
+
+
+@scheduled_job(
+    "market_evaluation",
+    every=settings.MARKET_EVALUATION_INTERVAL_SECONDS,
+    jitter=settings.SCHEDULER_JITTER_SECONDS
+)
+async def market_evaluation() -> None:
+    """Evaluate active alerts against current quotes."""
+    from app.services.evaluator import evaluate_market
+    from app.services.market_data import get_market_data_client
+    async with AsyncSessionLocal() as session:
+        await evaluate_market(session, get_market_data_client())
+
+
+@scheduled_job(
+    "quote_warming",
+    every=settings.QUOTE_TTL_SECONDS,
+    jitter=settings.SCHEDULER_JITTER_SECONDS,
+    singleton=False  # every worker has its own quote cache
+)
+async def quote_warming() -> None:
+    """Refresh cached quotes for every watched or alerted token."""
+    from app.services.market_data import get_market_data_client
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            union(
+                select(Watchlist.token_symbol),
+                select(Alert.token_symbol).where(Alert.is_active.is_(True)),
+                select(AlertRule.token_symbol).where(AlertRule.is_active.is_(True))
+            ).limit(settings.QUOTE_CACHE_MAX_SYMBOLS)
+        )
+        symbols = result.scalars().all()
+    if symbols:
+        await get_market_data_client().refresh(symbols)
+
+
+@scheduled_job(
+    "account_purge",
+    every=settings.ACCOUNT_PURGE_INTERVAL_SECONDS,
+    jitter=settings.SCHEDULER_JITTER_SECONDS
+)
+async def account_purge() -> None:
+    """Finish purges of deleted accounts interrupted by restarts."""
+    from app.services.account_deletion import purge_pending_deletions
+    await purge_pending_deletions(AsyncSessionLocal)
+
+
+@scheduled_job(
+    "token_popularity_reconciliation",
+    every=settings.POPULARITY_RECONCILE_INTERVAL_SECONDS,
+    jitter=settings.SCHEDULER_JITTER_SECONDS,
+    singleton=False  # every worker keeps its own counters
+)
+async def token_popularity_reconciliation() -> None:
+    """Replace the trending counters with exact counts from the tables."""
+    from app.services.popularity import reconcile_popularity
+    async with AsyncSessionLocal() as session:
+        await reconcile_popularity(session)
+
+
+@scheduled_job(
+    "idempotency_key_purge",
+    every=settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+    jitter=settings.SCHEDULER_JITTER_SECONDS
+)
+async def idempotency_key_purge() -> None:
+    """Delete idempotency keys past their TTL."""
+    from app.services.idempotency import purge_expired_keys
+    await purge_expired_keys(AsyncSessionLocal)
+
+
+@scheduled_job(
+    "token_revocation_sync",
+    every=settings.TOKEN_REVOCATION_SYNC_SECONDS,
+    singleton=False  # every worker checks revocations in memory
+)
+async def token_revocation_sync() -> None:
+    """Pick up token families revoked by other workers."""
+    from app.services.tokens import sync_revoked_families
+    async with AsyncSessionLocal() as session:
+        await sync_revoked_families(session)
+
+
+@scheduled_job(
+    "refresh_token_purge",
+    every=settings.TOKEN_PURGE_INTERVAL_SECONDS,
+    jitter=settings.SCHEDULER_JITTER_SECONDS
+)
+async def refresh_token_purge() -> None:
+    """Delete refresh tokens past their expiry."""
+    from app.services.tokens import purge_expired_tokens
+    await purge_expired_tokens(AsyncSessionLocal)
+
+
+@scheduled_job("alert_archival", cron=settings.ALERT_ARCHIVE_CRON)
+async def alert_archival() -> None:
+    """Move cold alerts to the archive."""
+    from app.services.archival import archive_cold_alerts
+    await archive_cold_alerts(AsyncSessionLocal)
+
+
+@scheduled_job("user_stats_reconciliation", cron=settings.USER_STATS_RECONCILE_CRON)
+async def user_stats_reconciliation() -> None:
+    """Rebuild every user's dashboard counters from the tables."""
+    from app.services.counters import reconcile_all_user_stats
+    await reconcile_all_user_stats(AsyncSessionLocal)
@@ -0,0 +1,132 @@
+"""Filter and sort clauses for the alert and watchlist listings.
+
+Every combination is meant to be answered from one index whose leading
+column is `user_id`:
+
+| Alerts filtered / sorted by                | Index                           |
+|--------------------------------------------|---------------------------------|
+| `token_symbol` (+ anything)                | `ix_alerts_user_symbol_created` |
+| `triggered_since` or `-triggered_at` sort  | `ix_alerts_user_triggered`      |
+| anything else                              | `ix_alerts_user_created_filters`|
+
+| Watchlist filtered / sorted by             | Index                              |
+|--------------------------------------------|------------------------------------|
+| `token_symbol` sort (+ prefix)             | `uq_watchlist_user_token`          |
+| `created_at` sort (+ prefix)               | `ix_watchlist_user_created_symbol` |
+
+The remaining filter columns are trailing index columns, so they are
+checked inside the index: counts are index-only scans and pages read
+only the rows they return. When a filter and the sort favour different
+indexes the planner may take the narrower range and sort just the rows
+in it. `app.cli.bench_listing` checks the plans of every combination.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Select, select, func
+from app.models.alert import Alert, AlertType, AlertCondition
+from app.models.watchlist import Watchlist
+
+AlertSort = Literal["-created_at", "created_at", "-triggered_at"]
+WatchlistSort = Literal["-created_at", "created_at", "token_symbol"]
+
+# Sort name -> (column, descending)
+SORTS: Dict[str, Tuple[str, bool]] = {
+    "-created_at": ("created_at", True),
+    "created_at": ("created_at", False),
+    "-triggered_at": ("triggered_at", True),
+    "token_symbol": ("token_symbol", False),
+}
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    """Timestamps are stored as naive UTC."""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def alert_filters(
+    columns: Any = Alert,
+    *,
+    token_symbol: Optional[str] = None,
+    alert_type: Optional[AlertType] = None,
+    condition: Optional[AlertCondition] = None,
+    is_active: Optional[bool] = None,
+    triggered_since: Optional[datetime] = None,
+    sort: AlertSort = "-created_at"
+) -> List[Any]:
+    """WHERE clauses for the given filters on `Alert`, `ArchivedAlert` or a subquery's `.c`.
+
+    Sorting by trigger time lists triggered alerts only.
+    """
+    clauses = []
+    if token_symbol is not None:
+        clauses.append(columns.token_symbol == token_symbol)
+    if alert_type is not None:
+        clauses.append(columns.alert_type == alert_type)
+    if condition is not None:
+        clauses.append(columns.condition == condition)
+    if is_active is not None:
+        clauses.append(columns.is_active.is_(is_active))
+    if triggered_since is not None:
+        clauses.append(columns.triggered_at >= _naive_utc(triggered_since))
+    elif sort == "-triggered_at":
+        clauses.append(columns.triggered_at.is_not(None))
+    return clauses
+
+
+def watchlist_filters(symbol_prefix: Optional[str] = None) -> List[Any]:
+    """WHERE clauses for the given filters on `Watchlist`."""
+    if not symbol_prefix:
+        return []
+    return [Watchlist.token_symbol.startswith(symbol_prefix, autoescape=True)]
+
+
+def order_by(columns: Any, sort: str) -> Any:
+    """ORDER BY clause for a sort name on a model or a subquery's `.c`."""
+    field, descending = SORTS[sort]
+    column = getattr(columns, field)
+    return column.desc() if descending else column.asc()
+
+
+def alert_listing(
+    user_id: UUID,
+    *,
+    page: int,
+    per_page: int,
+    sort: AlertSort = "-created_at",
+    **filters: Any
+) -> Tuple[Select, Select]:
+    """(count query, page query) for a user's live alerts."""
+    conditions = [Alert.user_id == user_id, *alert_filters(Alert, sort=sort, **filters)]
+    count = select(func.count()).select_from(Alert).where(*conditions)
+    rows = (
+        select(Alert)
+        .where(*conditions)
+        .order_by(order_by(Alert, sort))
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+    )
+    return count, rows
+
+
+def watchlist_listing(
+    user_id: UUID,
+    *,
+    page: int,
+    per_page: int,
+    sort: WatchlistSort = "-created_at",
+    symbol_prefix: Optional[str] = None
+) -> Tuple[Select, Select]:
+    """(count query, page query) for a user's watchlist."""
+    conditions = [Watchlist.user_id == user_id, *watchlist_filters(symbol_prefix)]
+    count = select(func.count()).select_from(Watchlist).where(*conditions)
+    rows = (
+        select(Watchlist)
+        .where(*conditions)
+        .order_by(order_by(Watchlist, sort))
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+    )
+    return count, rows
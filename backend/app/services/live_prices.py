@@ -0,0 +1,208 @@
+"""Live price fan-out to WebSocket subscribers.
+
+One `PriceHub` per worker reads the quotes of every subscribed token on a
+fixed interval through the market-data client, so they come from the
+shared quote cache and are fetched upstream (single-flight, one batch for
+the union of all subscriptions) only once they are older than
+QUOTE_TTL_SECONDS, like any other reader. The upstream rate per worker is
+thus bounded by the TTL, not by the interval or the number of clients.
+The hub publishes the quotes that changed. Publishing only offers each
+quote to the subscribers of its token through the per-token index; it
+never waits for a client. Each client has a `ClientChannel` that
+conflates pending quotes per token (latest value wins), so its buffer is
+bounded by its subscriptions, and a sender task of its own that drains it
+at whatever speed the client reads.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+from app.config import settings
+from app.services.quotes import Quote, quote_cache
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def quote_message(quotes: Iterable[Quote]) -> Dict[str, Any]:
+    """Client message carrying price updates."""
+    return {
+        "type": "prices",
+        "data": [
+            {
+                "symbol": quote.symbol,
+                "price": str(quote.price) if quote.price is not None else None,
+                "change_24h": str(quote.change_24h) if quote.change_24h is not None else None,
+                "volume_24h": str(quote.volume_24h) if quote.volume_24h is not None else None,
+                "as_of": quote.as_of.isoformat(),
+            }
+            for quote in quotes
+        ],
+    }
+
+
+def _same_values(a: Quote, b: Quote) -> bool:
+    return (a.price, a.change_24h, a.volume_24h) == (b.price, b.change_24h, b.volume_24h)
+
+
+class ChannelOverflow(Exception):
+    """A client stopped reading while control messages piled up."""
+
+
+class ClientChannel:
+    """Outgoing messages of one client.
+
+    Quotes are conflated per token: a newer quote replaces a pending one,
+    so at most one quote per subscribed token waits. Control messages
+    (acknowledgements, errors) queue up to `max_control` and are never
+    dropped; exceeding that raises `ChannelOverflow`.
+    """
+
+    def __init__(self, max_control: Optional[int] = None):
+        self.max_control = max_control or settings.LIVE_PRICES_MAX_CONTROL_MESSAGES
+        self.symbols: Set[str] = set()
+        self._quotes: "OrderedDict[str, Quote]" = OrderedDict()
+        self._control: Deque[Dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+        self.conflated = 0
+
+    def offer(self, quote: Quote) -> None:
+        """Queue a quote without waiting, replacing a pending one for the same token."""
+        if quote.symbol in self._quotes:
+            self.conflated += 1
+            metrics.counter("live_prices_conflated_total").inc()
+        self._quotes[quote.symbol] = quote
+        self._ready.set()
+
+    def send_control(self, message: Dict[str, Any]) -> None:
+        if len(self._control) >= self.max_control:
+            raise ChannelOverflow()
+        self._control.append(message)
+        self._ready.set()
+
+    def discard(self, symbols: Iterable[str]) -> None:
+        """Drop pending quotes of tokens no longer subscribed."""
+        for symbol in symbols:
+            self._quotes.pop(symbol, None)
+
+    async def next_messages(self) -> List[Dict[str, Any]]:
+        """Wait for pending messages and take them all: control messages first, then one quote batch."""
+        await self._ready.wait()
+        self._ready.clear()
+        messages = list(self._control)
+        self._control.clear()
+        if self._quotes:
+            messages.append(quote_message(self._quotes.values()))
+            self._quotes = OrderedDict()
+        return messages
+
+
+class PriceHub:
+    """Subscriber index per token and the refresh loop feeding it."""
+
+    def __init__(self, interval_seconds: Optional[float] = None):
+        self.interval_seconds = interval_seconds or settings.LIVE_PRICES_INTERVAL_SECONDS
+        self._subscribers: Dict[str, Set[ClientChannel]] = {}
+        self._channels: Set[ClientChannel] = set()
+        self._published: Dict[str, Quote] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def symbols(self) -> List[str]:
+        """Tokens with at least one subscriber."""
+        return list(self._subscribers)
+
+    def subscribers(self, symbol: str) -> int:
+        return len(self._subscribers.get(symbol, ()))
+
+    def clients(self) -> int:
+        return len(self._channels)
+
+    def connect(self, channel: ClientChannel) -> None:
+        self._channels.add(channel)
+
+    def subscribe(self, channel: ClientChannel, symbols: Iterable[str]) -> None:
+        """Add subscriptions; the latest known quote of each new token is sent right away."""
+        for symbol in symbols:
+            if symbol in channel.symbols:
+                continue
+            channel.symbols.add(symbol)
+            self._subscribers.setdefault(symbol, set()).add(channel)
+            quote = self._published.get(symbol) or quote_cache.get(symbol)
+            if quote is not None:
+                channel.offer(quote)
+
+    def unsubscribe(self, channel: ClientChannel, symbols: Iterable[str]) -> None:
+        symbols = [symbol for symbol in symbols if symbol in channel.symbols]
+        for symbol in symbols:
+            channel.symbols.discard(symbol)
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is not None:
+                subscribers.discard(channel)
+                if not subscribers:
+                    del self._subscribers[symbol]
+                    self._published.pop(symbol, None)
+        channel.discard(symbols)
+
+    def disconnect(self, channel: ClientChannel) -> None:
+        self.unsubscribe(channel, list(channel.symbols))
+        self._channels.discard(channel)
+
+    def publish(self, quotes: Iterable[Quote]) -> int:
+        """Offer changed quotes to their subscribers; returns how many quotes changed.
+
+        Never awaits: a slow client only lets its own pending quotes conflate.
+        """
+        changed = 0
+        for quote in quotes:
+            subscribers = self._subscribers.get(quote.symbol)
+            if not subscribers:
+                continue
+            previous = self._published.get(quote.symbol)
+            if previous is not None and (previous.as_of >= quote.as_of or _same_values(previous, quote)):
+                continue
+            self._published[quote.symbol] = quote
+            changed += 1
+            for channel in subscribers:
+                channel.offer(quote)
+        return changed
+
+    async def refresh_once(self, market_data) -> int:
+        """Read every subscribed token through the quote cache and publish what changed."""
+        symbols = self.symbols()
+        if not symbols:
+            return 0
+        started = time.perf_counter()
+        quotes = await market_data.get_quotes(symbols)
+        changed = self.publish(quotes.values())
+        metrics.histogram("live_prices_broadcast_seconds").observe(time.perf_counter() - started)
+        metrics.counter("live_prices_published_total").inc(changed)
+        return changed
+
+    async def start(self, market_data) -> None:
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(market_data), name="live-prices")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, market_data) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.refresh_once(market_data)
+            except Exception:
+                logger.exception("live price refresh failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Hub of this worker
+price_hub = PriceHub()
+metrics.gauge("live_prices_clients", func=price_hub.clients)
+metrics.gauge("live_prices_symbols", func=lambda: len(price_hub.symbols()))
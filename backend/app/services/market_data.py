@@ -0,0 +1,299 @@
+"""Upstream market-data providers and the shared caching client."""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from app.config import settings
+from app.services.quotes import Quote, QuoteCache, quote_cache
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MarketDataProvider:
+    """Base class for upstream market-data sources.
+
+    Providers receive up to `max_batch_size` symbols per call and return a
+    quote for each symbol they know; unknown symbols are left out.
+    """
+
+    name = "base"
+    max_batch_size = 100
+
+    async def fetch_quotes(self, symbols: List[str]) -> Dict[str, Quote]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release provider resources."""
+
+
+def _decimal(value) -> Optional[Decimal]:
+    if value is None:
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+class HttpMarketDataProvider(MarketDataProvider):
+    """JSON-over-HTTP provider using one pooled keep-alive client per worker.
+
+    Expects `GET {base_url}/quotes?symbols=A,B` to answer
+    `{"quotes": [{"symbol", "price", "change_24h", "volume_24h"}, ...]}`.
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_batch_size: Optional[int] = None
+    ):
+        self.base_url = (base_url or settings.MARKET_DATA_BASE_URL).rstrip("/")
+        self.api_key = api_key if api_key is not None else settings.MARKET_DATA_API_KEY
+        self.timeout = timeout or settings.MARKET_DATA_TIMEOUT_SECONDS
+        self.max_connections = max_connections or settings.MARKET_DATA_MAX_CONNECTIONS
+        self.max_batch_size = max_batch_size or settings.MARKET_DATA_BATCH_SIZE
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx  # only needed when this provider is configured
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    async def fetch_quotes(self, symbols: List[str]) -> Dict[str, Quote]:
+        response = await self._get_client().get("/quotes", params={"symbols": ",".join(symbols)})
+        response.raise_for_status()
+
+        now = datetime.utcnow()
+        quotes = {}
+        for row in response.json().get("quotes", []):
+            symbol = row.get("symbol")
+            if symbol not in symbols:
+                continue
+            quotes[symbol] = Quote(
+                symbol=symbol,
+                price=_decimal(row.get("price")),
+                change_24h=_decimal(row.get("change_24h")),
+                volume_24h=_decimal(row.get("volume_24h")),
+                as_of=now
+            )
+        return quotes
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class FakeMarketDataProvider(MarketDataProvider):
+    """In-memory provider for tests and local development."""
+
+    name = "fake"
+
+    def __init__(
+        self,
+        prices: Optional[Dict[str, Decimal]] = None,
+        max_batch_size: int = 100,
+        latency: float = 0.0,
+        fail_calls: int = 0
+    ):
+        self.prices: Dict[str, Decimal] = {k: Decimal(str(v)) for k, v in (prices or {}).items()}
+        self.max_batch_size = max_batch_size
+        self.latency = latency
+        self.fail_calls = fail_calls
+        self.calls: List[List[str]] = []
+
+    def set_price(self, symbol: str, price) -> None:
+        """Set the price returned for a symbol."""
+        self.prices[symbol] = Decimal(str(price))
+
+    async def fetch_quotes(self, symbols: List[str]) -> Dict[str, Quote]:
+        self.calls.append(list(symbols))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_calls > 0:
+            self.fail_calls -= 1
+            raise ConnectionError("fake upstream failure")
+
+        now = datetime.utcnow()
+        return {
+            symbol: Quote(
+                symbol=symbol,
+                price=self.prices[symbol],
+                change_24h=Decimal("0"),
+                volume_24h=Decimal("0"),
+                as_of=now
+            )
+            for symbol in symbols
+            if symbol in self.prices
+        }
+
+
+_PROVIDERS: Dict[str, Callable[[], MarketDataProvider]] = {
+    "http": HttpMarketDataProvider,
+    "fake": FakeMarketDataProvider,
+}
+
+
+def register_market_data_provider(name: str, factory: Callable[[], MarketDataProvider]) -> None:
+    """Register a provider factory under a name usable in MARKET_DATA_PROVIDER."""
+    _PROVIDERS[name] = factory
+
+
+def get_market_data_provider(name: Optional[str] = None) -> MarketDataProvider:
+    """Instantiate the configured market-data provider."""
+    name = name or settings.MARKET_DATA_PROVIDER
+    try:
+        return _PROVIDERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown market data provider: {name}")
+
+
+class MarketDataClient:
+    """Cached, coalescing access to a market-data provider.
+
+    Quotes live in a `QuoteCache` (LRU-bounded). A cached quote younger
+    than `ttl` is served as is; one younger than `max_stale` is served and
+    refreshed in the background (stale-while-revalidate); anything older
+    or missing is fetched before returning.
+
+    Fetches are single-flight per symbol: a symbol already being fetched is
+    awaited rather than requested again, so concurrent callers asking for
+    the same tokens share one upstream call. Upstream failures are logged
+    and leave the affected symbols out of the result.
+    """
+
+    def __init__(
+        self,
+        provider: MarketDataProvider,
+        cache: Optional[QuoteCache] = None,
+        *,
+        ttl: Optional[float] = None,
+        max_stale: Optional[float] = None
+    ):
+        self.provider = provider
+        self.cache = cache if cache is not None else quote_cache
+        self.ttl = settings.QUOTE_TTL_SECONDS if ttl is None else ttl
+        self.max_stale = settings.QUOTE_MAX_AGE_SECONDS if max_stale is None else max_stale
+        self._inflight: Dict[str, "asyncio.Future[Optional[Quote]]"] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    async def get_quotes(self, symbols: Iterable[str]) -> Dict[str, Quote]:
+        """Get quotes for symbols, fetching only what the cache cannot serve."""
+        now = datetime.utcnow()
+        fresh_after = now - timedelta(seconds=self.ttl)
+        stale_after = now - timedelta(seconds=self.max_stale)
+
+        found: Dict[str, Quote] = {}
+        missing: List[str] = []
+        revalidate: List[str] = []
+        for symbol in dict.fromkeys(symbols):
+            quote = self.cache.get(symbol)
+            if quote is not None and quote.as_of >= fresh_after:
+                found[symbol] = quote
+            elif quote is not None and quote.as_of >= stale_after:
+                found[symbol] = quote
+                revalidate.append(symbol)
+            else:
+                missing.append(symbol)
+
+        if revalidate:
+            metrics.counter("market_data_stale_served_total").inc(len(revalidate))
+            self._refresh_in_background(revalidate)
+        if missing:
+            found.update(await self.refresh(missing))
+        return found
+
+    async def refresh(self, symbols: Iterable[str]) -> Dict[str, Quote]:
+        """Fetch symbols upstream now (coalesced with fetches already running)."""
+        loop = asyncio.get_running_loop()
+        waiting: Dict[str, asyncio.Future] = {}
+        to_fetch: List[str] = []
+        for symbol in dict.fromkeys(symbols):
+            future = self._inflight.get(symbol)
+            if future is None:
+                future = loop.create_future()
+                self._inflight[symbol] = future
+                to_fetch.append(symbol)
+            else:
+                metrics.counter("market_data_coalesced_total").inc()
+            waiting[symbol] = future
+
+        if to_fetch:
+            await self._fetch(to_fetch)
+
+        results = await asyncio.gather(*waiting.values())
+        return {symbol: quote for symbol, quote in zip(waiting, results) if quote is not None}
+
+    async def _fetch(self, symbols: List[str]) -> None:
+        """Fetch symbols in provider-sized batches and resolve their futures."""
+        batch_size = max(1, self.provider.max_batch_size)
+        batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+        await asyncio.gather(*(self._fetch_batch(batch) for batch in batches))
+
+    async def _fetch_batch(self, symbols: List[str]) -> None:
+        started = time.perf_counter()
+        quotes: Dict[str, Quote] = {}
+        try:
+            metrics.counter("market_data_upstream_calls_total").inc()
+            quotes = await self.provider.fetch_quotes(symbols)
+            self.cache.put_many(quotes.values())
+        except Exception as exc:
+            metrics.counter("market_data_errors_total").inc()
+            logger.warning("market data fetch for %d symbols failed: %r", len(symbols), exc)
+        finally:
+            metrics.histogram("market_data_upstream_seconds").observe(time.perf_counter() - started)
+            for symbol in symbols:
+                future = self._inflight.pop(symbol, None)
+                if future is not None and not future.done():
+                    future.set_result(quotes.get(symbol))
+
+    def _refresh_in_background(self, symbols: List[str]) -> None:
+        symbols = [symbol for symbol in symbols if symbol not in self._inflight]
+        if not symbols:
+            return
+        task = asyncio.ensure_future(self.refresh(symbols))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def close(self) -> None:
+        """Wait for background refreshes and close the provider."""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        await self.provider.close()
+
+
+_client: Optional[MarketDataClient] = None
+
+
+def get_market_data_client() -> MarketDataClient:
+    """Get the process-wide market-data client (usable as a dependency)."""
+    global _client
+    if _client is None:
+        _client = MarketDataClient(get_market_data_provider())
+    return _client
+
+
+async def close_market_data_client() -> None:
+    """Close the process-wide client if it was created."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
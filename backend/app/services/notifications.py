@@ -0,0 +1,361 @@
+"""Push notification providers and the outbox dispatcher."""
+import asyncio
+import logging
+import random
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.notification import NotificationOutbox, OutboxStatus
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PushMessage:
+    """Message handed to a push provider."""
+    id: UUID
+    user_id: UUID
+    kind: str
+    dedupe_key: str
+    payload: dict
+    attempts: int = 0
+    created_at: Optional[datetime] = None
+
+
+@dataclass
+class PushResult:
+    """Delivery outcome for a single message."""
+    message_id: UUID
+    ok: bool
+    retryable: bool = True
+    error: Optional[str] = None
+
+
+class PushProvider:
+    """Base class for push gateways.
+
+    Providers receive up to `max_batch_size` messages per call and return
+    one `PushResult` per message.
+    """
+
+    name = "base"
+    max_batch_size = 100
+
+    async def send_batch(self, messages: List[PushMessage]) -> List[PushResult]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release provider resources."""
+
+
+class LogPushProvider(PushProvider):
+    """Provider that only logs messages (default until a gateway is configured)."""
+
+    name = "log"
+
+    async def send_batch(self, messages: List[PushMessage]) -> List[PushResult]:
+        for message in messages:
+            logger.info("push %s to user %s: %s", message.kind, message.user_id, message.payload)
+        return [PushResult(message_id=message.id, ok=True) for message in messages]
+
+
+class FakePushProvider(PushProvider):
+    """In-memory provider for tests and local development."""
+
+    name = "fake"
+
+    def __init__(
+        self,
+        max_batch_size: int = 100,
+        fail_calls: int = 0,
+        retryable: bool = True,
+        latency: float = 0.0
+    ):
+        self.max_batch_size = max_batch_size
+        self.fail_calls = fail_calls
+        self.retryable = retryable
+        self.latency = latency
+        self.sent: List[PushMessage] = []
+        self.batches: List[int] = []
+
+    async def send_batch(self, messages: List[PushMessage]) -> List[PushResult]:
+        self.batches.append(len(messages))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_calls > 0:
+            self.fail_calls -= 1
+            return [
+                PushResult(message_id=m.id, ok=False, retryable=self.retryable, error="fake failure")
+                for m in messages
+            ]
+        self.sent.extend(messages)
+        return [PushResult(message_id=m.id, ok=True) for m in messages]
+
+
+_PROVIDERS: Dict[str, Callable[[], PushProvider]] = {
+    "log": LogPushProvider,
+    "fake": FakePushProvider,
+}
+
+
+def register_push_provider(name: str, factory: Callable[[], PushProvider]) -> None:
+    """Register a push provider factory under a name usable in PUSH_PROVIDER."""
+    _PROVIDERS[name] = factory
+
+
+def get_push_provider(name: Optional[str] = None) -> PushProvider:
+    """Instantiate the configured push provider."""
+    name = name or settings.PUSH_PROVIDER
+    try:
+        return _PROVIDERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown push provider: {name}")
+
+
+class _RecentKeys:
+    """Bounded LRU set of recently delivered dedupe keys."""
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._keys: "OrderedDict[str, None]" = OrderedDict()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def add(self, key: str) -> None:
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        while len(self._keys) > self.capacity:
+            self._keys.popitem(last=False)
+
+
+@dataclass
+class DispatcherStats:
+    """Counters for one dispatcher instance."""
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    deduped: int = 0
+    batches: List[int] = field(default_factory=list)
+
+
+class NotificationDispatcher:
+    """Deliver outbox messages through a push provider using a worker pool.
+
+    Each worker claims a batch of due messages (leasing them with
+    `claimed_at` so a crashed worker's batch is picked up again), sends
+    them outside any database transaction, and records the outcomes with
+    a single bulk update. Failed messages are retried with exponential
+    backoff and jitter until `max_attempts` is reached.
+    """
+
+    def __init__(
+        self,
+        provider: PushProvider,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        *,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        retry_max_seconds: Optional[float] = None,
+        poll_interval_seconds: Optional[float] = None,
+        send_timeout_seconds: Optional[float] = None,
+        lease_seconds: Optional[int] = None
+    ):
+        self.provider = provider
+        self.session_factory = session_factory
+        self.workers = workers or settings.NOTIFICATION_WORKERS
+        self.batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.NOTIFICATION_MAX_ATTEMPTS
+        self.retry_base_seconds = retry_base_seconds or settings.NOTIFICATION_RETRY_BASE_SECONDS
+        self.retry_max_seconds = retry_max_seconds or settings.NOTIFICATION_RETRY_MAX_SECONDS
+        self.poll_interval_seconds = poll_interval_seconds or settings.NOTIFICATION_POLL_INTERVAL_SECONDS
+        self.send_timeout_seconds = send_timeout_seconds or settings.NOTIFICATION_SEND_TIMEOUT_SECONDS
+        self.lease_seconds = lease_seconds or settings.NOTIFICATION_LEASE_SECONDS
+        self.stats = DispatcherStats()
+        self._recent = _RecentKeys()
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+        self._sent_total = metrics.counter("notifications_sent_total")
+        self._retried_total = metrics.counter("notifications_retried_total")
+        self._failed_total = metrics.counter("notifications_failed_total")
+        self._deduped_total = metrics.counter("notifications_deduped_total")
+        self._throughput = metrics.meter("notifications_sent_per_second")
+        self._delivery_lag = metrics.histogram("notifications_delivery_lag_seconds")
+        self._queue_lag = metrics.gauge("notifications_queue_lag_seconds")
+        self._batch_duration = metrics.histogram("notifications_batch_duration_seconds")
+
+    def backoff(self, attempts: int) -> float:
+        """Delay before the next attempt, with jitter in [50%, 100%]."""
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * (2 ** max(0, attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def start(self) -> None:
+        """Start the worker pool."""
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._worker(n), name=f"notification-dispatcher-{n}")
+            for n in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Stop workers after their current batch and close the provider."""
+        self._stopping.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.provider.close()
+
+    async def _worker(self, number: int) -> None:
+        while not self._stopping.is_set():
+            try:
+                processed = await self.run_once()
+            except Exception:
+                logger.exception("notification worker %s failed", number)
+                processed = 0
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def run_once(self) -> int:
+        """Claim and deliver one batch; return the number of messages claimed."""
+        messages = await self._claim()
+        if not messages:
+            return 0
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        results: Dict[UUID, PushResult] = {}
+        to_send: List[PushMessage] = []
+        seen_keys = set()
+        for message in messages:
+            if message.dedupe_key in self._recent or message.dedupe_key in seen_keys:
+                results[message.id] = PushResult(message_id=message.id, ok=True)
+                self.stats.deduped += 1
+                self._deduped_total.inc()
+                continue
+            seen_keys.add(message.dedupe_key)
+            to_send.append(message)
+
+        chunk_size = max(1, min(self.batch_size, self.provider.max_batch_size))
+        for start in range(0, len(to_send), chunk_size):
+            chunk = to_send[start:start + chunk_size]
+            for result in await self._send(chunk):
+                results[result.message_id] = result
+
+        await self._record(messages, results)
+        self._batch_duration.observe(loop.time() - started)
+        return len(messages)
+
+    async def _claim(self) -> List[PushMessage]:
+        now = datetime.utcnow()
+        lease_cutoff = now - timedelta(seconds=self.lease_seconds)
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(NotificationOutbox)
+                .where(or_(
+                    and_(
+                        NotificationOutbox.status == OutboxStatus.PENDING,
+                        NotificationOutbox.next_attempt_at <= now
+                    ),
+                    and_(
+                        NotificationOutbox.status == OutboxStatus.IN_FLIGHT,
+                        NotificationOutbox.claimed_at < lease_cutoff
+                    )
+                ))
+                .order_by(NotificationOutbox.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = result.scalars().all()
+            if not rows:
+                self._queue_lag.set(0.0)
+                return []
+
+            messages = []
+            for row in rows:
+                row.status = OutboxStatus.IN_FLIGHT
+                row.claimed_at = now
+                row.attempts += 1
+                messages.append(PushMessage(
+                    id=row.id,
+                    user_id=row.user_id,
+                    kind=row.kind,
+                    dedupe_key=row.dedupe_key,
+                    payload=row.payload,
+                    attempts=row.attempts,
+                    created_at=row.created_at
+                ))
+            await session.commit()
+
+        oldest = min(m.created_at for m in messages)
+        self._queue_lag.set((now - oldest).total_seconds())
+        return messages
+
+    async def _send(self, chunk: List[PushMessage]) -> List[PushResult]:
+        self.stats.batches.append(len(chunk))
+        try:
+            results = await asyncio.wait_for(
+                self.provider.send_batch(chunk),
+                timeout=self.send_timeout_seconds
+            )
+        except Exception as exc:
+            error = "timeout" if isinstance(exc, asyncio.TimeoutError) else str(exc)
+            logger.warning("push provider %s failed for %d messages: %s", self.provider.name, len(chunk), error)
+            return [PushResult(message_id=m.id, ok=False, retryable=True, error=error) for m in chunk]
+
+        # Anything the provider did not report on is treated as a retryable failure
+        reported = {r.message_id for r in results}
+        results = list(results)
+        for message in chunk:
+            if message.id not in reported:
+                results.append(PushResult(message_id=message.id, ok=False, error="no result"))
+        return results
+
+    async def _record(self, messages: List[PushMessage], results: Dict[UUID, PushResult]) -> None:
+        now = datetime.utcnow()
+        params = []
+        for message in messages:
+            result = results[message.id]
+            if result.ok:
+                self._recent.add(message.dedupe_key)
+                self.stats.sent += 1
+                self._sent_total.inc()
+                self._throughput.mark()
+                if message.created_at is not None:
+                    self._delivery_lag.observe((now - message.created_at).total_seconds())
+                params.append({
+                    "id": message.id, "status": OutboxStatus.SENT, "sent_at": now,
+                    "next_attempt_at": now, "claimed_at": None, "last_error": None
+                })
+            elif result.retryable and message.attempts < self.max_attempts:
+                self.stats.retried += 1
+                self._retried_total.inc()
+                params.append({
+                    "id": message.id, "status": OutboxStatus.PENDING, "sent_at": None,
+                    "next_attempt_at": now + timedelta(seconds=self.backoff(message.attempts)),
+                    "claimed_at": None, "last_error": result.error
+                })
+            else:
+                self.stats.failed += 1
+                self._failed_total.inc()
+                params.append({
+                    "id": message.id, "status": OutboxStatus.FAILED, "sent_at": None,
+                    "next_attempt_at": now, "claimed_at": None, "last_error": result.error
+                })
+
+        async with self.session_factory() as session:
+            await session.execute(update(NotificationOutbox), params)
+            await session.commit()
@@ -0,0 +1,129 @@
+"""Global token popularity: how many watchlist entries and alerts each token has.
+
+Counts are kept in memory per worker and adjusted by the write paths after
+they commit, so reading the trending lists never touches the database. A
+periodic job replaces them with exact counts from the tables, which also
+picks up writes made by other workers.
+"""
+import heapq
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.alert import Alert
+from app.models.watchlist import Watchlist
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _rank(item: Tuple[str, int]) -> Tuple[int, str]:
+    """Sort key: highest count first, ties by symbol."""
+    return -item[1], item[0]
+
+
+class TopKCounter:
+    """Per-token counts with a cached top `size`.
+
+    The top list is rebuilt with a bounded heap (`heapq.nsmallest` over the
+    ranking key, O(n log size)) only when a change can affect it: the token
+    is already in it, or its new count ranks at or above the last entry.
+    Changes further down leave the cached list valid, so reads are O(k).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._counts: Dict[str, int] = {}
+        self._top: Optional[List[Tuple[str, int]]] = None
+        self._members: Dict[str, None] = {}
+        self._pending: Optional[Dict[str, int]] = None
+
+    def add(self, symbol: str, delta: int = 1) -> None:
+        count = self._counts.get(symbol, 0) + delta
+        if count > 0:
+            self._counts[symbol] = count
+        else:
+            self._counts.pop(symbol, None)
+        if self._pending is not None:
+            self._pending[symbol] = self._pending.get(symbol, 0) + delta
+
+        top = self._top
+        if top is None:
+            return
+        if symbol in self._members or len(top) < self.size or _rank((symbol, count)) <= _rank(top[-1]):
+            self._top = None
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """The `k` (at most `size`) most counted tokens, highest first."""
+        if self._top is None:
+            self._top = heapq.nsmallest(self.size, self._counts.items(), key=_rank)
+            self._members = dict.fromkeys(symbol for symbol, _ in self._top)
+        return self._top[:k]
+
+    def get(self, symbol: str) -> int:
+        return self._counts.get(symbol, 0)
+
+    def begin_reconcile(self) -> None:
+        """Start recording changes made while exact counts are being loaded."""
+        self._pending = {}
+
+    def replace(self, counts: Iterable[Tuple[str, int]]) -> int:
+        """Install exact counts plus changes recorded since `begin_reconcile`.
+
+        Returns the drift: how far the in-memory counts had wandered from
+        the tables in total.
+        """
+        pending = self._pending or {}
+        self._pending = None
+        exact = {symbol: count for symbol, count in counts if count > 0}
+        for symbol, delta in pending.items():
+            exact[symbol] = exact.get(symbol, 0) + delta
+        exact = {symbol: count for symbol, count in exact.items() if count > 0}
+
+        drift = sum(
+            abs(exact.get(symbol, 0) - self._counts.get(symbol, 0))
+            for symbol in exact.keys() | self._counts.keys()
+        )
+        self._counts = exact
+        self._top = None
+        return drift
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+class TokenPopularity:
+    """Watchlist and alert counts per token across all users."""
+
+    def __init__(self, size: int):
+        self.watched = TopKCounter(size)
+        self.alerted = TopKCounter(size)
+        self.reconciled_at: Optional[datetime] = None
+
+
+# Counters of this worker; exact as of the last reconciliation plus local writes
+popularity = TokenPopularity(settings.POPULARITY_TOP_K_MAX)
+
+
+async def reconcile_popularity(db: AsyncSession, target: Optional[TokenPopularity] = None) -> int:
+    """Replace the counters with exact per-token counts from the tables.
+
+    Runs from a background job and at startup, never on a request. Writes
+    this worker commits while the counts load are replayed on top; a write
+    committed just before the snapshot may be counted twice until the next
+    run. Returns the total drift that was corrected.
+    """
+    target = target or popularity
+    drift = 0
+    for counter, column in ((target.watched, Watchlist.token_symbol), (target.alerted, Alert.token_symbol)):
+        counter.begin_reconcile()
+        result = await db.execute(select(column, func.count()).group_by(column))
+        drift += counter.replace(result.all())
+    target.reconciled_at = datetime.utcnow()
+
+    metrics.counter("token_popularity_drift_total").inc(drift)
+    if drift:
+        logger.info("token popularity reconciled with drift %d", drift)
+    return drift
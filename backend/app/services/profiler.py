@@ -0,0 +1,183 @@
+"""On-demand sampling profiler producing collapsed stacks per route.
+
+A sampler thread wakes every PROFILER_INTERVAL_MS while at least one
+request is being profiled. For each profiled request it records one stack:
+the event loop thread's stack when the request's task is running, or the
+task's suspended await chain (ending in `[await]`) while it waits on the
+database, bcrypt or an upstream call. Samples are therefore wall-clock and
+show where a request spends its time, not only its CPU.
+
+Stacks are aggregated per route in the collapsed format
+(`frame;frame;frame count`) read by flamegraph.pl, speedscope and
+inferno. Nothing runs while no request is being profiled.
+"""
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Set
+from app.config import settings
+from app.utils.metrics import metrics
+
+AWAIT_MARKER = "[await]"
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+
+
+def _await_chain(coro) -> List:
+    """Frames of a suspended coroutine and everything it awaits, outermost first."""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+def _running_stack(frame, root) -> Optional[List]:
+    """Frames from `root` up to `frame`, or None when `root` is not on the stack."""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        if frame is root:
+            frames.reverse()
+            return frames
+        frame = frame.f_back
+    return None
+
+
+class ProfileSession:
+    """Samples collected for one request."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.root = task.get_coro().cr_frame
+        self.samples: Counter = Counter()
+        self.total = 0
+
+    def sample(self, loop_frame) -> None:
+        frames = _running_stack(loop_frame, self.root) if loop_frame is not None else None
+        if frames is None:
+            frames = _await_chain(self.task.get_coro())
+            if not frames:
+                return
+            names = [_frame_name(f) for f in frames] + [AWAIT_MARKER]
+        else:
+            names = [_frame_name(f) for f in frames]
+        self.samples[";".join(names)] += 1
+        self.total += 1
+
+
+class RouteProfile:
+    """Collapsed stacks aggregated over the profiled requests of one route."""
+
+    def __init__(self):
+        self.requests = 0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+    def add(self, session: ProfileSession) -> None:
+        self.requests += 1
+        limit = settings.PROFILER_MAX_STACKS_PER_ROUTE
+        self.samples += session.total
+        for stack, count in session.samples.items():
+            if stack in self.stacks or len(self.stacks) < limit:
+                self.stacks[stack] += count
+            else:
+                self.stacks["[truncated]"] += count
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class SamplingProfiler:
+    """Decides which requests to profile and aggregates their samples.
+
+    Requests are profiled when selected by `sample_rate`, when their route
+    template is in `routes`, or when they ask for it with an admin-key
+    authenticated header (see `ProfilingMiddleware`). Settings changed at
+    runtime apply to this worker only.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or settings.PROFILER_INTERVAL_MS / 1000
+        self.sample_rate = settings.PROFILER_SAMPLE_RATE
+        self.routes: Set[str] = set(settings.PROFILER_ROUTES)
+        self.profiles: Dict[str, RouteProfile] = {}
+        self._sessions: Set[ProfileSession] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+
+    @property
+    def armed(self) -> bool:
+        """Whether requests can be selected without an explicit header."""
+        return self.sample_rate > 0 or bool(self.routes)
+
+    def configure(self, sample_rate: Optional[float] = None, routes: Optional[List[str]] = None) -> None:
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if routes is not None:
+            self.routes = set(routes)
+
+    def start(self) -> ProfileSession:
+        """Start profiling the current task."""
+        session = ProfileSession(asyncio.current_task())
+        with self._lock:
+            self._loop_thread_id = threading.get_ident()
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+        return session
+
+    def stop(self, session: ProfileSession, route: str) -> None:
+        """Stop a session and fold its samples into the route's profile."""
+        with self._lock:
+            self._sessions.discard(session)
+            self.profiles.setdefault(route, RouteProfile()).add(session)
+        metrics.counter("profiler_requests_total").inc()
+        metrics.counter("profiler_samples_total").inc(session.total)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.profiles.clear()
+
+    def report(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                route: {"requests": p.requests, "samples": p.samples, "stacks": len(p.stacks)}
+                for route, p in sorted(self.profiles.items())
+            }
+
+    def collapsed(self, route: Optional[str] = None) -> str:
+        """Collapsed stacks of one route, or of all routes under a route root frame."""
+        with self._lock:
+            if route is not None:
+                profile = self.profiles.get(route)
+                return profile.collapsed() if profile else ""
+            return "".join(
+                f"{name};{line}"
+                for name, profile in sorted(self.profiles.items())
+                for line in profile.collapsed().splitlines(keepends=True)
+            )
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                loop_frame = sys._current_frames().get(self._loop_thread_id)
+                for session in self._sessions:
+                    session.sample(loop_frame)
+
+
+profiler = SamplingProfiler()
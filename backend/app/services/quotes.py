@@ -0,0 +1,85 @@
+"""Shared in-process cache of the latest market quotes."""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+from app.config import settings
+from app.utils.metrics import metrics
+
+
+@dataclass(frozen=True)
+class Quote:
+    """Latest market data for one token."""
+    symbol: str
+    price: Optional[Decimal]
+    change_24h: Optional[Decimal]  # percent
+    volume_24h: Optional[Decimal]
+    as_of: datetime  # naive UTC time the values were observed
+
+
+class QuoteCache:
+    """Latest quote per symbol, bounded to `max_symbols` (least recently used go first).
+
+    Everything runs on the event loop, so no locking is needed. Readers pass
+    a staleness bound; quotes older than that are treated as missing.
+    """
+
+    def __init__(self, max_symbols: Optional[int] = None):
+        self.max_symbols = max_symbols or settings.QUOTE_CACHE_MAX_SYMBOLS
+        self._quotes: "OrderedDict[str, Quote]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    def put(self, quote: Quote) -> None:
+        """Store a quote unless a newer one is already cached."""
+        current = self._quotes.get(quote.symbol)
+        if current is not None and current.as_of > quote.as_of:
+            return
+        self._quotes[quote.symbol] = quote
+        self._quotes.move_to_end(quote.symbol)
+        while len(self._quotes) > self.max_symbols:
+            self._quotes.popitem(last=False)
+
+    def put_many(self, quotes: Iterable[Quote]) -> None:
+        """Store several quotes."""
+        for quote in quotes:
+            self.put(quote)
+
+    def get(self, symbol: str) -> Optional[Quote]:
+        """Get the cached quote for a symbol regardless of its age."""
+        quote = self._quotes.get(symbol)
+        if quote is not None:
+            self._quotes.move_to_end(symbol)
+        return quote
+
+    def get_many(
+        self,
+        symbols: Iterable[str],
+        max_age_seconds: Optional[float] = None,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Quote]:
+        """Look up many symbols at once, skipping quotes older than `max_age_seconds`."""
+        max_age = settings.QUOTE_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=max_age)
+
+        found: Dict[str, Quote] = {}
+        wanted = 0
+        for symbol in set(symbols):
+            wanted += 1
+            quote = self.get(symbol)
+            if quote is not None and quote.as_of >= cutoff:
+                found[symbol] = quote
+
+        metrics.counter("quote_cache_hits_total").inc(len(found))
+        metrics.counter("quote_cache_misses_total").inc(wanted - len(found))
+        return found
+
+    def clear(self) -> None:
+        """Drop all cached quotes."""
+        self._quotes.clear()
+
+
+# Process-wide cache shared by everything that reads or observes prices
+quote_cache = QuoteCache()
@@ -0,0 +1,167 @@
+"""Compilation of alerts and compound rules into per-token evaluation plans."""
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from app.models.alert import Alert, AlertType, AlertCondition
+from app.models.alert_rule import AlertRule
+from app.services.windows import WindowStore, percent_move
+
+AND = "and"
+OR = "or"
+PREDICATE = "predicate"
+
+
+def condition_met(condition: AlertCondition, observed: Decimal, threshold: Decimal) -> bool:
+    """Check whether an observed value satisfies an alert condition."""
+    if condition == AlertCondition.ABOVE:
+        return observed > threshold
+    if condition == AlertCondition.BELOW:
+        return observed < threshold
+    if condition == AlertCondition.EQUALS:
+        return observed == threshold
+    return False
+
+
+class Predicate(NamedTuple):
+    """One primitive condition; equal predicates are evaluated once per token."""
+    alert_type: AlertType
+    condition: AlertCondition
+    threshold: Decimal
+    window_minutes: Optional[int] = None
+
+    def holds(self, observed: Dict[AlertType, Decimal], symbol: str, windows: Optional[WindowStore]) -> bool:
+        """Whether the observed values satisfy this condition (false when unobserved)."""
+        value = observed.get(self.alert_type)
+        if value is None:
+            return False
+        if self.condition != AlertCondition.MOVED:
+            return condition_met(self.condition, value, self.threshold)
+        window = windows.get(symbol, self.alert_type, self.window_minutes) if windows else None
+        if window is None or window.minimum is None:
+            return False
+        return percent_move(value, window.minimum, window.maximum) >= self.threshold
+
+
+@dataclass(frozen=True)
+class PlanNode:
+    """A distinct sub-expression: a predicate, or AND/OR over earlier nodes."""
+    op: str
+    predicate: Optional[Predicate] = None
+    children: Tuple[int, ...] = ()
+
+
+class EvaluationPlan:
+    """Flat, topologically ordered list of the distinct sub-expressions on one token.
+
+    Every node refers only to nodes before it, so a single pass computes
+    all of them. Nodes are interned: identical predicates, and AND/OR
+    groups over the same children (in any order), share one slot, so each
+    is evaluated once per tick however many alerts and rules contain it.
+    Each target (an `Alert` or an `AlertRule`) points at its root node.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.nodes: List[PlanNode] = []
+        self.targets: List[Tuple[Any, int]] = []
+        self._ids: Dict[PlanNode, int] = {}
+
+    def _intern(self, node: PlanNode) -> int:
+        node_id = self._ids.get(node)
+        if node_id is None:
+            node_id = self._ids[node] = len(self.nodes)
+            self.nodes.append(node)
+        return node_id
+
+    def add_predicate(self, predicate: Predicate) -> int:
+        return self._intern(PlanNode(PREDICATE, predicate=predicate))
+
+    def add_expression(self, expression: dict) -> int:
+        """Compile a stored rule expression, returning its root node id."""
+        if "op" not in expression:
+            return self.add_predicate(Predicate(
+                AlertType(expression["alert_type"]),
+                AlertCondition(expression["condition"]),
+                Decimal(str(expression["threshold_value"])),
+                expression.get("window_minutes")
+            ))
+
+        op = expression["op"]
+        children = set()
+        for child in expression["conditions"]:
+            child_id = self.add_expression(child)
+            node = self.nodes[child_id]
+            if node.op == op:
+                children.update(node.children)  # (a AND b) AND c == a AND b AND c
+            else:
+                children.add(child_id)
+        if len(children) == 1:
+            return children.pop()
+        return self._intern(PlanNode(op, children=tuple(sorted(children))))
+
+    def add_target(self, target: Any, root: int) -> None:
+        self.targets.append((target, root))
+
+    @property
+    def predicates(self) -> List[Predicate]:
+        return [node.predicate for node in self.nodes if node.op == PREDICATE]
+
+    @property
+    def predicate_count(self) -> int:
+        return len(self.predicates)
+
+    def evaluate(self, observed: Dict[AlertType, Decimal], windows: Optional[WindowStore] = None) -> List[Any]:
+        """Targets whose expression holds for the observed metric values.
+
+        `windows` supplies the sliding extrema of `MOVED` conditions.
+        """
+        values: List[bool] = []
+        for node in self.nodes:
+            if node.op == PREDICATE:
+                values.append(node.predicate.holds(observed, self.symbol, windows))
+            elif node.op == AND:
+                values.append(all(values[child] for child in node.children))
+            else:
+                values.append(any(values[child] for child in node.children))
+        return [target for target, root in self.targets if values[root]]
+
+
+def compile_plans(
+    alerts: Iterable[Alert],
+    rules: Iterable[AlertRule],
+    windows: Optional[WindowStore] = None
+) -> Dict[str, EvaluationPlan]:
+    """Build one evaluation plan per token from loaded alerts and rules.
+
+    Targets are the given objects themselves, so plans live as long as
+    the session that loaded them (one evaluation call).
+
+    Sliding windows needed by `MOVED` conditions are required from
+    `windows`, so they exist before values are observed.
+    """
+    plans: Dict[str, EvaluationPlan] = {}
+    for alert in alerts:
+        plan = plans.setdefault(alert.token_symbol, EvaluationPlan(alert.token_symbol))
+        plan.add_target(alert, plan.add_predicate(Predicate(
+            alert.alert_type, alert.condition, alert.threshold_value, alert.window_minutes
+        )))
+    for rule in rules:
+        plan = plans.setdefault(rule.token_symbol, EvaluationPlan(rule.token_symbol))
+        plan.add_target(rule, plan.add_expression(rule.expression))
+
+    if windows is not None:
+        for symbol, plan in plans.items():
+            for predicate in plan.predicates:
+                if predicate.condition == AlertCondition.MOVED:
+                    windows.require(symbol, predicate.alert_type, predicate.window_minutes)
+    return plans
+
+
+def expression_types(expression: dict) -> List[AlertType]:
+    """Metric types referenced by an expression, in first-seen order."""
+    if "op" not in expression:
+        return [AlertType(expression["alert_type"])]
+    seen: Dict[AlertType, None] = {}
+    for child in expression["conditions"]:
+        seen.update(dict.fromkeys(expression_types(child)))
+    return list(seen)
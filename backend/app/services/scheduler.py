@@ -0,0 +1,415 @@
+"""In-process async job scheduler with single-leader execution.
+
+Jobs are registered with `@scheduled_job(...)` and run by a `Scheduler`
+started in the app lifespan. Every worker runs the scheduler; jobs marked
+`singleton` only run in the worker currently holding the leader lock.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app.config import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[], Awaitable[object]]
+
+
+class IntervalTrigger:
+    """Fire every `seconds`."""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        return moment + timedelta(seconds=self.seconds)
+
+    def __repr__(self):
+        return f"every {self.seconds:g}s"
+
+
+def _parse_cron_field(value: str, low: int, high: int) -> Set[int]:
+    """Parse one cron field (`*`, `*/n`, `a-b`, `a-b/n`, `a,b,...`)."""
+    result: Set[int] = set()
+    for part in value.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"invalid cron step: {value}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = end = int(part)
+        if start < low or end > high or start > end:
+            raise ValueError(f"cron field out of range: {value}")
+        result.update(range(start, end + 1, step))
+    return result
+
+
+class CronTrigger:
+    """Fire on a standard five-field cron expression (UTC, minute resolution).
+
+    As in cron, when both day-of-month and day-of-week are restricted a day
+    matching either one fires. Day-of-week 0 and 7 are both Sunday.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in _parse_cron_field(fields[4], 0, 7)}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays  # cron: Sunday = 0
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate <= limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"cron expression never fires: {self.expression!r}")
+
+    def __repr__(self):
+        return f"cron {self.expression!r}"
+
+
+@dataclass
+class Job:
+    """A registered job and its run state."""
+    name: str
+    func: JobFunc
+    trigger: object
+    jitter: float = 0.0
+    max_concurrency: int = 1
+    singleton: bool = True
+    timeout: Optional[float] = None
+    running: int = 0
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_started_at: Optional[datetime] = None
+    last_duration: Optional[float] = None
+    last_error: Optional[str] = None
+    next_run_at: Optional[datetime] = None
+
+    def status(self) -> dict:
+        return {
+            "trigger": repr(self.trigger),
+            "singleton": self.singleton,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_duration_seconds": self.last_duration,
+            "last_error": self.last_error,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+        }
+
+
+_JOBS: List[Job] = []
+
+
+def scheduled_job(
+    name: str,
+    *,
+    every: Optional[float] = None,
+    cron: Optional[str] = None,
+    jitter: float = 0.0,
+    max_concurrency: int = 1,
+    singleton: bool = True,
+    timeout: Optional[float] = None
+):
+    """Register an async, argument-less job on an interval or cron schedule."""
+    if (every is None) == (cron is None):
+        raise ValueError("give exactly one of every= or cron=")
+    trigger = IntervalTrigger(every) if every is not None else CronTrigger(cron)
+
+    def decorator(func: JobFunc) -> JobFunc:
+        _JOBS.append(Job(
+            name=name,
+            func=func,
+            trigger=trigger,
+            jitter=jitter,
+            max_concurrency=max_concurrency,
+            singleton=singleton,
+            timeout=timeout
+        ))
+        return func
+    return decorator
+
+
+def registered_jobs() -> List[Job]:
+    """Get the registered jobs in registration order."""
+    return list(_JOBS)
+
+
+class LeaderLock:
+    """Decides which worker runs singleton jobs.
+
+    `is_leader()` is called before each singleton run; implementations try
+    to take the lock when they do not hold it, so leadership moves to
+    another worker when the leader goes away.
+    """
+
+    name = "base"
+
+    async def is_leader(self) -> bool:
+        raise NotImplementedError
+
+    async def release(self) -> None:
+        """Give up leadership."""
+
+
+class NullLeaderLock(LeaderLock):
+    """Every worker is leader (single-process deployments and tests)."""
+
+    name = "none"
+
+    async def is_leader(self) -> bool:
+        return True
+
+
+class FileLeaderLock(LeaderLock):
+    """Leader election between workers on one host through an flock'ed file.
+
+    The OS drops the lock when the holding process exits, so another
+    worker takes over on its next check.
+    """
+
+    name = "file"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.SCHEDULER_LOCK_FILE
+        self._fd: Optional[int] = None
+
+    async def is_leader(self) -> bool:
+        if self._fd is not None:
+            return True
+        import fcntl
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    async def release(self) -> None:
+        if self._fd is not None:
+            import fcntl
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class PostgresAdvisoryLock(LeaderLock):
+    """Leader election across hosts with a session-level advisory lock.
+
+    The lock lives on one dedicated connection held for as long as this
+    worker leads. If that connection dies, PostgreSQL releases the lock and
+    another worker acquires it on its next check. The connection comes from
+    its own unpooled engine, so leading does not take a slot from the
+    request pool, and runs in autocommit so the keepalive never leaves it
+    idle in transaction.
+    """
+
+    name = "postgres"
+
+    def __init__(self, engine=None, key: Optional[int] = None):
+        if engine is None:
+            engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+        self.engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+        self.key = settings.SCHEDULER_LOCK_KEY if key is None else key
+        self._conn = None
+
+    async def is_leader(self) -> bool:
+        if self._conn is not None:
+            try:
+                await self._conn.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                logger.warning("lost scheduler leader connection")
+                await self._close()
+
+        conn = await self.engine.connect()
+        try:
+            acquired = (
+                await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key})
+            ).scalar()
+        except Exception:
+            await conn.close()
+            raise
+        if not acquired:
+            await conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    async def _close(self) -> None:
+        conn, self._conn = self._conn, None
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+    async def release(self) -> None:
+        if self._conn is not None:
+            try:
+                await self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            finally:
+                await self._close()
+
+
+def get_leader_lock(name: Optional[str] = None) -> LeaderLock:
+    """Build the configured leader lock (`auto` picks by database backend)."""
+    name = name or settings.SCHEDULER_LEADER_LOCK
+    if name == "auto":
+        name = "postgres" if settings.DATABASE_URL.startswith("postgresql") else "file"
+    if name == "postgres":
+        return PostgresAdvisoryLock()
+    if name == "file":
+        return FileLeaderLock()
+    if name == "none":
+        return NullLeaderLock()
+    raise ValueError(f"Unknown leader lock: {name}")
+
+
+class Scheduler:
+    """Run jobs on their schedules until stopped.
+
+    Each job has its own timer loop. A due job starts in its own task as
+    long as fewer than `max_concurrency` runs are in progress, so a slow
+    run never delays the schedule of other jobs; a run that would exceed
+    the limit is skipped. Runs are timed into `scheduler_<job>_seconds`.
+    """
+
+    def __init__(self, jobs: Optional[List[Job]] = None, leader: Optional[LeaderLock] = None):
+        self.jobs = registered_jobs() if jobs is None else jobs
+        self.leader = leader or NullLeaderLock()
+        self._loops: List[asyncio.Task] = []
+        self._runs: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    async def start(self) -> None:
+        """Start one timer loop per job."""
+        self._stopping.clear()
+        self._loops = [asyncio.create_task(self._loop(job), name=f"job:{job.name}") for job in self.jobs]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop scheduling, wait briefly for running jobs and release leadership."""
+        self._stopping.set()
+        for task in self._loops:
+            task.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops = []
+
+        if self._runs:
+            done, pending = await asyncio.wait(self._runs, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        await self.leader.release()
+
+    def status(self) -> Dict[str, dict]:
+        """Per-job state for the admin API."""
+        return {job.name: job.status() for job in self.jobs}
+
+    async def _loop(self, job: Job) -> None:
+        while not self._stopping.is_set():
+            now = datetime.utcnow()
+            job.next_run_at = job.trigger.next_after(now) + timedelta(seconds=random.uniform(0, job.jitter))
+            delay = (job.next_run_at - now).total_seconds()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=max(delay, 0))
+                return
+            except asyncio.TimeoutError:
+                pass
+            await self.trigger(job)
+
+    async def trigger(self, job: Job) -> Optional[asyncio.Task]:
+        """Start a run of `job` now if limits and leadership allow."""
+        if job.running >= job.max_concurrency:
+            job.skipped += 1
+            metrics.counter(f"scheduler_{job.name}_skipped_total").inc()
+            return None
+        if job.singleton:
+            try:
+                leader = await self.leader.is_leader()
+            except Exception as exc:
+                logger.warning("leader check for %s failed: %r", job.name, exc)
+                leader = False
+            if not leader:
+                return None
+
+        job.running += 1
+        task = asyncio.create_task(self._run(job))
+        self._runs.add(task)
+        task.add_done_callback(self._runs.discard)
+        return task
+
+    async def _run(self, job: Job) -> None:
+        started = time.perf_counter()
+        job.last_started_at = datetime.utcnow()
+        try:
+            if job.timeout:
+                await asyncio.wait_for(job.func(), timeout=job.timeout)
+            else:
+                await job.func()
+            job.last_error = None
+        except Exception as exc:
+            job.failures += 1
+            job.last_error = repr(exc)
+            metrics.counter(f"scheduler_{job.name}_failures_total").inc()
+            logger.exception("scheduled job %s failed", job.name)
+        finally:
+            job.running -= 1
+            job.runs += 1
+            job.last_duration = time.perf_counter() - started
+            metrics.counter(f"scheduler_{job.name}_runs_total").inc()
+            metrics.histogram(f"scheduler_{job.name}_seconds").observe(job.last_duration)
@@ -1,17 +1,44 @@
 """Security dependencies and utilities."""
-from fastapi import Depends, HTTPException, status
+import secrets
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
 from uuid import UUID
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
 from app.services.auth import decode_token
+from app.services.tokens import revoked_families
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
 
+def verify_access_token(authorization: Optional[str]) -> Optional[Tuple[UUID, datetime]]:
+    """(user id, expiry) of the access token in an `Authorization: Bearer` header, or None.
+
+    None covers a missing or malformed header, an invalid or expired token,
+    a refresh token and a token whose login was revoked (checked in memory,
+    without a DB hit).
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_token(token)
+    if not payload or payload.get("type") != "access" or payload.get("sub") is None:
+        return None
+    family_id = payload.get("fam")
+    if family_id is not None and revoked_families.is_revoked(family_id):
+        return None
+    try:
+        return UUID(payload["sub"]), datetime.utcfromtimestamp(payload["exp"])
+    except ValueError:
+        return None
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -22,36 +49,50 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    token = credentials.credentials
-    payload = decode_token(token)
-    
-    if payload is None:
-        raise credentials_exception
-    
-    # Check token type
-    token_type = payload.get("type")
-    if token_type != "access":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token type",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user_id_str: str = payload.get("sub")
-    if user_id_str is None:
-        raise credentials_exception
-    
-    try:
-        user_id = UUID(user_id_str)
-    except ValueError:
+
+    verified = verify_access_token(f"{credentials.scheme} {credentials.credentials}")
+    if verified is None:
         raise credentials_exception
-    
+    user_id, _ = verified
+
     # Get user from database
-    result = await db.execute(select(User).where(User.id == user_id))
+    result = await db.execute(select(User).where(User.id == user_id, User.deleted_at.is_(None)))
     user = result.scalar_one_or_none()
     
     if user is None:
         raise credentials_exception
     
     return user
+
+
+async def authenticate_bearer(
+    authorization: Optional[str],
+    session_factory: async_sessionmaker
+) -> Optional[Tuple[User, datetime]]:
+    """(user, token expiry) for an `Authorization: Bearer` access token, or None.
+
+    For connections that outlive a request (WebSockets): the user is looked
+    up in a session of its own, so no connection is held afterwards.
+    """
+    verified = verify_access_token(authorization)
+    if verified is None:
+        return None
+    user_id, expires_at = verified
+
+    async with session_factory() as session:
+        result = await session.execute(select(User).where(User.id == user_id, User.deleted_at.is_(None)))
+        user = result.scalar_one_or_none()
+    if user is None:
+        return None
+    return user, expires_at
+
+
+async def require_admin(x_admin_key: Optional[str] = Header(None)) -> None:
+    """Require the configured admin API key in the X-Admin-Key header."""
+    if not settings.ADMIN_API_KEY or x_admin_key is None or not secrets.compare_digest(
+        x_admin_key, settings.ADMIN_API_KEY
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
@@ -0,0 +1,224 @@
+"""Refresh token rotation, reuse detection and revocation."""
+import asyncio
+import heapq
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.models.user import User
+from app.models.refresh_token import RefreshTokenRecord
+from app.schemas.auth import Token
+from app.services.auth import create_access_token, create_refresh_token
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    """Revoked keys kept only until the tokens they cover have expired.
+
+    Lookups are a dict probe. Expired entries are dropped from a heap
+    ordered by expiry, so memory is bounded by what was revoked within one
+    token lifetime and the cleanup is O(1) when nothing has expired.
+    """
+
+    def __init__(self):
+        self._expiry: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def revoke(self, key: str, expires_at: float) -> None:
+        """Revoke `key` until `expires_at` (epoch seconds)."""
+        if expires_at <= self._expiry.get(key, 0.0):
+            return
+        self._expiry[key] = expires_at
+        heapq.heappush(self._heap, (expires_at, key))
+
+    def is_revoked(self, key: str, now: Optional[float] = None) -> bool:
+        """Check whether `key` is revoked."""
+        self._evict(time.time() if now is None else now)
+        return key in self._expiry
+
+    def clear(self) -> None:
+        """Forget all revocations."""
+        self._expiry.clear()
+        self._heap.clear()
+
+    def _evict(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._heap)
+            # Skip stale heap entries for keys revoked again with a later expiry
+            if self._expiry.get(key) == expires_at:
+                del self._expiry[key]
+
+
+# Token families revoked in this worker, loaded at startup and synced from
+# the database every TOKEN_REVOCATION_SYNC_SECONDS: a logout or reuse
+# detection on another worker takes effect here within that interval.
+revoked_families = RevocationList()
+
+# Revocations are stamped before their transaction commits; each sync
+# re-reads this far back so late commits are not skipped
+REVOCATION_SYNC_OVERLAP = timedelta(seconds=60)
+_revocations_synced_at: Optional[datetime] = None
+
+
+def _refresh_lifetime() -> timedelta:
+    return timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+def _epoch(moment: datetime) -> float:
+    return (moment - datetime(1970, 1, 1)).total_seconds()
+
+
+def issue_tokens(db: AsyncSession, user_id: UUID, family_id: Optional[UUID] = None) -> Token:
+    """Create an access/refresh token pair and stage its record on the session.
+
+    The caller commits. Without `family_id` a new token family is started.
+    """
+    family_id = family_id or uuid.uuid4()
+    record = RefreshTokenRecord(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        family_id=family_id,
+        expires_at=datetime.utcnow() + _refresh_lifetime()
+    )
+    db.add(record)
+
+    claims = {"sub": str(user_id), "fam": str(family_id)}
+    return Token(
+        access_token=create_access_token(data=claims),
+        refresh_token=create_refresh_token(data={**claims, "jti": str(record.id)})
+    )
+
+
+async def revoke_family(db: AsyncSession, family_id: UUID) -> None:
+    """Revoke every token of a family, here and in the database."""
+    now = datetime.utcnow()
+    revoked_families.revoke(str(family_id), _epoch(now + _refresh_lifetime()))
+    await db.execute(
+        update(RefreshTokenRecord)
+        .where(RefreshTokenRecord.family_id == family_id, RefreshTokenRecord.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def rotate_refresh_token(db: AsyncSession, payload: dict) -> Optional[Token]:
+    """Exchange a decoded refresh token for a new token pair.
+
+    The presented token is consumed with a single conditional UPDATE, so of
+    two concurrent refreshes with the same token only one wins. A token that
+    is unknown, already used or revoked revokes its whole family and
+    returns None.
+    """
+    try:
+        user_id = UUID(payload["sub"])
+        family_id = UUID(payload["fam"])
+        token_id = UUID(payload["jti"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if revoked_families.is_revoked(str(family_id)):
+        return None
+
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(RefreshTokenRecord)
+        .where(
+            RefreshTokenRecord.id == token_id,
+            RefreshTokenRecord.user_id == user_id,
+            RefreshTokenRecord.family_id == family_id,
+            RefreshTokenRecord.used_at.is_(None),
+            RefreshTokenRecord.revoked_at.is_(None),
+            RefreshTokenRecord.expires_at > now,
+            RefreshTokenRecord.user_id.in_(select(User.id).where(User.deleted_at.is_(None)))
+        )
+        .values(used_at=now)
+        .returning(RefreshTokenRecord.id)
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.scalar_one_or_none() is None:
+        metrics.counter("refresh_token_reuse_total").inc()
+        logger.warning("refresh token %s rejected; revoking family %s", token_id, family_id)
+        await revoke_family(db, family_id)
+        return None
+
+    tokens = issue_tokens(db, user_id, family_id)
+    await db.commit()
+    return tokens
+
+
+async def load_revoked_families(db: AsyncSession, since: Optional[datetime] = None) -> int:
+    """Fill `revoked_families` from the database with still-valid families.
+
+    With `since`, only families revoked at or after it are read.
+    """
+    global _revocations_synced_at
+    started = datetime.utcnow()
+    query = (
+        select(RefreshTokenRecord.family_id, func.max(RefreshTokenRecord.expires_at))
+        .where(
+            RefreshTokenRecord.revoked_at.is_not(None),
+            RefreshTokenRecord.expires_at > started
+        )
+        .group_by(RefreshTokenRecord.family_id)
+    )
+    if since is not None:
+        query = query.where(RefreshTokenRecord.revoked_at >= since)
+    result = await db.execute(query)
+    count = 0
+    for family_id, expires_at in result.all():
+        revoked_families.revoke(str(family_id), _epoch(expires_at))
+        count += 1
+    _revocations_synced_at = started
+    return count
+
+
+async def sync_revoked_families(db: AsyncSession) -> int:
+    """Load families revoked (by any worker) since this worker's last load."""
+    since = None if _revocations_synced_at is None else _revocations_synced_at - REVOCATION_SYNC_OVERLAP
+    return await load_revoked_families(db, since)
+
+
+async def purge_expired_tokens(
+    session_factory: async_sessionmaker,
+    batch_size: int = 1000,
+    now: Optional[datetime] = None
+) -> int:
+    """Delete expired refresh tokens in short, fixed-size transactions; returns how many."""
+    now = now or datetime.utcnow()
+    purged = 0
+    while True:
+        async with session_factory() as session:
+            chunk = (
+                select(RefreshTokenRecord.id)
+                .where(RefreshTokenRecord.expires_at <= now)
+                .limit(batch_size)
+            )
+            ids = (await session.execute(chunk)).scalars().all()
+            if ids:
+                await session.execute(
+                    delete(RefreshTokenRecord)
+                    .where(RefreshTokenRecord.id.in_(ids))
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+        purged += len(ids)
+        if len(ids) < batch_size:
+            break
+        await asyncio.sleep(0)  # let request handlers run between chunks
+
+    metrics.counter("refresh_tokens_purged_total").inc(purged)
+    if purged:
+        logger.info("purged %d expired refresh tokens", purged)
+    return purged
@@ -0,0 +1,259 @@
+"""Alert trigger statistics aggregated from mergeable partial results.
+
+`aggregate_range` folds the alerts of one primary-key range into a
+`TriggerStats`; partials of disjoint ranges merge into the statistics of
+their union, so ranges can be aggregated anywhere (other processes, other
+machines) and combined in any order. Distributions are kept as
+`QuantileSketch`es, whose size depends on the spread of the values, not
+their number.
+"""
+import asyncio
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+# Values at or below this count as zero (a log bucket needs a positive value)
+_MIN_POSITIVE = 1e-9
+_UUID_SPACE = 1 << 128
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch (as in DDSketch).
+
+    A value x > 0 lands in bucket ceil(log_gamma(x)) with
+    gamma = (1 + a) / (1 - a), so any quantile is answered within relative
+    error `a`. Merging adds bucket counts, which is exact: merged partials
+    give the same sketch as one pass over all values.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        if value <= _MIN_POSITIVE:
+            self.zeros += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches of different accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def bucket_range(self, key: int) -> Tuple[float, float]:
+        """(low, high] bounds of a bucket."""
+        return self._gamma ** (key - 1), self._gamma ** key
+
+    def _value(self, key: int) -> float:
+        # Midpoint (in relative terms) of the bucket, clamped to what was seen
+        value = 2 * self._gamma ** key / (self._gamma + 1)
+        return min(max(value, self.min), self.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return self._value(key)
+        return self.max
+
+    def densest(self, k: int) -> List[Tuple[float, float, int]]:
+        """The `k` most populated buckets as (low, high, count), most populated first."""
+        top = sorted(self.bins.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(*self.bucket_range(key), count) for key, count in top]
+
+    def summary(self, quantiles: Iterable[float] = (0.5, 0.9, 0.99)) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            **{f"p{round(q * 100)}": self.quantile(q) for q in quantiles},
+        }
+
+
+def _sketch_field(relative_accuracy: float):
+    return field(default_factory=lambda: QuantileSketch(relative_accuracy))
+
+
+@dataclass
+class RateCounts:
+    """Alerts and how many of them triggered."""
+    alerts: int = 0
+    triggered: int = 0
+
+    def merge(self, other: "RateCounts") -> None:
+        self.alerts += other.alerts
+        self.triggered += other.triggered
+
+    def summary(self) -> Dict[str, Any]:
+        rate = self.triggered / self.alerts if self.alerts else None
+        return {"alerts": self.alerts, "triggered": self.triggered, "trigger_rate": rate}
+
+
+@dataclass
+class TriggerStats:
+    """Partial trigger statistics of some set of alerts; see `merge`."""
+    rows: int = 0
+    by_token: Dict[str, RateCounts] = field(default_factory=dict)
+    by_type: Dict[str, RateCounts] = field(default_factory=dict)
+    # Seconds from creation to (last) trigger, overall and per alert type
+    time_to_trigger: QuantileSketch = _sketch_field(0.01)
+    time_to_trigger_by_type: Dict[str, QuantileSketch] = field(default_factory=dict)
+    # Threshold values per (token, alert type, condition)
+    thresholds: Dict[Tuple[str, str, str], QuantileSketch] = field(default_factory=dict)
+    threshold_accuracy: float = 0.05
+
+    def add_rows(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        """Fold (token_symbol, alert_type, condition, threshold_value, created_at, triggered_at) rows."""
+        by_token, by_type, thresholds = self.by_token, self.by_type, self.thresholds
+        for symbol, alert_type, condition, threshold, created_at, triggered_at in rows:
+            type_name = alert_type.value
+            token_counts = by_token.get(symbol)
+            if token_counts is None:
+                token_counts = by_token[symbol] = RateCounts()
+            type_counts = by_type.get(type_name)
+            if type_counts is None:
+                type_counts = by_type[type_name] = RateCounts()
+            token_counts.alerts += 1
+            type_counts.alerts += 1
+
+            if triggered_at is not None:
+                token_counts.triggered += 1
+                type_counts.triggered += 1
+                seconds = max(0.0, (triggered_at - created_at).total_seconds())
+                self.time_to_trigger.add(seconds)
+                sketch = self.time_to_trigger_by_type.get(type_name)
+                if sketch is None:
+                    sketch = self.time_to_trigger_by_type[type_name] = QuantileSketch(0.01)
+                sketch.add(seconds)
+
+            key = (symbol, type_name, condition.value)
+            sketch = thresholds.get(key)
+            if sketch is None:
+                sketch = thresholds[key] = QuantileSketch(self.threshold_accuracy)
+            sketch.add(float(threshold))
+            self.rows += 1
+
+    def merge(self, other: "TriggerStats") -> "TriggerStats":
+        self.rows += other.rows
+        for mine, theirs, make in (
+            (self.by_token, other.by_token, RateCounts),
+            (self.by_type, other.by_type, RateCounts),
+            (self.time_to_trigger_by_type, other.time_to_trigger_by_type, lambda: QuantileSketch(0.01)),
+            (self.thresholds, other.thresholds, lambda: QuantileSketch(self.threshold_accuracy)),
+        ):
+            for key, value in theirs.items():
+                if key not in mine:
+                    mine[key] = make()
+                mine[key].merge(value)
+        self.time_to_trigger.merge(other.time_to_trigger)
+        return self
+
+    def summary(self, min_alerts: int = 10, clusters: int = 3) -> Dict[str, Any]:
+        """Compact report; threshold clusters only for keys with at least `min_alerts` alerts."""
+        return {
+            "rows": self.rows,
+            "by_type": {
+                name: {**counts.summary(), "time_to_trigger_seconds": (
+                    self.time_to_trigger_by_type[name].summary() if name in self.time_to_trigger_by_type else None
+                )}
+                for name, counts in sorted(self.by_type.items())
+            },
+            "by_token": {
+                symbol: counts.summary()
+                for symbol, counts in sorted(self.by_token.items(), key=lambda item: (-item[1].alerts, item[0]))
+            },
+            "time_to_trigger_seconds": self.time_to_trigger.summary(),
+            "threshold_clusters": [
+                {
+                    "token_symbol": symbol, "alert_type": type_name, "condition": condition, "alerts": sketch.count,
+                    "clusters": [
+                        {"low": low, "high": high, "alerts": count} for low, high, count in sketch.densest(clusters)
+                    ],
+                }
+                for (symbol, type_name, condition), sketch in sorted(self.thresholds.items())
+                if sketch.count >= min_alerts
+            ],
+        }
+
+
+def key_ranges(chunks: int) -> List[Tuple[UUID, Optional[UUID]]]:
+    """Split the UUID key space into `chunks` [low, high) ranges (the last is open).
+
+    Alert ids are random UUIDs, so equal slices of the key space hold
+    about equal numbers of rows without sampling the table first.
+    """
+    step = _UUID_SPACE // chunks
+    bounds = [UUID(int=i * step) for i in range(chunks)]
+    return [(low, high) for low, high in zip(bounds, [*bounds[1:], None])]
+
+
+def _model(table: str) -> Any:
+    from app.models.alert import Alert
+    from app.models.alert_archive import ArchivedAlert
+    return {"alerts": Alert, "alerts_archive": ArchivedAlert}[table]
+
+
+async def _aggregate_range(
+    database_url: str, table: str, low: UUID, high: Optional[UUID], partition_size: int
+) -> TriggerStats:
+    model = _model(table)
+    query = select(
+        model.token_symbol, model.alert_type, model.condition,
+        model.threshold_value, model.created_at, model.triggered_at
+    ).where(model.id >= low)
+    if high is not None:
+        query = query.where(model.id < high)
+
+    stats = TriggerStats()
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            result = await conn.stream(query.execution_options(stream_results=True, yield_per=partition_size))
+            async for partition in result.partitions(partition_size):
+                stats.add_rows(partition)
+    finally:
+        await engine.dispose()
+    return stats
+
+
+def aggregate_range(
+    database_url: str, table: str, low: UUID, high: Optional[UUID], partition_size: int = 10000
+) -> TriggerStats:
+    """Statistics of the rows of `table` ("alerts" or "alerts_archive") with low <= id < high.
+
+    Streams the range through a server-side cursor `partition_size` rows
+    at a time on a connection of its own; safe to run in a worker process.
+    """
+    return asyncio.run(_aggregate_range(database_url, table, low, high, partition_size))
@@ -0,0 +1,115 @@
+"""Startup warmup: pre-open pool connections and prime lazy subsystems.
+
+Subsystems register steps with `@warmup_step(name)`; the app lifespan runs
+them before the worker reports ready, so the first real request does not
+pay for connection setup or first-use initialization.
+"""
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import text
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+WarmupStep = Callable[[object], Awaitable[None]]
+
+_STEPS: List[Tuple[str, WarmupStep]] = []
+
+
+def warmup_step(name: str):
+    """Register an async warmup step taking the FastAPI app."""
+    def decorator(func: WarmupStep) -> WarmupStep:
+        _STEPS.append((name, func))
+        return func
+    return decorator
+
+
+def registered_steps() -> List[Tuple[str, WarmupStep]]:
+    """Get the registered warmup steps in registration order."""
+    return list(_STEPS)
+
+
+async def run_warmup(
+    app,
+    steps: Optional[List[Tuple[str, WarmupStep]]] = None,
+    timeout: Optional[float] = None
+) -> Dict[str, dict]:
+    """Run warmup steps sequentially and return per-step timings.
+
+    A failing or slow step is logged and reported but never aborts
+    startup; the worker just serves its first requests a little slower.
+    """
+    steps = registered_steps() if steps is None else steps
+    timeout = settings.WARMUP_STEP_TIMEOUT_SECONDS if timeout is None else timeout
+    report: Dict[str, dict] = {}
+
+    for name, step in steps:
+        started = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(step(app), timeout=timeout)
+        except Exception as exc:
+            error = "timeout" if isinstance(exc, asyncio.TimeoutError) else repr(exc)
+            logger.warning("warmup step %s failed: %s", name, error)
+        report[name] = {
+            "seconds": round(time.perf_counter() - started, 6),
+            "ok": error is None,
+            "error": error,
+        }
+
+    return report
+
+
+@warmup_step("db_pool")
+async def _open_pool_connections(app) -> None:
+    """Open WARMUP_POOL_CONNECTIONS connections at once so the pool keeps them."""
+    from app.database import engine
+    count = min(settings.WARMUP_POOL_CONNECTIONS, settings.DB_POOL_SIZE)
+
+    async def _open(stack: AsyncExitStack) -> None:
+        conn = await stack.enter_async_context(engine.connect())
+        await conn.execute(text("SELECT 1"))
+
+    async with AsyncExitStack() as stack:
+        await asyncio.gather(*(_open(stack) for _ in range(count)))
+
+
+@warmup_step("password_hashing")
+async def _load_password_backend(app) -> None:
+    """Import passlib and load the bcrypt backend without hashing anything."""
+    from app.services.auth import get_pwd_context
+    get_pwd_context().handler("bcrypt").get_backend()
+
+
+@warmup_step("jwt")
+async def _prime_jwt(app) -> None:
+    """Import python-jose/cryptography through one encode/decode round trip."""
+    from app.services.auth import create_access_token, decode_token
+    decode_token(create_access_token(data={"sub": "warmup"}))
+
+
+@warmup_step("token_revocations")
+async def _load_token_revocations(app) -> None:
+    """Load revoked, unexpired refresh token families into memory."""
+    from app.database import AsyncSessionLocal
+    from app.services.tokens import load_revoked_families
+    async with AsyncSessionLocal() as session:
+        await load_revoked_families(session)
+
+
+@warmup_step("token_popularity")
+async def _load_token_popularity(app) -> None:
+    """Load per-token watchlist and alert counts for the trending lists."""
+    from app.database import AsyncSessionLocal
+    from app.services.popularity import reconcile_popularity
+    async with AsyncSessionLocal() as session:
+        await reconcile_popularity(session)
+
+
+@warmup_step("openapi")
+async def _prime_openapi(app) -> None:
+    """Build the OpenAPI schema, which walks every response model serializer."""
+    app.openapi()
@@ -0,0 +1,113 @@
+"""Sliding-window minimum and maximum of observed metric values."""
+import time
+from collections import deque
+from decimal import Decimal
+from typing import Deque, Dict, Optional, Tuple
+from app.models.alert import AlertType
+
+WindowKey = Tuple[str, AlertType, int]  # (token symbol, metric, window minutes)
+
+
+class SlidingExtrema:
+    """Min and max over the last `seconds` using two monotonic deques.
+
+    The max deque holds values in decreasing order and the min deque in
+    increasing order; a new value evicts every value it dominates from the
+    back, and expired values leave from the front. Each value enters and
+    leaves each deque once, so updates are amortized O(1) and reads O(1).
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._max: Deque[Tuple[float, Decimal]] = deque()
+        self._min: Deque[Tuple[float, Decimal]] = deque()
+
+    def push(self, at: float, value: Decimal) -> None:
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((at, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((at, value))
+        self.expire(at)
+
+    def expire(self, now: float) -> None:
+        cutoff = now - self.seconds
+        while self._max and self._max[0][0] < cutoff:
+            self._max.popleft()
+        while self._min and self._min[0][0] < cutoff:
+            self._min.popleft()
+
+    @property
+    def minimum(self) -> Optional[Decimal]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def maximum(self) -> Optional[Decimal]:
+        return self._max[0][1] if self._max else None
+
+
+def percent_move(current: Decimal, low: Decimal, high: Decimal) -> Decimal:
+    """Largest move to `current` from the window extremes, in percent."""
+    rise = (current - low) / low * 100 if low > 0 else Decimal(0)
+    fall = (high - current) / high * 100 if high > 0 else Decimal(0)
+    return max(rise, fall)
+
+
+class WindowStore:
+    """Sliding extrema per (token, metric, window length).
+
+    Windows are created when an alert or rule asks for them and are shared
+    by every alert with the same token, metric and length. Windows nobody
+    asked for during two of their own lengths are dropped.
+    """
+
+    def __init__(self):
+        self._windows: Dict[WindowKey, SlidingExtrema] = {}
+        self._wanted: Dict[WindowKey, float] = {}
+        self._by_symbol: Dict[str, Dict[WindowKey, SlidingExtrema]] = {}
+
+    def require(self, symbol: str, alert_type: AlertType, minutes: int, now: Optional[float] = None) -> None:
+        """Keep a window for this token, metric and length."""
+        key = (symbol, alert_type, minutes)
+        self._wanted[key] = time.monotonic() if now is None else now
+        if key not in self._windows:
+            window = self._windows[key] = SlidingExtrema(minutes * 60)
+            self._by_symbol.setdefault(symbol, {})[key] = window
+
+    def observe(self, symbol: str, values: Dict[AlertType, Decimal], now: Optional[float] = None) -> None:
+        """Push a token's observed values into its windows."""
+        windows = self._by_symbol.get(symbol)
+        if not windows:
+            return
+        now = time.monotonic() if now is None else now
+        for (_, alert_type, _), window in windows.items():
+            value = values.get(alert_type)
+            if value is not None:
+                window.push(now, value)
+
+    def get(self, symbol: str, alert_type: AlertType, minutes: int) -> Optional[SlidingExtrema]:
+        return self._windows.get((symbol, alert_type, minutes))
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop windows no alert has required recently; returns how many."""
+        now = time.monotonic() if now is None else now
+        stale = [
+            key for key, wanted_at in self._wanted.items()
+            if now - wanted_at > 2 * self._windows[key].seconds
+        ]
+        for key in stale:
+            del self._wanted[key]
+            del self._windows[key]
+            symbol_windows = self._by_symbol[key[0]]
+            del symbol_windows[key]
+            if not symbol_windows:
+                del self._by_symbol[key[0]]
+        return len(stale)
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+
+# Windows of the evaluator in this worker (market evaluation runs on the leader)
+metric_windows = WindowStore()
@@ -0,0 +1,164 @@
+"""In-process metrics registry (counters, gauges, histograms, meters)."""
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+
+class Counter:
+    """Monotonically increasing counter."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> float:
+        return self._value
+
+
+class Gauge:
+    """Point-in-time value, either set directly or read from a callback."""
+
+    def __init__(self, name: str, func: Optional[Callable[[], float]] = None):
+        self.name = name
+        self._value = 0.0
+        self._func = func
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._func() if self._func is not None else self._value
+
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Histogram:
+    """Distribution summary over a bounded window of recent observations."""
+
+    def __init__(self, name: str, window: int = 1024):
+        self.name = name
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._samples.append(value)
+            self._count += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def quantile(self, q: float) -> float:
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self._count,
+            "sum": round(self._sum, 6),
+            "max": round(self._max, 6),
+            "p50": round(self.quantile(0.50), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "p99": round(self.quantile(0.99), 6),
+        }
+
+
+class Meter:
+    """Event rate over a sliding time window (events per second)."""
+
+    def __init__(self, name: str, window_seconds: float = 60.0):
+        self.name = name
+        self.window_seconds = window_seconds
+        self._events: Deque[Tuple[float, float]] = deque()
+        self._lock = threading.Lock()
+
+    def mark(self, amount: float = 1.0) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._events.append((now, amount))
+            self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._events and self._events[0][0] < cutoff:
+            self._events.popleft()
+
+    @property
+    def rate(self) -> float:
+        with self._lock:
+            self._trim(time.monotonic())
+            total = sum(amount for _, amount in self._events)
+        return total / self.window_seconds
+
+    def snapshot(self) -> float:
+        return round(self.rate, 6)
+
+
+class MetricsRegistry:
+    """Named collection of metrics; creating an existing name returns it."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory: Callable[[], object]):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name))
+
+    def gauge(self, name: str, func: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._get_or_create(name, lambda: Gauge(name, func))
+
+    def histogram(self, name: str, window: int = 1024) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, window))
+
+    def meter(self, name: str, window_seconds: float = 60.0) -> Meter:
+        return self._get_or_create(name, lambda: Meter(name, window_seconds))
+
+    def names(self) -> List[str]:
+        return sorted(self._metrics)
+
+    def snapshot(self, prefix: str = "") -> Dict[str, object]:
+        """Return a JSON-serializable view of all metrics under `prefix`."""
+        with self._lock:
+            items = list(self._metrics.items())
+        return {
+            name: metric.snapshot()
+            for name, metric in sorted(items)
+            if name.startswith(prefix)
+        }
+
+
+# Global registry instance
+metrics = MetricsRegistry()
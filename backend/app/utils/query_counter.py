@@ -0,0 +1,77 @@
+"""Per-request SQL statement counting and statement budgets."""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class StatementCounter:
+    """Statements executed within one scope (usually one request)."""
+    count: int = 0
+    statements: List[str] = field(default_factory=list)
+    capture: bool = False
+
+    def record(self, statement: str) -> None:
+        self.count += 1
+        if self.capture:
+            self.statements.append(statement)
+
+
+@dataclass
+class BudgetViolation:
+    """An endpoint that executed more statements than it declared."""
+    endpoint: str
+    budget: int
+    count: int
+    statements: List[str]
+
+    def __str__(self) -> str:
+        listing = "\n    ".join(self.statements)
+        return f"{self.endpoint}: {self.count} statements > budget {self.budget}\n    {listing}"
+
+
+_current: ContextVar[Optional[StatementCounter]] = ContextVar("statement_counter", default=None)
+
+# Violations recorded by the middleware; tests assert this stays empty
+violations: List[BudgetViolation] = []
+
+
+def install_query_counter(engine: AsyncEngine) -> None:
+    """Count statements executed on `engine` into the active counter."""
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter = _current.get()
+        if counter is not None:
+            counter.record(statement)
+
+
+@contextmanager
+def count_statements(capture: bool = False):
+    """Count statements executed in this context (nested scopes are independent)."""
+    counter = StatementCounter(capture=capture)
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+
+
+def statement_budget(limit: int) -> Callable:
+    """Declare the maximum number of SQL statements a route handler may issue.
+
+    The budget covers the whole request, including the `get_current_user`
+    lookup. It is checked by `QueryCountMiddleware` whenever statement
+    counting is enabled.
+    """
+    def decorator(func: Callable) -> Callable:
+        func.__statement_budget__ = limit
+        return func
+    return decorator
+
+
+def get_statement_budget(endpoint: Callable) -> Optional[int]:
+    """Get the declared statement budget of a route handler, if any."""
+    return getattr(endpoint, "__statement_budget__", None)
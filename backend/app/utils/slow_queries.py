@@ -0,0 +1,187 @@
+"""Statement timing per fingerprint and route, with a slow-query log."""
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.config import settings
+from app.utils.metrics import Histogram, metrics
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_ROUTE = "[background]"
+OTHER_FINGERPRINT = "[other]"
+
+# ASGI scope of the request being served; the route is read from it lazily
+# because routing happens after the middleware that sets it
+current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES\s*(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalize a statement: literals and bind parameters become `?`.
+
+    IN lists and multi-row VALUES collapse to one entry, so statements that
+    differ only in list length share a fingerprint.
+    """
+    text = _STRING.sub("?", statement)
+    text = _PARAM.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _SPACE.sub(" ", text).strip()
+    text = _IN_LIST.sub("IN (...)", text)
+    return _VALUES_LIST.sub(r"VALUES \1", text)
+
+
+def current_route() -> str:
+    """'METHOD /route/{template}' of the current request, or the background marker."""
+    scope = current_scope.get()
+    if scope is None:
+        return BACKGROUND_ROUTE
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+@dataclass
+class SlowSample:
+    """The slowest execution seen for a fingerprint and route."""
+    seconds: float
+    statement: str
+    plan: Optional[List[str]] = None
+
+
+class StatementStats:
+    """Timings of one fingerprint on one route."""
+
+    def __init__(self):
+        self.timings = Histogram("statement_seconds", window=256)
+        self.slow = 0
+        self.slowest: Optional[SlowSample] = None
+
+    def as_dict(self) -> dict:
+        summary = self.timings.snapshot()
+        return {
+            "count": summary["count"],
+            "slow_count": self.slow,
+            "total_seconds": summary["sum"],
+            "mean_seconds": round(summary["sum"] / summary["count"], 6) if summary["count"] else 0.0,
+            "p99_seconds": summary["p99"],
+            "max_seconds": summary["max"],
+            "slowest": None if self.slowest is None else {
+                "seconds": round(self.slowest.seconds, 6),
+                "statement": self.slowest.statement,
+                "plan": self.slowest.plan,
+            },
+        }
+
+
+class SlowQueryLog:
+    """Aggregates statement timings and logs statements above the threshold.
+
+    Keys are (fingerprint, route); past `max_fingerprints` distinct keys new
+    fingerprints are folded into `[other]` so memory stays bounded.
+    """
+
+    def __init__(self, max_fingerprints: Optional[int] = None):
+        self.max_fingerprints = max_fingerprints or settings.SLOW_QUERY_MAX_FINGERPRINTS
+        self._stats: Dict[Tuple[str, str], StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float, route: str) -> Tuple[StatementStats, bool]:
+        """Add one execution; returns its stats and whether it is a new slowest sample."""
+        key = (fingerprint(statement), route)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    key = (OTHER_FINGERPRINT, route)
+                    stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = StatementStats()
+        stats.timings.observe(seconds)
+
+        if seconds * 1000 < settings.SLOW_QUERY_THRESHOLD_MS:
+            return stats, False
+        stats.slow += 1
+        metrics.counter("db_slow_statements_total").inc()
+        logger.warning("slow statement (%.1f ms) on %s: %s", seconds * 1000, route, key[0])
+        if stats.slowest is None or seconds > stats.slowest.seconds:
+            stats.slowest = SlowSample(seconds=seconds, statement=statement)
+            return stats, True
+        return stats, False
+
+    def top(self, limit: int = 20, order_by: str = "total_seconds") -> List[dict]:
+        """The `limit` heaviest (fingerprint, route) pairs by `order_by`."""
+        with self._lock:
+            items = list(self._stats.items())
+        rows = [
+            {"fingerprint": fp, "route": route, **stats.as_dict()}
+            for (fp, route), stats in items
+        ]
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+def _explain(conn, statement: str, parameters) -> Optional[List[str]]:
+    """Plan of a statement, fetched on the same connection without executing it."""
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    postgres = conn.dialect.name == "postgresql"
+    prefix = "EXPLAIN " if postgres else "EXPLAIN QUERY PLAN "
+    # Raw DBAPI cursor: bypasses engine events, so budgets and timings are unaffected
+    cursor = conn.connection.dbapi_connection.cursor()
+    savepoint = False
+    try:
+        if postgres and conn.in_transaction():
+            # A failed EXPLAIN must not abort the caller's transaction
+            cursor.execute("SAVEPOINT slow_query_plan")
+            savepoint = True
+        cursor.execute(prefix + statement, parameters)
+        plan = [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_plan")
+        return plan
+    except Exception as exc:
+        if savepoint:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_plan")
+        return [f"plan unavailable: {exc!r}"]
+    finally:
+        cursor.close()
+
+
+def install_slow_query_log(engine: AsyncEngine, log: Optional[SlowQueryLog] = None) -> None:
+    """Time every statement on `engine` into `log` (default: the global log)."""
+    log = log or slow_query_log
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        stats, slowest = log.record(statement, time.perf_counter() - started, current_route())
+        if slowest and settings.SLOW_QUERY_CAPTURE_PLANS and not executemany:
+            stats.slowest.plan = _explain(conn, statement, parameters)
@@ -0,0 +1,128 @@
+"""Content negotiation for compact response encodings."""
+import json
+from typing import Any, Dict, List, Optional
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import Receive, Scope, Send
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is in requirements.txt
+    msgpack = None
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.supplylens.columnar+json"
+MSGPACK = "application/msgpack"
+
+# Media types a client may ask for, mapped to the encoding we answer with
+_ALIASES = {
+    JSON: JSON,
+    COLUMNAR_JSON: COLUMNAR_JSON,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+
+def supported_media_types() -> List[str]:
+    """Encodings this worker can produce, in order of preference."""
+    types = [JSON, COLUMNAR_JSON]
+    if msgpack is not None:
+        types.append(MSGPACK)
+    return types
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Pick the response encoding for an Accept header.
+
+    Only explicitly named compact types are selected; a missing header,
+    `*/*` or anything unknown keeps the default JSON envelope.
+    """
+    if not accept:
+        return JSON
+
+    supported = supported_media_types()
+    best, best_q = JSON, 0.0
+    for part in accept.split(","):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        encoding = _ALIASES.get(media_type.lower())
+        if encoding not in supported:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def to_columnar(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Turn a list of objects into one array per field.
+
+    Field names are sent once instead of once per row. Fields missing from
+    a row are filled with None so every column has the same length.
+    """
+    fields: List[str] = []
+    seen = set()
+    for row in rows:
+        for name in row:
+            if name not in seen:
+                seen.add(name)
+                fields.append(name)
+
+    return {
+        "count": len(rows),
+        "columns": {name: [row.get(name) for row in rows] for name in fields},
+    }
+
+
+def compact_envelope(content: Any) -> Any:
+    """Columnar layout for list envelopes; other payloads are unchanged."""
+    if not isinstance(content, dict):
+        return content
+    data = content.get("data")
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        return content
+    return {**content, "layout": "columnar", "data": to_columnar(data)}
+
+
+def encode(content: Any, encoding: str) -> bytes:
+    """Serialize an already JSON-compatible payload."""
+    if encoding == MSGPACK:
+        return msgpack.packb(compact_envelope(content), use_bin_type=True)
+    if encoding == COLUMNAR_JSON:
+        content = compact_envelope(content)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class NegotiatedResponse(JSONResponse):
+    """JSON response that re-encodes itself when the client asks for a compact type.
+
+    The JSON body is rendered as usual, so nothing changes for existing
+    clients. The encoding is chosen when the response is sent, because that
+    is the first point where the request's Accept header is available.
+    """
+
+    def render(self, content: Any) -> bytes:
+        self._content = content
+        return super().render(content)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = negotiate(Headers(scope=scope).get("accept"))
+        if encoding != JSON:
+            self.body = encode(self._content, encoding)
+            self.headers["content-length"] = str(len(self.body))
+            self.headers["content-type"] = encoding
+        self.headers.add_vary_header("Accept")
+        await super().__call__(scope, receive, send)
@@ -4,11 +4,14 @@ import asyncio
 from typing import AsyncGenerator
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from app.database import Base, get_db
+from app.database import Base, get_db, get_session_factory
 from app.config import settings
 from app import app as fastapi_app
 from app.models.user import User
+from app.routers.auth import limiter
 from app.services.auth import get_password_hash
+from app.utils import query_counter
+from app.utils.slow_queries import install_slow_query_log
 
 # Test database URL (use in-memory SQLite for tests)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -16,6 +19,11 @@ TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 # Create test engine
 test_engine = create_async_engine(TEST_DATABASE_URL, echo=False)
 
+# Count statements so declared endpoint budgets are enforced in tests
+query_counter.install_query_counter(test_engine)
+settings.SQL_COUNT_STATEMENTS = True
+install_slow_query_log(test_engine)
+
 # Create test session factory
 TestSessionLocal = async_sessionmaker(
     test_engine,
@@ -32,6 +40,24 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def statement_budgets():
+    """Fail the test if any endpoint exceeded its SQL statement budget."""
+    query_counter.violations.clear()
+    yield
+    violations = list(query_counter.violations)
+    query_counter.violations.clear()
+    assert not violations, "SQL statement budget exceeded:\n" + "\n".join(map(str, violations))
+
+
+@pytest.fixture(autouse=True)
+def rate_limits():
+    """Start every test with empty rate limit counters, whatever ran before."""
+    limiter.reset()
+    yield
+    limiter.reset()
+
+
 @pytest.fixture
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     """Create a test database session."""
@@ -45,6 +71,12 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture
+def session_factory(db_session: AsyncSession) -> async_sessionmaker:
+    """Session factory bound to the test database (for background workers)."""
+    return TestSessionLocal
+
+
 @pytest.fixture
 async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """Create a test client."""
@@ -52,6 +84,7 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
     
     fastapi_app.dependency_overrides[get_db] = override_get_db
+    fastapi_app.dependency_overrides[get_session_factory] = lambda: TestSessionLocal
     
     transport = ASGITransport(app=fastapi_app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
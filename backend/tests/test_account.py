@@ -0,0 +1,81 @@
+"""Tests for account deletion."""
+import pytest
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select, func
+from app.models.alert import Alert, AlertType, AlertCondition
+from app.models.user import User
+from app.models.watchlist import Watchlist
+from app.services.account_deletion import purge_user, request_account_deletion
+
+
+async def _count(db_session, model):
+    result = await db_session.execute(select(func.count()).select_from(model))
+    return result.scalar()
+
+
+async def _add_children(db_session, user, alerts=5, watchlist=3):
+    db_session.add_all([
+        Alert(
+            user_id=user.id,
+            token_symbol=f"T{i}",
+            alert_type=AlertType.PRICE,
+            condition=AlertCondition.ABOVE,
+            threshold_value=Decimal("1")
+        )
+        for i in range(alerts)
+    ])
+    db_session.add_all([Watchlist(user_id=user.id, token_symbol=f"W{i}") for i in range(watchlist)])
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_delete_account(client: AsyncClient, auth_headers, db_session, test_user):
+    """Test that deleting the account revokes access and purges data."""
+    await _add_children(db_session, test_user)
+
+    response = await client.delete("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["data"]["deleted"] is True
+
+    response = await client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 401
+
+    assert await _count(db_session, Alert) == 0
+    assert await _count(db_session, Watchlist) == 0
+    assert await _count(db_session, User) == 0
+
+
+@pytest.mark.asyncio
+async def test_purge_user_in_chunks(db_session, test_user, session_factory):
+    """Test that purging works through children in fixed-size chunks."""
+    await _add_children(db_session, test_user, alerts=5, watchlist=3)
+    await request_account_deletion(db_session, test_user.id)
+
+    deleted = await purge_user(session_factory, test_user.id, batch_size=2)
+
+    assert deleted == 5 + 3 + 1
+    assert await _count(db_session, Alert) == 0
+    assert await _count(db_session, User) == 0
+
+
+@pytest.mark.asyncio
+async def test_purge_skips_active_users(db_session, test_user, session_factory):
+    """Test that purge never deletes data of a user who was not tombstoned."""
+    await _add_children(db_session, test_user)
+    assert await purge_user(session_factory, test_user.id) == 0
+    assert await _count(db_session, User) == 1
+    assert await _count(db_session, Alert) == 5
+
+
+@pytest.mark.asyncio
+async def test_email_is_free_before_purge(client: AsyncClient, db_session, test_user):
+    """Test that a deleted account's email can be registered again before the purge runs."""
+    await request_account_deletion(db_session, test_user.id)
+
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": "test@example.com", "password": "TestPassword123!"}
+    )
+    assert response.json()["success"] is True
+    assert await _count(db_session, User) == 2
@@ -0,0 +1,132 @@
+"""Tests for compound alert rules and their evaluation plans."""
+import pytest
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select
+from app.models.alert import Alert, AlertType, AlertCondition
+from app.models.alert_rule import AlertRule
+from app.models.notification import NotificationOutbox
+from app.services.evaluator import evaluate_alerts
+from app.services.rules import PREDICATE, compile_plans
+
+PRICE_BELOW = {"alert_type": "price", "condition": "below", "threshold_value": "60000"}
+VOLUME_ABOVE = {"alert_type": "volume", "condition": "above", "threshold_value": "1000"}
+LIQUIDITY_ABOVE = {"alert_type": "liquidity", "condition": "above", "threshold_value": "5"}
+
+
+def _rule(expression, symbol="BTC"):
+    return AlertRule(token_symbol=symbol, expression=expression, is_active=True)
+
+
+def test_plan_shares_predicates_and_subexpressions():
+    """Test that equal conditions and groups are evaluated once per token."""
+    alert = Alert(
+        token_symbol="BTC",
+        alert_type=AlertType.PRICE,
+        condition=AlertCondition.BELOW,
+        threshold_value=Decimal("60000.00000000")
+    )
+    both = _rule({"op": "and", "conditions": [PRICE_BELOW, VOLUME_ABOVE]})
+    reordered = _rule({"op": "and", "conditions": [VOLUME_ABOVE, PRICE_BELOW]})
+    nested = _rule({"op": "or", "conditions": [
+        LIQUIDITY_ABOVE,
+        {"op": "and", "conditions": [PRICE_BELOW, {"op": "and", "conditions": [VOLUME_ABOVE, PRICE_BELOW]}]},
+    ]})
+
+    plan = compile_plans([alert], [both, reordered, nested])["BTC"]
+
+    assert plan.predicate_count == 3
+    assert len(plan.nodes) == 5  # 3 predicates, one shared AND, one OR
+    assert all(child < index for index, node in enumerate(plan.nodes) for child in node.children)
+    assert [n.op for n in plan.nodes].count(PREDICATE) == 3
+
+    matched = plan.evaluate({AlertType.PRICE: Decimal("59000"), AlertType.VOLUME: Decimal("2000")})
+    assert matched == [alert, both, reordered, nested]
+    matched = plan.evaluate({AlertType.PRICE: Decimal("59000")})
+    assert matched == [alert]
+    matched = plan.evaluate({AlertType.LIQUIDITY: Decimal("6")})
+    assert matched == [nested]
+
+
+@pytest.mark.asyncio
+async def test_evaluation_triggers_rules_once(db_session, test_user):
+    """Test that a satisfied rule triggers with one outbox message."""
+    rule = AlertRule(
+        user_id=test_user.id,
+        token_symbol="BTC",
+        expression={"op": "and", "conditions": [PRICE_BELOW, VOLUME_ABOVE]}
+    )
+    db_session.add(rule)
+    await db_session.commit()
+
+    assert await evaluate_alerts(db_session, {"BTC": {AlertType.PRICE: Decimal("59000")}}) == []
+
+    triggered = await evaluate_alerts(
+        db_session, {"BTC": {AlertType.PRICE: Decimal("59000"), AlertType.VOLUME: Decimal("5000")}}
+    )
+    assert triggered == [rule]
+    assert rule.is_active is False and rule.triggered_at is not None
+
+    result = await db_session.execute(select(NotificationOutbox))
+    message = result.scalar_one()
+    assert message.kind == "rule_triggered"
+    assert message.payload["observed_values"] == {"price": "59000", "volume": "5000"}
+
+    again = await evaluate_alerts(
+        db_session, {"BTC": {AlertType.PRICE: Decimal("1"), AlertType.VOLUME: Decimal("5000")}}
+    )
+    assert again == []
+
+
+@pytest.mark.asyncio
+async def test_alert_rule_crud(client: AsyncClient, auth_headers):
+    """Test creating, listing, updating and deleting a rule."""
+    response = await client.post(
+        "/api/v1/alert-rules",
+        json={
+            "name": "dip on volume",
+            "token_symbol": "BTC",
+            "expression": {"op": "and", "conditions": [PRICE_BELOW, VOLUME_ABOVE]}
+        },
+        headers=auth_headers
+    )
+    data = response.json()
+    assert data["success"] is True
+    rule_id = data["data"]["id"]
+    assert data["data"]["expression"]["conditions"][0]["threshold_value"] == "60000"
+
+    response = await client.get("/api/v1/alert-rules", headers=auth_headers)
+    assert response.json()["pagination"]["total"] == 1
+
+    response = await client.put(
+        f"/api/v1/alert-rules/{rule_id}",
+        json={"expression": {"op": "or", "conditions": [PRICE_BELOW, LIQUIDITY_ABOVE]}},
+        headers=auth_headers
+    )
+    assert response.json()["data"]["expression"]["op"] == "or"
+
+    response = await client.delete(f"/api/v1/alert-rules/{rule_id}", headers=auth_headers)
+    assert response.json()["data"] == {"deleted": True}
+    response = await client.get(f"/api/v1/alert-rules/{rule_id}", headers=auth_headers)
+    assert response.json()["error"]["code"] == "ALERT_RULE_NOT_FOUND"
+
+
+@pytest.mark.asyncio
+async def test_alert_rule_validation(client: AsyncClient, auth_headers):
+    """Test that groups need two conditions and nesting is bounded."""
+    response = await client.post(
+        "/api/v1/alert-rules",
+        json={"token_symbol": "BTC", "expression": {"op": "and", "conditions": [PRICE_BELOW]}},
+        headers=auth_headers
+    )
+    assert response.status_code == 422
+
+    expression = PRICE_BELOW
+    for _ in range(5):
+        expression = {"op": "and", "conditions": [expression, VOLUME_ABOVE]}
+    response = await client.post(
+        "/api/v1/alert-rules",
+        json={"token_symbol": "BTC", "expression": expression},
+        headers=auth_headers
+    )
+    assert response.status_code == 422
@@ -0,0 +1,91 @@
+"""Tests for alert archival."""
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select, func
+from app.models.alert import Alert, AlertType, AlertCondition
+from app.models.alert_archive import ArchivedAlert
+from app.services.archival import archive_cold_alerts
+
+
+async def _add_alert(db_session, user, symbol, *, active=True, triggered_days=None, idle_days=0):
+    now = datetime.utcnow()
+    alert = Alert(
+        user_id=user.id,
+        token_symbol=symbol,
+        alert_type=AlertType.PRICE,
+        condition=AlertCondition.ABOVE,
+        threshold_value=Decimal("1"),
+        is_active=active,
+        triggered_at=now - timedelta(days=triggered_days) if triggered_days is not None else None,
+        created_at=now - timedelta(days=idle_days),
+        updated_at=now - timedelta(days=idle_days)
+    )
+    db_session.add(alert)
+    await db_session.commit()
+    return alert
+
+
+async def _count(db_session, model):
+    result = await db_session.execute(select(func.count()).select_from(model))
+    return result.scalar()
+
+
+async def _seed(db_session, user):
+    await _add_alert(db_session, user, "HOT")
+    await _add_alert(db_session, user, "OLDACTIVE", idle_days=90)
+    await _add_alert(db_session, user, "RECENTTRIG", active=False, triggered_days=1, idle_days=1)
+    await _add_alert(db_session, user, "OLDTRIG", active=False, triggered_days=10, idle_days=10)
+    await _add_alert(db_session, user, "IDLE", active=False, idle_days=40)
+    await _add_alert(db_session, user, "PAUSED", active=False, idle_days=5)
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_only_cold_alerts(db_session, test_user, session_factory):
+    """Test that old triggered and long-inactive alerts move to the archive."""
+    await _seed(db_session, test_user)
+
+    moved = await archive_cold_alerts(session_factory, batch_size=1)
+
+    assert moved == 2
+    archived = await db_session.execute(select(ArchivedAlert.token_symbol))
+    assert sorted(archived.scalars().all()) == ["IDLE", "OLDTRIG"]
+    assert await _count(db_session, Alert) == 4
+
+    # Nothing left to do on the next run
+    assert await archive_cold_alerts(session_factory) == 0
+
+
+@pytest.mark.asyncio
+async def test_archive_run_is_bounded_and_resumable(db_session, test_user, session_factory):
+    """Test that a run stops after max_batches and the next run continues."""
+    for i in range(5):
+        await _add_alert(db_session, test_user, f"T{i}", active=False, triggered_days=30, idle_days=30)
+
+    assert await archive_cold_alerts(session_factory, batch_size=2, max_batches=1) == 2
+    assert await archive_cold_alerts(session_factory, batch_size=2) == 3
+    assert await _count(db_session, ArchivedAlert) == 5
+
+
+@pytest.mark.asyncio
+async def test_listing_includes_archive_on_request(
+    client: AsyncClient, auth_headers, db_session, test_user, session_factory
+):
+    """Test that listings only show archived alerts when asked."""
+    await _seed(db_session, test_user)
+    await archive_cold_alerts(session_factory)
+
+    response = await client.get("/api/v1/alerts", headers=auth_headers)
+    body = response.json()
+    assert body["pagination"]["total"] == 4
+    assert all("archived_at" not in alert for alert in body["data"])
+
+    response = await client.get("/api/v1/alerts?include_archived=true&per_page=100", headers=auth_headers)
+    body = response.json()
+    assert body["pagination"]["total"] == 6
+    archived = {a["token_symbol"] for a in body["data"] if a["archived_at"] is not None}
+    assert archived == {"IDLE", "OLDTRIG"}
+    created = [a["created_at"] for a in body["data"]]
+    assert created == sorted(created, reverse=True)
+    assert response.headers["X-SQL-Statements"] == "3"
@@ -1,6 +1,7 @@
 """Tests for authentication endpoints."""
 import pytest
 from httpx import AsyncClient
+from app.config import settings
 
 
 @pytest.mark.asyncio
@@ -89,6 +90,16 @@ async def test_login_invalid_credentials(client: AsyncClient, test_user):
     assert "Invalid" in data["error"]["message"]
 
 
+
+@pytest.mark.asyncio
+async def test_login_rate_limit_follows_settings(client: AsyncClient, test_user, monkeypatch):
+    """Test that login attempts beyond RATE_LIMIT_AUTH_PER_15MIN are refused."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_AUTH_PER_15MIN", 2)
+    credentials = {"email": "test@example.com", "password": "WrongPassword!"}
+    statuses = [(await client.post("/api/v1/auth/login", json=credentials)).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+
+
 @pytest.mark.asyncio
 async def test_get_me(client: AsyncClient, auth_headers):
     """Test getting current user info."""
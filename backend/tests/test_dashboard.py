@@ -0,0 +1,157 @@
+"""Tests for the dashboard summary."""
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID
+from httpx import AsyncClient
+from sqlalchemy import delete, update
+from app.models.alert import Alert, AlertType
+from app.models.user_stats import UserStats
+from app.services.archival import archive_cold_alerts
+from app.services.counters import adjust_counters, reconcile_all_user_stats, reconcile_user_stats
+from app.services.evaluator import evaluate_alerts
+from app.utils import query_counter
+
+
+async def _summary(client, auth_headers):
+    response = await client.get("/api/v1/dashboard/summary", headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()["data"]
+
+
+async def _create_alert(client, auth_headers, threshold="100"):
+    response = await client.post(
+        "/api/v1/alerts",
+        json={
+            "token_symbol": "BTC",
+            "alert_type": "price",
+            "condition": "above",
+            "threshold_value": threshold
+        },
+        headers=auth_headers
+    )
+    return response.json()["data"]["id"]
+
+
+@pytest.mark.asyncio
+async def test_summary_tracks_mutations(client: AsyncClient, auth_headers):
+    """Test that counters follow creates, toggles and deletes."""
+    first = await _create_alert(client, auth_headers)
+    second = await _create_alert(client, auth_headers)
+    await client.post("/api/v1/watchlist", json={"token_symbol": "ETH"}, headers=auth_headers)
+    item = await client.post("/api/v1/watchlist", json={"token_symbol": "SOL"}, headers=auth_headers)
+
+    summary = await _summary(client, auth_headers)
+    assert summary["active_alert_count"] == 2
+    assert summary["watchlist_count"] == 2
+
+    await client.patch(f"/api/v1/alerts/{first}/toggle", json={"is_active": False}, headers=auth_headers)
+    # Toggling to the current state must not change the counter again
+    await client.patch(f"/api/v1/alerts/{first}/toggle", json={"is_active": False}, headers=auth_headers)
+    await client.delete(f"/api/v1/alerts/{second}", headers=auth_headers)
+    await client.delete(f"/api/v1/watchlist/{item.json()['data']['id']}", headers=auth_headers)
+
+    summary = await _summary(client, auth_headers)
+    assert summary["active_alert_count"] == 0
+    assert summary["watchlist_count"] == 1
+    assert summary["triggered_last_24h"] == 0
+    assert summary["recent_triggers"] == []
+
+
+@pytest.mark.asyncio
+async def test_summary_counts_triggers(client: AsyncClient, auth_headers, db_session):
+    """Test that triggered alerts show up in the summary."""
+    await _create_alert(client, auth_headers, threshold="100")
+    await _create_alert(client, auth_headers, threshold="200")
+
+    await evaluate_alerts(db_session, {"BTC": {AlertType.PRICE: Decimal("150")}})
+
+    summary = await _summary(client, auth_headers)
+    assert summary["active_alert_count"] == 1
+    assert summary["triggered_last_24h"] == 1
+    assert len(summary["recent_triggers"]) == 1
+    assert summary["recent_triggers"][0]["token_symbol"] == "BTC"
+    assert Decimal(summary["recent_triggers"][0]["observed_value"]) == Decimal("150")
+
+
+@pytest.mark.asyncio
+async def test_summary_rebuilds_missing_counters(client: AsyncClient, auth_headers, db_session, test_user):
+    """Test that a missing counters row is rebuilt from the tables."""
+    await _create_alert(client, auth_headers)
+    await db_session.execute(delete(UserStats).where(UserStats.user_id == test_user.id))
+    await db_session.commit()
+
+    summary = await _summary(client, auth_headers)
+    assert summary["active_alert_count"] == 1
+    assert summary["watchlist_count"] == 0
+
+    # The one-off rebuild is allowed to exceed the steady-state budget
+    assert [v.endpoint for v in query_counter.violations] == ["get_dashboard_summary"]
+    query_counter.violations.clear()
+
+    response = await client.get("/api/v1/dashboard/summary", headers=auth_headers)
+    assert response.headers["X-SQL-Statements"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_reconcile_all_user_stats(client: AsyncClient, auth_headers, db_session, test_user, session_factory):
+    """Test that the nightly reconciliation fixes drifted counters."""
+    await _create_alert(client, auth_headers)
+    await db_session.execute(
+        update(UserStats).where(UserStats.user_id == test_user.id).values(active_alert_count=42)
+    )
+    await db_session.commit()
+
+    assert await reconcile_all_user_stats(session_factory, batch_size=1) == 1
+
+    summary = await _summary(client, auth_headers)
+    assert summary["active_alert_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_reconcile_keeps_archived_triggers(client: AsyncClient, auth_headers, db_session, test_user, session_factory):
+    """Test that triggers of archived alerts survive reconciliation, with their observed value."""
+    await _create_alert(client, auth_headers, threshold="100")
+    await evaluate_alerts(db_session, {"BTC": {AlertType.PRICE: Decimal("150")}})
+    assert await archive_cold_alerts(session_factory, now=datetime.utcnow() + timedelta(days=60)) == 1
+
+    assert await reconcile_all_user_stats(session_factory) == 1
+    (trigger,) = (await _summary(client, auth_headers))["recent_triggers"]
+    assert Decimal(trigger["observed_value"]) == Decimal("150")
+
+    # Without the recorded entry, it is rebuilt from the archive
+    await db_session.execute(
+        update(UserStats).where(UserStats.user_id == test_user.id).values(recent_triggers=[])
+    )
+    await db_session.commit()
+    stats = await reconcile_user_stats(db_session, test_user.id)
+    assert [t["token_symbol"] for t in stats.recent_triggers] == ["BTC"]
+    assert stats.recent_triggers[0]["observed_value"] is None
+
+
+@pytest.mark.asyncio
+async def test_alert_toggled_off_while_evaluating_is_not_triggered(
+    client: AsyncClient, auth_headers, db_session, test_user, session_factory, monkeypatch
+):
+    """Test that an alert deactivated after the evaluator loaded it is not triggered or counted twice."""
+    alert_id = await _create_alert(client, auth_headers, threshold="100")
+    execute = db_session.execute
+    toggled = []
+
+    async def execute_then_toggle(statement, *args, **kwargs):
+        result = await execute(statement, *args, **kwargs)
+        if not toggled:
+            # Another worker toggles the alert off once the evaluator has read it
+            toggled.append(True)
+            async with session_factory() as other:
+                await other.execute(update(Alert).where(Alert.id == UUID(alert_id)).values(is_active=False))
+                await adjust_counters(other, test_user.id, active_alerts=-1)
+                await other.commit()
+        return result
+
+    monkeypatch.setattr(db_session, "execute", execute_then_toggle)
+    assert await evaluate_alerts(db_session, {"BTC": {AlertType.PRICE: Decimal("150")}}) == []
+
+    summary = await _summary(client, auth_headers)
+    assert summary["active_alert_count"] == 0
+    assert summary["triggered_last_24h"] == 0
@@ -0,0 +1,67 @@
+"""Tests for session lifecycle and pool instrumentation."""
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.config import settings
+from app.database import (
+    InstrumentedQueuePool, engine_options, instrument_pool, session_has_writes
+)
+from app.models.user import User
+from app.utils.metrics import metrics
+
+
+def test_engine_options_for_sqlite_skip_pool_settings():
+    """Test that SQLite URLs do not receive queue-pool arguments."""
+    options = engine_options("sqlite+aiosqlite:///:memory:")
+    assert "pool_size" not in options
+
+
+def test_engine_options_use_configured_pool():
+    """Test that server databases use the configured instrumented pool."""
+    options = engine_options("postgresql+asyncpg://u:p@localhost/db")
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+
+
+@pytest.mark.asyncio
+async def test_read_only_session_has_no_writes(db_session, test_user):
+    """Test that reads alone do not require a commit."""
+    await db_session.execute(select(User))
+    assert not session_has_writes(db_session)
+
+    test_user.email = "changed@example.com"
+    assert session_has_writes(db_session)
+    await db_session.flush()
+    assert session_has_writes(db_session)
+
+    await db_session.commit()
+    assert not session_has_writes(db_session)
+
+
+@pytest.mark.asyncio
+async def test_pool_records_wait_and_timeouts(tmp_path):
+    """Test that pool waits, checkouts and timeouts are measured."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+    instrument_pool(engine)
+    waits_before = metrics.histogram("db_pool_wait_seconds").snapshot()["count"]
+    checkouts_before = metrics.histogram("db_pool_checkout_seconds").snapshot()["count"]
+    timeouts_before = metrics.counter("db_pool_timeouts_total").value
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        with pytest.raises(Exception):
+            async with engine.connect() as second:
+                await second.execute(text("SELECT 1"))
+
+    await engine.dispose()
+
+    assert metrics.histogram("db_pool_wait_seconds").snapshot()["count"] >= waits_before + 2
+    assert metrics.histogram("db_pool_checkout_seconds").snapshot()["count"] >= checkouts_before + 1
+    assert metrics.counter("db_pool_timeouts_total").value == timeouts_before + 1
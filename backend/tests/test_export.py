@@ -0,0 +1,111 @@
+"""Tests for the streamed account export."""
+import json
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from app.models.alert import Alert, AlertType, AlertCondition
+from app.models.alert_archive import ArchivedAlert
+from app.models.notification import NotificationOutbox
+from app.models.user import User
+from app.models.watchlist import Watchlist
+from app.services.export import export_account
+
+
+def _alert(user, symbol, created_at=None):
+    return Alert(
+        user_id=user.id,
+        token_symbol=symbol,
+        alert_type=AlertType.PRICE,
+        condition=AlertCondition.ABOVE,
+        threshold_value=Decimal("1.5"),
+        created_at=created_at or datetime.utcnow()
+    )
+
+
+def _outbox(user, kind, key):
+    return NotificationOutbox(user_id=user.id, kind=kind, dedupe_key=key, payload={"token_symbol": "BTC"})
+
+
+def _lines(body: bytes):
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_export_account(client: AsyncClient, auth_headers, db_session, test_user):
+    """Test that the export streams every section of the user's data and nothing else."""
+    other = User(email="other@example.com", password_hash="x")
+    db_session.add(other)
+    await db_session.flush()
+    now = datetime.utcnow()
+    db_session.add_all([
+        _alert(test_user, "BTC"),
+        _alert(other, "ETH"),
+        ArchivedAlert(
+            id=uuid.uuid4(),
+            user_id=test_user.id, token_symbol="OLD", alert_type=AlertType.PRICE,
+            condition=AlertCondition.BELOW, threshold_value=Decimal("2"), is_active=False,
+            created_at=now, updated_at=now
+        ),
+        Watchlist(user_id=test_user.id, token_symbol="SOL"),
+        _outbox(test_user, "alert_triggered", "a:1"),
+        _outbox(test_user, "digest", "d:1"),
+        _outbox(other, "alert_triggered", "a:2"),
+    ])
+    await db_session.commit()
+
+    response = await client.get("/api/v1/auth/me/export", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in response.headers["content-disposition"]
+    lines = _lines(response.content)
+    assert lines[0]["type"] == "account"
+    assert lines[0]["data"]["email"] == "test@example.com"
+    assert lines[-1] == {"type": "end", "data": {"counts": {
+        "alert": 1, "archived_alert": 1, "alert_rule": 0, "watchlist": 1, "trigger": 1
+    }}}
+    rows = {line["type"]: line["data"] for line in lines[1:-1]}
+    assert rows["alert"]["token_symbol"] == "BTC"
+    assert rows["alert"]["threshold_value"] == "1.50000000"
+    assert rows["alert"]["alert_type"] == "price"
+    assert "user_id" not in rows["alert"]
+    assert rows["archived_alert"]["token_symbol"] == "OLD"
+    assert rows["watchlist"]["token_symbol"] == "SOL"
+    assert rows["trigger"]["kind"] == "alert_triggered"
+    assert rows["trigger"]["payload"] == {"token_symbol": "BTC"}
+
+
+@pytest.mark.asyncio
+async def test_export_reads_fixed_size_chunks(db_session, test_user, session_factory):
+    """Test that rows are read in keyset chunks, each on its own short session."""
+    created = datetime.utcnow() - timedelta(days=1)
+    # Equal timestamps make the id tie-break carry the keyset across chunks
+    db_session.add_all([_alert(test_user, f"T{i}", created + timedelta(minutes=i // 2)) for i in range(7)])
+    await db_session.commit()
+
+    sessions = 0
+
+    def counting_factory():
+        nonlocal sessions
+        sessions += 1
+        return session_factory()
+
+    chunks = [chunk async for chunk in export_account(counting_factory, test_user, chunk_size=3)]
+    alert_chunks = [_lines(chunk) for chunk in chunks if b'"type":"alert"' in chunk]
+
+    assert [len(chunk) for chunk in alert_chunks] == [3, 3, 1]
+    alerts = [line["data"] for chunk in alert_chunks for line in chunk]
+    assert len({alert["id"] for alert in alerts}) == 7
+    assert [alert["created_at"] for alert in alerts] == sorted(alert["created_at"] for alert in alerts)
+    # 3 alert chunks, then one empty chunk for each of the other four sections
+    assert sessions == 3 + 4
+    assert _lines(chunks[-1])[0]["data"]["counts"]["alert"] == 7
+
+
+@pytest.mark.asyncio
+async def test_export_requires_authentication(client: AsyncClient):
+    """Test that the export is not served without a token."""
+    response = await client.get("/api/v1/auth/me/export")
+    assert response.status_code in (401, 403)
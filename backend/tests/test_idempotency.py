@@ -0,0 +1,82 @@
+"""Tests for Idempotency-Key handling on create and update endpoints."""
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import select, func
+from app.models.alert import Alert
+from app.models.idempotency import IdempotencyRecord
+from app.services.idempotency import (
+    ClaimOutcome, ResponseCache, StoredResponse, claim_key, purge_expired_keys, response_cache
+)
+
+ALERT = {"token_symbol": "BTC", "alert_type": "price", "condition": "above", "threshold_value": "50000"}
+
+
+def test_response_cache_is_bounded_and_expires():
+    """Test LRU eviction and TTL expiry of the replay cache."""
+    cache = ResponseCache(max_entries=2, ttl_seconds=10)
+    response = StoredResponse("h", 200, "application/json", b"{}")
+    cache.put("a", response, now=0)
+    cache.put("b", response, now=0)
+    cache.get("a", now=1)
+    cache.put("c", response, now=1)
+
+    assert cache.get("b", now=1) is None  # least recently used
+    assert cache.get("a", now=5) is response
+    assert cache.get("a", now=10) is None
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_retried_create_is_replayed(db_session, client: AsyncClient, auth_headers):
+    """Test that a retried POST returns the first response and creates one alert."""
+    headers = {**auth_headers, "Idempotency-Key": "create-1"}
+    first = await client.post("/api/v1/alerts", json=ALERT, headers=headers)
+    second = await client.post("/api/v1/alerts", json=ALERT, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "X-SQL-Statements" not in second.headers  # served from the replay cache
+    assert (await db_session.execute(select(func.count()).select_from(Alert))).scalar() == 1
+
+    response_cache.clear()  # as if the retry reached another worker
+    third = await client.post("/api/v1/alerts", json=ALERT, headers=headers)
+    assert third.content == first.content
+    assert (await db_session.execute(select(func.count()).select_from(Alert))).scalar() == 1
+
+    reused = await client.post("/api/v1/alerts", json={**ALERT, "token_symbol": "ETH"}, headers=headers)
+    assert reused.status_code == 422
+    assert reused.json()["error"]["code"] == "IDEMPOTENCY_KEY_REUSED"
+
+
+@pytest.mark.asyncio
+async def test_failed_request_frees_its_key(client: AsyncClient, auth_headers):
+    """Test that validation errors are not stored, and keys are per user."""
+    headers = {**auth_headers, "Idempotency-Key": "fix-and-retry"}
+    response = await client.put("/api/v1/watchlist/not-a-uuid", json={"notes": "x"}, headers=headers)
+    assert response.status_code == 422
+
+    response = await client.post("/api/v1/watchlist", json={"token_symbol": "ETH"}, headers=headers)
+    assert response.json()["success"] is True
+
+    response = await client.post(
+        "/api/v1/alerts", json=ALERT, headers={**auth_headers, "Idempotency-Key": "x" * 256}
+    )
+    assert response.json()["error"]["code"] == "IDEMPOTENCY_KEY_INVALID"
+
+
+@pytest.mark.asyncio
+async def test_claims_and_purge(session_factory, test_user):
+    """Test in-progress claims, takeover of abandoned ones and purging expired keys."""
+    now = datetime.utcnow()
+    assert await claim_key(session_factory, test_user.id, "k", "h1", now=now) == (ClaimOutcome.CLAIMED, None)
+    assert await claim_key(session_factory, test_user.id, "k", "h1", now=now) == (ClaimOutcome.IN_PROGRESS, None)
+    assert await claim_key(session_factory, test_user.id, "k", "h2", now=now) == (ClaimOutcome.MISMATCH, None)
+
+    later = now + timedelta(minutes=5)  # the first request never finished
+    assert await claim_key(session_factory, test_user.id, "k", "h2", now=later) == (ClaimOutcome.CLAIMED, None)
+
+    assert await purge_expired_keys(session_factory, batch_size=1, now=later + timedelta(days=2)) == 1
+    async with session_factory() as session:
+        assert (await session.execute(select(func.count()).select_from(IdempotencyRecord))).scalar() == 0
@@ -0,0 +1,81 @@
+"""Tests for filtered and sorted alert and watchlist listings."""
+import pytest
+from uuid import UUID
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import update
+from app.cli.bench_listing import run
+from app.models.alert import Alert
+
+
+async def _create_alert(client, auth_headers, symbol, alert_type="price", condition="above"):
+    response = await client.post(
+        "/api/v1/alerts",
+        json={"token_symbol": symbol, "alert_type": alert_type, "condition": condition, "threshold_value": "1"},
+        headers=auth_headers
+    )
+    return response.json()["data"]["id"]
+
+
+async def _list(client, auth_headers, path, **params):
+    response = await client.get(path, params=params, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    return body["pagination"]["total"], [item["token_symbol"] for item in body["data"]]
+
+
+@pytest.mark.asyncio
+async def test_alert_filters_and_sorts(db_session, client: AsyncClient, auth_headers):
+    """Test each alert filter, the sort orders and that counts follow the filters."""
+    btc_price = await _create_alert(client, auth_headers, "BTC")
+    eth_volume = await _create_alert(client, auth_headers, "ETH", alert_type="volume", condition="below")
+    await _create_alert(client, auth_headers, "SOL")
+    await client.patch(f"/api/v1/alerts/{eth_volume}/toggle", json={"is_active": False}, headers=auth_headers)
+
+    now = datetime.utcnow()
+    for alert_id, hours_ago in ((btc_price, 1), (eth_volume, 48)):
+        await db_session.execute(
+            update(Alert).where(Alert.id == UUID(alert_id)).values(triggered_at=now - timedelta(hours=hours_ago))
+        )
+    await db_session.commit()
+
+    assert await _list(client, auth_headers, "/api/v1/alerts", token_symbol="ETH") == (1, ["ETH"])
+    assert await _list(client, auth_headers, "/api/v1/alerts", alert_type="volume") == (1, ["ETH"])
+    assert await _list(client, auth_headers, "/api/v1/alerts", condition="above") == (2, ["SOL", "BTC"])
+    assert await _list(client, auth_headers, "/api/v1/alerts", is_active="false") == (1, ["ETH"])
+    since = (now - timedelta(hours=2)).isoformat() + "Z"
+    assert await _list(client, auth_headers, "/api/v1/alerts", triggered_since=since) == (1, ["BTC"])
+
+    assert await _list(client, auth_headers, "/api/v1/alerts", sort="created_at") == (3, ["BTC", "ETH", "SOL"])
+    assert await _list(client, auth_headers, "/api/v1/alerts", sort="-triggered_at") == (2, ["BTC", "ETH"])
+    assert await _list(
+        client, auth_headers, "/api/v1/alerts", sort="-created_at", include_archived="true", condition="below"
+    ) == (1, ["ETH"])
+
+    response = await client.get("/api/v1/alerts", params={"sort": "threshold_value"}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_watchlist_prefix_and_sort(client: AsyncClient, auth_headers):
+    """Test the watchlist symbol prefix filter (wildcards taken literally) and sorts."""
+    for symbol in ("BTC", "ETH", "BNB", "B_X"):
+        await client.post("/api/v1/watchlist", json={"token_symbol": symbol}, headers=auth_headers)
+
+    path = "/api/v1/watchlist"
+    assert await _list(client, auth_headers, path, symbol_prefix="B", sort="token_symbol") == (3, ["BNB", "BTC", "B_X"])
+    assert await _list(client, auth_headers, path, symbol_prefix="B_") == (1, ["B_X"])
+    assert await _list(client, auth_headers, path, symbol_prefix="%") == (0, [])
+    assert await _list(client, auth_headers, path, sort="created_at") == (4, ["BTC", "ETH", "BNB", "B_X"])
+
+
+@pytest.mark.asyncio
+async def test_listing_plans_stay_on_indexes():
+    """Test that every filter and sort combination is index-backed as the table grows."""
+    report = await run("sqlite+aiosqlite://", sizes=[500, 5000], users=5)
+
+    for size, checks in report.items():
+        assert checks, size
+        problems = [(check.case, check.query, check.plan) for check in checks if not check.ok]
+        assert problems == [], size
+        assert all(check.index_only for check in checks if check.query == "count")
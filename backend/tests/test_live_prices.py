@@ -0,0 +1,190 @@
+"""Tests for live price subscriptions."""
+import asyncio
+import json
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from app import app as fastapi_app
+from app.config import settings
+from app.routers.prices import _send_loop
+from app.services.live_prices import ChannelOverflow, ClientChannel, PriceHub, price_hub
+from app.services.market_data import FakeMarketDataProvider, MarketDataClient
+from app.services.quotes import Quote, QuoteCache, quote_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_quote_cache():
+    """New subscriptions are seeded from the shared quote cache; start without one."""
+    quote_cache.clear()
+    yield
+    quote_cache.clear()
+
+
+def _quote(symbol, price, seconds=0):
+    return Quote(symbol, Decimal(str(price)), None, None, datetime(2026, 1, 1) + timedelta(seconds=seconds))
+
+
+def _prices(messages):
+    return {item["symbol"]: item["price"] for m in messages if m["type"] == "prices" for item in m["data"]}
+
+
+@pytest.mark.asyncio
+async def test_publish_fans_out_through_subscriber_index():
+    """Test that quotes reach only the subscribers of their token."""
+    hub = PriceHub()
+    btc_only, both = ClientChannel(), ClientChannel()
+    hub.subscribe(btc_only, ["BTC"])
+    hub.subscribe(both, ["BTC", "ETH"])
+    assert (hub.subscribers("BTC"), hub.subscribers("ETH")) == (2, 1)
+
+    assert hub.publish([_quote("BTC", 100), _quote("ETH", 10), _quote("SOL", 1)]) == 2
+    assert _prices(await btc_only.next_messages()) == {"BTC": "100"}
+    assert _prices(await both.next_messages()) == {"BTC": "100", "ETH": "10"}
+
+    hub.disconnect(both)
+    assert hub.symbols() == ["BTC"]
+
+
+@pytest.mark.asyncio
+async def test_slow_client_is_conflated_not_waited_for():
+    """Test that a client that never reads keeps one quote per token while others get every update."""
+    hub = PriceHub()
+    slow, fast = ClientChannel(), ClientChannel()
+    hub.subscribe(slow, ["BTC"])
+    hub.subscribe(fast, ["BTC"])
+
+    received = []
+    for i in range(1, 501):
+        hub.publish([_quote("BTC", i, seconds=i)])
+        received.append(_prices(await fast.next_messages())["BTC"])
+
+    assert received == [str(i) for i in range(1, 501)]
+    assert slow.conflated == 499
+    messages = await slow.next_messages()
+    assert len(messages) == 1 and messages[0]["data"][0]["price"] == "500"
+
+
+@pytest.mark.asyncio
+async def test_control_messages_are_bounded():
+    """Test that unread acknowledgements beyond the limit overflow instead of growing."""
+    channel = ClientChannel(max_control=2)
+    channel.send_control({"type": "subscriptions", "symbols": []})
+    channel.send_control({"type": "subscriptions", "symbols": []})
+    with pytest.raises(ChannelOverflow):
+        channel.send_control({"type": "subscriptions", "symbols": []})
+
+
+@pytest.mark.asyncio
+async def test_refresh_fetches_union_of_subscriptions_once():
+    """Test that one upstream call serves every client and unchanged quotes are not resent."""
+    provider = FakeMarketDataProvider({"BTC": 100, "ETH": 10})
+    market_data = MarketDataClient(provider, QuoteCache(max_symbols=10), ttl=0, max_stale=0)
+    hub = PriceHub()
+    channels = [ClientChannel() for _ in range(20)]
+    for channel in channels:
+        hub.subscribe(channel, ["BTC", "ETH"])
+
+    assert await hub.refresh_once(market_data) == 2
+    assert provider.calls == [["BTC", "ETH"]]
+    received = [_prices(await channel.next_messages()) for channel in channels]
+    assert received == [{"BTC": "100", "ETH": "10"}] * 20
+
+    await asyncio.sleep(0.001)
+    provider.set_price("BTC", 101)
+    assert await hub.refresh_once(market_data) == 1
+    assert _prices(await channels[0].next_messages()) == {"BTC": "101"}
+
+
+@pytest.mark.asyncio
+async def test_refresh_reads_through_quote_cache():
+    """Test that refreshes within the quote TTL are served from the cache, not upstream."""
+    provider = FakeMarketDataProvider({"BTC": 100})
+    market_data = MarketDataClient(provider, QuoteCache(max_symbols=10), ttl=60)
+    hub = PriceHub()
+    hub.subscribe(ClientChannel(), ["BTC"])
+
+    assert [await hub.refresh_once(market_data) for _ in range(5)] == [1, 0, 0, 0, 0]
+    assert provider.calls == [["BTC"]]
+
+
+@pytest.mark.asyncio
+async def test_client_that_stops_reading_is_dropped(monkeypatch):
+    """Test that the sender gives up on a client whose socket does not drain."""
+    monkeypatch.setattr(settings, "LIVE_PRICES_SEND_TIMEOUT_SECONDS", 0.05)
+
+    class StuckSocket:
+        async def send_json(self, message):
+            await asyncio.sleep(3600)
+
+    channel = ClientChannel()
+    channel.offer(_quote("BTC", 1))
+    await asyncio.wait_for(_send_loop(StuckSocket(), channel), timeout=1)
+
+
+class _WebSocket:
+    """Minimal ASGI WebSocket client driving the app in this event loop."""
+
+    def __init__(self, path, headers):
+        self._to_app, self._from_app = asyncio.Queue(), asyncio.Queue()
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "path": path,
+            "raw_path": path.encode(), "root_path": "", "query_string": b"", "subprotocols": [],
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("test", 1), "server": ("test", 80),
+        }
+        self._task = asyncio.create_task(fastapi_app(scope, self._to_app.get, self._from_app.put))
+
+    async def connect(self):
+        await self._to_app.put({"type": "websocket.connect"})
+        return await self.receive()
+
+    async def receive(self):
+        return await asyncio.wait_for(self._from_app.get(), timeout=2)
+
+    async def send_json(self, data):
+        await self._to_app.put({"type": "websocket.receive", "text": json.dumps(data)})
+
+    async def receive_json(self):
+        return json.loads((await self.receive())["text"])
+
+    async def disconnect(self):
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(self._task, timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_live_prices_websocket(client: AsyncClient, auth_headers):
+    """Test subscribing, receiving and unsubscribing over the WebSocket."""
+    quote_cache.put(_quote("BTC", 100))
+    ws = _WebSocket("/api/v1/prices/live", auth_headers)
+    try:
+        assert (await ws.connect())["type"] == "websocket.accept"
+
+        await ws.send_json({"action": "subscribe", "symbols": ["BTC", "ETH"]})
+        first = [await ws.receive_json(), await ws.receive_json()]
+        assert first[0] == {"type": "subscriptions", "symbols": ["BTC", "ETH"]}
+        assert _prices(first[1:]) == {"BTC": "100"}  # latest known quote right away
+        assert price_hub.subscribers("ETH") == 1
+
+        price_hub.publish([_quote("ETH", 10, seconds=5)])
+        assert _prices([await ws.receive_json()]) == {"ETH": "10"}
+
+        await ws.send_json({"action": "resubscribe"})
+        assert (await ws.receive_json())["error"]["code"] == "LIVE_PRICES_INVALID_MESSAGE"
+
+        await ws.send_json({"action": "unsubscribe", "symbols": ["ETH"]})
+        assert await ws.receive_json() == {"type": "subscriptions", "symbols": ["BTC"]}
+    finally:
+        await ws.disconnect()
+
+    assert price_hub.symbols() == [] and price_hub.clients() == 0
+
+
+@pytest.mark.asyncio
+async def test_live_prices_requires_token(client: AsyncClient):
+    """Test that the handshake is refused without a valid access token."""
+    ws = _WebSocket("/api/v1/prices/live", {"Authorization": "Bearer not-a-token"})
+    message = await ws.connect()
+    assert message == {"type": "websocket.close", "code": 1008, "reason": ""}
+    await asyncio.wait_for(ws._task, timeout=2)
@@ -0,0 +1,144 @@
+"""Tests for adaptive concurrency limiting and load shedding."""
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient, ASGITransport
+from app.middleware import load_shedding
+from app.middleware.load_shedding import (
+    AdaptiveLimiter,
+    LoadSheddingMiddleware,
+    Priority,
+    classify,
+)
+
+
+def test_classify():
+    """Test that health checks, reads and refresh outrank expensive auth writes."""
+    assert classify("GET", "/healthz") is Priority.CRITICAL
+    assert classify("GET", "/api/v1/alerts") is Priority.HIGH
+    assert classify("POST", "/api/v1/auth/refresh") is Priority.HIGH
+    assert classify("POST", "/api/v1/alerts") is Priority.NORMAL
+    assert classify("POST", "/api/v1/auth/login") is Priority.LOW
+    assert classify("POST", "/api/v1/auth/register") is Priority.LOW
+
+
+def test_lower_priorities_get_a_smaller_share():
+    """Test that low priority requests are rejected before reads."""
+    limiter = AdaptiveLimiter(initial_limit=10, min_limit=1, max_limit=100)
+    admitted = [limiter.try_acquire(Priority.LOW) for _ in range(10)]
+    assert admitted.count(True) == 5
+
+    assert limiter.try_acquire(Priority.NORMAL)
+    assert limiter.try_acquire(Priority.NORMAL)
+    assert limiter.try_acquire(Priority.NORMAL)
+    assert not limiter.try_acquire(Priority.NORMAL)
+
+    assert limiter.try_acquire(Priority.HIGH)
+    assert limiter.try_acquire(Priority.HIGH)
+    assert not limiter.try_acquire(Priority.HIGH)
+    assert limiter.try_acquire(Priority.CRITICAL)
+    assert limiter.inflight == 10
+
+
+def test_limit_grows_at_steady_latency_and_shrinks_when_it_rises():
+    """Test the gradient: probe upwards while latency is flat, back off when it climbs."""
+    limiter = AdaptiveLimiter(initial_limit=10, min_limit=2, max_limit=100)
+
+    def run(latency: float, rounds: int) -> None:
+        for _ in range(rounds):
+            while limiter.try_acquire(Priority.HIGH):
+                pass
+            for _ in range(limiter.inflight):
+                limiter.release(latency)
+
+    run(0.01, 20)
+    grown = limiter.limit
+    assert grown > 10
+
+    run(0.2, 20)
+    assert limiter.limit < grown / 2
+    assert limiter.limit >= 2
+
+
+def test_failures_back_off_and_idle_does_not_grow():
+    """Test that 5xx cut the limit and an underused limit is left alone."""
+    limiter = AdaptiveLimiter(initial_limit=20, min_limit=2, max_limit=100)
+    limiter.try_acquire(Priority.HIGH)
+    limiter.release(0.01, failed=True)
+    assert limiter.limit == pytest.approx(18)
+
+    for _ in range(50):
+        limiter.try_acquire(Priority.HIGH)
+        limiter.release(0.01)
+    assert limiter.limit == pytest.approx(18)
+
+
+@pytest.mark.asyncio
+async def test_middleware_rejects_fast_with_retry_after():
+    """Test that excess requests get 503 + Retry-After and health checks still pass."""
+    gate = asyncio.Event()
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        await gate.wait()
+        return {"ok": True}
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    limiter = AdaptiveLimiter(initial_limit=2, min_limit=2, max_limit=2)
+    app.add_middleware(LoadSheddingMiddleware, limiter=limiter)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        pending = [asyncio.ensure_future(client.get("/slow")) for _ in range(2)]
+        while limiter.inflight < 2:
+            await asyncio.sleep(0)
+
+        rejected = await client.get("/slow")
+        assert rejected.status_code == 503
+        assert rejected.headers["Retry-After"] == "1"
+        assert rejected.json()["error"]["code"] == "SERVICE_OVERLOADED"
+
+        health = await client.get("/healthz")
+        assert health.status_code == 200
+
+        gate.set()
+        assert [r.status_code for r in await asyncio.gather(*pending)] == [200, 200]
+
+    assert limiter.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_streamed_response_does_not_shrink_the_limit(monkeypatch):
+    """Test that a streamed download frees its slot on the headers and leaves no latency sample."""
+    clock = [0.0]
+    monkeypatch.setattr(load_shedding.time, "perf_counter", lambda: clock[0])
+    app = FastAPI()
+    limiter = AdaptiveLimiter(initial_limit=2, min_limit=1, max_limit=100)
+    inflight_while_streaming = []
+
+    @app.get("/export")
+    async def export():
+        async def body():
+            yield b"first\n"
+            inflight_while_streaming.append(limiter.inflight)
+            clock[0] += 120.0  # a two-minute download
+            yield b"last\n"
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    app.add_middleware(LoadSheddingMiddleware, limiter=limiter)
+    limiter.try_acquire(Priority.HIGH)
+    limiter.release(0.01)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/export")
+
+    assert response.status_code == 200
+    assert inflight_while_streaming == [0]
+    assert limiter.short_latency == pytest.approx(0.01)
+    assert (limiter.limit, limiter.inflight) == (2, 0)
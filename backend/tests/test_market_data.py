@@ -0,0 +1,118 @@
+"""Tests for the market-data client layer."""
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from app.main import app
+from app.models.alert import Alert, AlertType, AlertCondition
+from app.services.evaluator import evaluate_market
+from app.services.market_data import FakeMarketDataProvider, MarketDataClient, get_market_data_client
+from app.services.quotes import Quote, QuoteCache
+
+
+def _client(provider, ttl=15, max_stale=60):
+    return MarketDataClient(provider, QuoteCache(max_symbols=100), ttl=ttl, max_stale=max_stale)
+
+
+def _cached(symbol, price, age_seconds):
+    return Quote(
+        symbol=symbol,
+        price=Decimal(price),
+        change_24h=None,
+        volume_24h=None,
+        as_of=datetime.utcnow() - timedelta(seconds=age_seconds)
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_upstream_call():
+    """Test that concurrent lookups of the same symbols are coalesced."""
+    provider = FakeMarketDataProvider({"BTC": 64000, "ETH": 3000}, latency=0.05)
+    client = _client(provider)
+
+    results = await asyncio.gather(*(client.get_quotes(["BTC", "ETH"]) for _ in range(10)))
+
+    assert provider.calls == [["BTC", "ETH"]]
+    assert all(result["BTC"].price == Decimal("64000") for result in results)
+
+    # Served from the cache afterwards
+    await client.get_quotes(["BTC"])
+    assert len(provider.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_quotes_are_served_and_revalidated():
+    """Test stale-while-revalidate between the TTL and the staleness bound."""
+    provider = FakeMarketDataProvider({"BTC": 65000, "ETH": 3100})
+    client = _client(provider)
+    client.cache.put(_cached("BTC", "64000", age_seconds=30))
+    client.cache.put(_cached("ETH", "3000", age_seconds=300))
+
+    result = await client.get_quotes(["BTC", "ETH"])
+
+    # BTC is stale but usable; ETH is too old and was fetched first
+    assert result["BTC"].price == Decimal("64000")
+    assert result["ETH"].price == Decimal("3100")
+
+    await client.close()
+    assert client.cache.get("BTC").price == Decimal("65000")
+    assert sorted(map(tuple, provider.calls)) == [("BTC",), ("ETH",)]
+
+
+@pytest.mark.asyncio
+async def test_upstream_failure_degrades_to_missing_quotes():
+    """Test that an upstream error leaves symbols out instead of raising."""
+    provider = FakeMarketDataProvider({"BTC": 64000}, fail_calls=1)
+    client = _client(provider)
+
+    assert await client.get_quotes(["BTC"]) == {}
+    assert (await client.get_quotes(["BTC"]))["BTC"].price == Decimal("64000")
+
+
+@pytest.mark.asyncio
+async def test_fetches_are_split_into_provider_batches():
+    """Test that large lookups respect the provider batch size."""
+    provider = FakeMarketDataProvider({f"T{i}": i + 1 for i in range(5)}, max_batch_size=2)
+    client = _client(provider)
+
+    result = await client.get_quotes([f"T{i}" for i in range(5)])
+
+    assert len(result) == 5
+    assert [len(call) for call in provider.calls] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_watchlist_fetches_missing_quotes(client: AsyncClient, auth_headers):
+    """Test that the watchlist fills cache misses from the provider in one call."""
+    provider = FakeMarketDataProvider({"BTC": 64000, "ETH": 3000})
+    app.dependency_overrides[get_market_data_client] = lambda: _client(provider)
+    try:
+        for symbol in ("BTC", "ETH", "NOPE"):
+            await client.post("/api/v1/watchlist", json={"token_symbol": symbol}, headers=auth_headers)
+
+        response = await client.get("/api/v1/watchlist?include_quotes=true", headers=auth_headers)
+    finally:
+        del app.dependency_overrides[get_market_data_client]
+
+    items = {item["token_symbol"]: item for item in response.json()["data"]}
+    assert Decimal(items["ETH"]["quote"]["price"]) == Decimal("3000")
+    assert items["NOPE"]["quote"] is None
+    assert len(provider.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_evaluate_market(db_session, test_user):
+    """Test that alerts are evaluated against freshly fetched quotes."""
+    db_session.add(Alert(
+        user_id=test_user.id,
+        token_symbol="BTC",
+        alert_type=AlertType.PRICE,
+        condition=AlertCondition.ABOVE,
+        threshold_value=Decimal("60000")
+    ))
+    await db_session.commit()
+
+    triggered = await evaluate_market(db_session, _client(FakeMarketDataProvider({"BTC": 64000})))
+
+    assert len(triggered) == 1
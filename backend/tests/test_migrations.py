@@ -0,0 +1,72 @@
+"""Tests for the Alembic migrations."""
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from app.cli.check_schema import alembic_config, compare_schema
+
+
+def _upgrade(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    config = alembic_config()
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+    return engine, config
+
+
+def _index_names(engine, table):
+    with engine.connect() as connection:
+        result = connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+            {"table": table}
+        )
+        return set(result.scalars())
+
+
+def test_migrations_match_models(tmp_path):
+    """Test that upgrading to head produces the schema the models describe."""
+    engine, _ = _upgrade(tmp_path)
+
+    with engine.connect() as connection:
+        missing, diffs = compare_schema(connection)
+
+    assert missing == []
+    assert diffs == []
+
+
+def test_hot_path_indexes(tmp_path):
+    """Test that the hot-path indexes replace the superseded ones and can be rolled back."""
+    engine, config = _upgrade(tmp_path)
+
+    assert {"ix_alerts_active_symbol_type", "ix_alerts_user_created_filters"} <= _index_names(engine, "alerts")
+    assert {"uq_watchlist_user_token", "ix_watchlist_user_created_symbol"} <= _index_names(engine, "watchlist")
+    assert "ix_alerts_user_id" not in _index_names(engine, "alerts")
+    assert "ix_alerts_user_created" not in _index_names(engine, "alerts")  # superseded in 0006
+
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.downgrade(config, "0005")
+    assert "ix_alerts_user_created" in _index_names(engine, "alerts")
+    assert "ix_watchlist_user_created" in _index_names(engine, "watchlist")
+
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.downgrade(config, "0001")
+    assert "ix_alerts_user_id" in _index_names(engine, "alerts")
+    assert "uq_watchlist_user_token" not in _index_names(engine, "watchlist")
+
+
+def test_watchlist_unique_index_treats_null_address_as_empty(tmp_path):
+    """Test that the functional unique index rejects duplicates without an address."""
+    engine, _ = _upgrade(tmp_path)
+    insert = text(
+        "INSERT INTO watchlist (id, user_id, token_symbol, token_address, created_at) "
+        "VALUES (:id, 'u1', 'BTC', NULL, '2026-01-01')"
+    )
+
+    with engine.begin() as connection:
+        connection.execute(insert, {"id": "a"})
+    with pytest.raises(IntegrityError):
+        with engine.begin() as connection:
+            connection.execute(insert, {"id": "b"})
@@ -0,0 +1,113 @@
+"""Tests for percent-move alerts and sliding-window extrema."""
+import random
+import pytest
+from decimal import Decimal
+from httpx import AsyncClient
+from app.models.alert import Alert, AlertType, AlertCondition
+from app.services import evaluator
+from app.services.evaluator import evaluate_alerts
+from app.services.windows import SlidingExtrema, WindowStore, percent_move
+
+
+@pytest.fixture
+def windows(monkeypatch):
+    store = WindowStore()
+    monkeypatch.setattr(evaluator, "metric_windows", store)
+    return store
+
+
+def test_sliding_extrema_matches_brute_force():
+    """Test the monotonic deques against min/max over the raw window."""
+    rng = random.Random(7)
+    window = SlidingExtrema(seconds=10)
+    history = []
+    at = 0.0
+    for _ in range(2000):
+        at += rng.uniform(0, 2)
+        value = Decimal(rng.randint(1, 100))
+        window.push(at, value)
+        history.append((at, value))
+        recent = [v for t, v in history if t >= at - 10]
+        assert window.minimum == min(recent)
+        assert window.maximum == max(recent)
+
+
+def test_windows_are_shared_and_pruned():
+    """Test that one window serves every alert with the same key and idle ones go."""
+    store = WindowStore()
+    store.require("BTC", AlertType.PRICE, 15, now=0)
+    store.require("BTC", AlertType.PRICE, 15, now=0)
+    store.require("BTC", AlertType.VOLUME, 60, now=0)
+    assert len(store) == 2
+
+    store.observe("BTC", {AlertType.PRICE: Decimal("100")}, now=1)
+    store.observe("BTC", {AlertType.PRICE: Decimal("94")}, now=2)
+    window = store.get("BTC", AlertType.PRICE, 15)
+    assert (window.minimum, window.maximum) == (Decimal("94"), Decimal("100"))
+    assert percent_move(Decimal("94"), window.minimum, window.maximum) == Decimal("6")
+    assert store.get("BTC", AlertType.VOLUME, 60).minimum is None
+
+    store.require("BTC", AlertType.VOLUME, 60, now=1900)
+    assert store.prune(now=1900) == 1
+    assert store.get("BTC", AlertType.PRICE, 15) is None
+    assert len(store) == 1
+
+
+@pytest.mark.asyncio
+async def test_moved_alert_triggers_on_window_move(db_session, test_user, windows):
+    """Test that a moved alert fires once the move within its window reaches the threshold."""
+    alerts = [
+        Alert(
+            user_id=test_user.id,
+            token_symbol="ETH",
+            alert_type=AlertType.PRICE,
+            condition=AlertCondition.MOVED,
+            threshold_value=Decimal(threshold),
+            window_minutes=15
+        )
+        for threshold in ("5", "8")
+    ]
+    db_session.add_all(alerts)
+    await db_session.commit()
+
+    assert await evaluate_alerts(db_session, {"ETH": {AlertType.PRICE: Decimal("2000")}}) == []
+    assert await evaluate_alerts(db_session, {"ETH": {AlertType.PRICE: Decimal("2080")}}) == []
+    assert len(windows) == 1
+
+    triggered = await evaluate_alerts(db_session, {"ETH": {AlertType.PRICE: Decimal("1940")}})
+    assert triggered == [alerts[0]]  # 2080 -> 1940 is a 6.7% fall, 2000 -> 2080 only 4%
+    assert alerts[1].is_active is True
+
+    triggered = await evaluate_alerts(db_session, {"ETH": {AlertType.PRICE: Decimal("2100")}})
+    assert triggered == [alerts[1]]  # 1940 -> 2100 is an 8.2% rise
+
+
+@pytest.mark.asyncio
+async def test_moved_alert_validation(client: AsyncClient, auth_headers):
+    """Test that moved alerts need a window and other conditions refuse one."""
+    base = {"token_symbol": "ETH", "alert_type": "price", "threshold_value": "5"}
+
+    response = await client.post("/api/v1/alerts", json={**base, "condition": "moved"}, headers=auth_headers)
+    assert response.status_code == 422
+    response = await client.post(
+        "/api/v1/alerts", json={**base, "condition": "above", "window_minutes": 5}, headers=auth_headers
+    )
+    assert response.status_code == 422
+
+    response = await client.post(
+        "/api/v1/alerts", json={**base, "condition": "moved", "window_minutes": 15}, headers=auth_headers
+    )
+    data = response.json()["data"]
+    assert data["window_minutes"] == 15
+
+    response = await client.put(
+        f"/api/v1/alerts/{data['id']}", json={"condition": "above"}, headers=auth_headers
+    )
+    assert response.json()["data"]["window_minutes"] is None
+
+    response = await client.put(
+        f"/api/v1/alerts/{data['id']}", json={"condition": "moved"}, headers=auth_headers
+    )
+    assert response.json()["error"]["code"] == "ALERT_INVALID_WINDOW"
+    response = await client.get(f"/api/v1/alerts/{data['id']}", headers=auth_headers)
+    assert response.json()["data"]["condition"] == "above"
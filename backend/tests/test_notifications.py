@@ -0,0 +1,128 @@
+"""Tests for the notification outbox and dispatcher."""
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import select
+from app.models.alert import Alert, AlertType, AlertCondition
+from app.models.notification import NotificationOutbox, OutboxStatus
+from app.services.evaluator import evaluate_alerts
+from app.services.notifications import NotificationDispatcher, FakePushProvider
+
+
+async def _create_alerts(db_session, user, count, threshold="100"):
+    alerts = [
+        Alert(
+            user_id=user.id,
+            token_symbol="BTC",
+            alert_type=AlertType.PRICE,
+            condition=AlertCondition.ABOVE,
+            threshold_value=Decimal(threshold) + i
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(alerts)
+    await db_session.commit()
+    return alerts
+
+
+async def _outbox(db_session):
+    db_session.expire_all()
+    result = await db_session.execute(select(NotificationOutbox))
+    return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_trigger_writes_outbox_in_same_transaction(db_session, test_user):
+    """Test that triggering an alert enqueues exactly one notification."""
+    await _create_alerts(db_session, test_user, 2)
+
+    triggered = await evaluate_alerts(db_session, {"BTC": {AlertType.PRICE: Decimal("100.5")}})
+
+    assert len(triggered) == 1
+    assert triggered[0].triggered_at is not None
+    assert triggered[0].is_active is False
+    alert_id = triggered[0].id
+    messages = await _outbox(db_session)
+    assert len(messages) == 1
+    assert messages[0].alert_id == alert_id
+    assert messages[0].status == OutboxStatus.PENDING
+    assert messages[0].payload["observed_value"] == "100.5"
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_batches_per_provider_call(db_session, test_user, session_factory):
+    """Test that messages are sent in provider-sized batches."""
+    await _create_alerts(db_session, test_user, 5)
+    await evaluate_alerts(db_session, {"BTC": {AlertType.PRICE: Decimal("1000")}})
+
+    provider = FakePushProvider(max_batch_size=2)
+    dispatcher = NotificationDispatcher(provider, session_factory, batch_size=10)
+    assert await dispatcher.run_once() == 5
+
+    assert provider.batches == [2, 2, 1]
+    assert len(provider.sent) == 5
+    messages = await _outbox(db_session)
+    assert all(m.status == OutboxStatus.SENT for m in messages)
+    assert all(m.sent_at is not None for m in messages)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_retries_with_backoff(db_session, test_user, session_factory):
+    """Test that a failed send is rescheduled and later delivered."""
+    await _create_alerts(db_session, test_user, 1)
+    await evaluate_alerts(db_session, {"BTC": {AlertType.PRICE: Decimal("1000")}})
+
+    provider = FakePushProvider(fail_calls=1)
+    dispatcher = NotificationDispatcher(provider, session_factory, retry_base_seconds=30)
+    await dispatcher.run_once()
+
+    [message] = await _outbox(db_session)
+    assert message.status == OutboxStatus.PENDING
+    assert message.attempts == 1
+    assert message.next_attempt_at > datetime.utcnow() + timedelta(seconds=10)
+    assert await dispatcher.run_once() == 0  # not due yet
+
+    message.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    await db_session.commit()
+    await dispatcher.run_once()
+
+    [message] = await _outbox(db_session)
+    assert message.status == OutboxStatus.SENT
+    assert message.attempts == 2
+    assert dispatcher.stats.retried == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_gives_up_after_max_attempts(db_session, test_user, session_factory):
+    """Test that non-retryable failures are marked failed."""
+    await _create_alerts(db_session, test_user, 1)
+    await evaluate_alerts(db_session, {"BTC": {AlertType.PRICE: Decimal("1000")}})
+
+    provider = FakePushProvider(fail_calls=1, retryable=False)
+    dispatcher = NotificationDispatcher(provider, session_factory)
+    await dispatcher.run_once()
+
+    [message] = await _outbox(db_session)
+    assert message.status == OutboxStatus.FAILED
+    assert message.last_error == "fake failure"
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_dedupes_redelivered_messages(db_session, test_user, session_factory):
+    """Test that a message whose lease expired after delivery is not resent."""
+    await _create_alerts(db_session, test_user, 1)
+    await evaluate_alerts(db_session, {"BTC": {AlertType.PRICE: Decimal("1000")}})
+
+    provider = FakePushProvider()
+    dispatcher = NotificationDispatcher(provider, session_factory)
+    await dispatcher.run_once()
+
+    # Simulate a lost status update: the row is still leased from long ago
+    [message] = await _outbox(db_session)
+    message.status = OutboxStatus.IN_FLIGHT
+    message.claimed_at = datetime.utcnow() - timedelta(hours=1)
+    await db_session.commit()
+    await dispatcher.run_once()
+
+    assert len(provider.sent) == 1
+    assert dispatcher.stats.deduped == 1
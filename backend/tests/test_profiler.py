@@ -0,0 +1,86 @@
+"""Tests for the on-demand sampling profiler."""
+import asyncio
+import time
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from app.config import settings
+from app.middleware.profiling import ProfilingMiddleware
+from app.services.profiler import AWAIT_MARKER, SamplingProfiler, profiler
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.fixture
+def admin_key(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "test-admin-key")
+    yield "test-admin-key"
+    profiler.configure(sample_rate=0.0, routes=[])
+    profiler.reset()
+
+
+@pytest.mark.asyncio
+async def test_samples_running_and_awaiting_frames():
+    """Test that profiles show on-CPU frames and awaited calls per route."""
+    sampler = SamplingProfiler(interval=0.001)
+    sampler.configure(routes=["/work/{n}"])
+    app = FastAPI()
+
+    @app.get("/work/{n}")
+    async def work(n: int):
+        _busy(0.05)
+        await asyncio.sleep(0.05)
+        return {"n": n}
+
+    @app.get("/other")
+    async def other():
+        return {}
+
+    app.add_middleware(ProfilingMiddleware, profiler=sampler)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/work/1")
+        assert int(response.headers["X-Profile-Samples"]) > 0
+        assert "X-Profile-Samples" not in (await client.get("/other")).headers
+
+    assert list(sampler.report()) == ["GET /work/{n}"]
+    stacks = sampler.collapsed("GET /work/{n}").splitlines()
+    assert any(line.split(" ")[0].endswith("test_profiler:_busy") for line in stacks)
+    assert any(AWAIT_MARKER in line and "test_profiler:test_samples_running_and_awaiting_frames.<locals>.work" in line
+               for line in stacks)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+
+
+@pytest.mark.asyncio
+async def test_profile_single_request_with_admin_header(client: AsyncClient, admin_key):
+    """Test that X-Profile needs a valid admin key."""
+    response = await client.get("/api/v1/version", headers={"X-Profile": "1", "X-Admin-Key": "wrong"})
+    assert "X-Profile-Samples" not in response.headers
+
+    response = await client.get("/api/v1/version", headers={"X-Profile": "1", "X-Admin-Key": admin_key})
+    assert "X-Profile-Samples" in response.headers
+    assert profiler.report()["GET /api/v1/version"]["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_admin_toggle_profiles_route(client: AsyncClient, admin_key):
+    """Test enabling a route from the admin API and fetching its stacks."""
+    headers = {"X-Admin-Key": admin_key}
+    response = await client.put("/api/v1/admin/profiler", json={"routes": ["/api/v1/version"]}, headers=headers)
+    assert response.json()["data"]["routes"] == ["/api/v1/version"]
+
+    await client.get("/api/v1/version")
+    await client.get("/")
+
+    state = (await client.get("/api/v1/admin/profiler", headers=headers)).json()["data"]
+    assert list(state["profiles"]) == ["GET /api/v1/version"]
+
+    collapsed = await client.get("/api/v1/admin/profiler/collapsed", headers=headers)
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    assert all(line.startswith("GET /api/v1/version;") for line in collapsed.text.splitlines())
+
+    await client.delete("/api/v1/admin/profiler", headers=headers)
+    assert profiler.report() == {}
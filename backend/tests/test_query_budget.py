@@ -0,0 +1,85 @@
+"""Tests for SQL statement counting and endpoint budgets."""
+import pytest
+from fastapi import FastAPI, Depends
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select, text
+from app.database import get_db
+from app.middleware.query_budget import QueryCountMiddleware
+from app.models.alert import AlertType, AlertCondition
+from app.models.user import User
+from app.utils import query_counter
+from app.utils.query_counter import count_statements, statement_budget
+
+
+async def _create_alert(client: AsyncClient, auth_headers) -> str:
+    response = await client.post(
+        "/api/v1/alerts",
+        json={
+            "token_symbol": "BTC",
+            "alert_type": AlertType.PRICE.value,
+            "condition": AlertCondition.ABOVE.value,
+            "threshold_value": "50000"
+        },
+        headers=auth_headers
+    )
+    return response.json()["data"]["id"]
+
+
+@pytest.mark.asyncio
+async def test_count_statements(db_session, test_user):
+    """Test that statements inside the scope are counted and captured."""
+    with count_statements(capture=True) as counter:
+        await db_session.execute(select(User))
+        await db_session.execute(text("SELECT 1"))
+    await db_session.execute(text("SELECT 2"))
+
+    assert counter.count == 2
+    assert counter.statements[1] == "SELECT 1"
+
+
+@pytest.mark.asyncio
+async def test_statement_header_reported(client: AsyncClient, auth_headers):
+    """Test that responses report the number of statements executed."""
+    await _create_alert(client, auth_headers)
+    response = await client.get("/api/v1/alerts", headers=auth_headers)
+    assert response.headers["X-SQL-Statements"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_toggle_is_a_single_update(client: AsyncClient, auth_headers):
+    """Test that toggling issues one UPDATE plus the counter update."""
+    alert_id = await _create_alert(client, auth_headers)
+    response = await client.patch(
+        f"/api/v1/alerts/{alert_id}/toggle",
+        json={"is_active": False},
+        headers=auth_headers
+    )
+    assert response.json()["data"]["is_active"] is False
+    assert response.headers["X-SQL-Statements"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_budget_violation_is_recorded(db_session):
+    """Test that exceeding a declared budget records a violation."""
+    app = FastAPI()
+    app.add_middleware(QueryCountMiddleware)
+
+    @app.get("/chatty")
+    @statement_budget(1)
+    async def chatty(db=Depends(get_db)):
+        await db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 2"))
+        return {}
+
+    async def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        await ac.get("/chatty")
+
+    [violation] = query_counter.violations
+    query_counter.violations.clear()
+    assert violation.endpoint == "chatty"
+    assert violation.count == 2
+    assert violation.budget == 1
@@ -0,0 +1,96 @@
+"""Tests for the quote cache and price-enriched watchlist."""
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from app.models.alert import AlertType
+from app.services.evaluator import evaluate_alerts
+from app.services.quotes import Quote, QuoteCache, quote_cache
+
+
+def _quote(symbol, price="1", age_seconds=0):
+    return Quote(
+        symbol=symbol,
+        price=Decimal(price),
+        change_24h=Decimal("2.5"),
+        volume_24h=Decimal("1000"),
+        as_of=datetime.utcnow() - timedelta(seconds=age_seconds)
+    )
+
+
+def test_get_many_skips_stale_quotes():
+    """Test that quotes older than the staleness bound are not returned."""
+    cache = QuoteCache(max_symbols=10)
+    cache.put_many([_quote("BTC"), _quote("ETH", age_seconds=120)])
+
+    found = cache.get_many(["BTC", "ETH", "SOL"], max_age_seconds=60)
+    assert set(found) == {"BTC"}
+
+
+def test_cache_is_bounded_and_keeps_newest():
+    """Test that the cache evicts least recently used symbols and ignores older quotes."""
+    cache = QuoteCache(max_symbols=2)
+    cache.put(_quote("A"))
+    cache.put(_quote("B"))
+    cache.get("A")
+    cache.put(_quote("C"))
+    assert cache.get("B") is None
+    assert len(cache) == 2
+
+    cache.put(_quote("A", price="5", age_seconds=30))
+    assert cache.get("A").price == Decimal("1")
+
+
+@pytest.mark.asyncio
+async def test_watchlist_embeds_quotes(client: AsyncClient, auth_headers):
+    """Test that the watchlist can embed cached quotes in one request."""
+    quote_cache.clear()
+    for symbol in ("BTC", "ETH"):
+        await client.post("/api/v1/watchlist", json={"token_symbol": symbol}, headers=auth_headers)
+    quote_cache.put(_quote("BTC", price="64000"))
+
+    response = await client.get("/api/v1/watchlist?include_quotes=true", headers=auth_headers)
+    items = {item["token_symbol"]: item for item in response.json()["data"]}
+    assert Decimal(items["BTC"]["quote"]["price"]) == Decimal("64000")
+    assert Decimal(items["BTC"]["quote"]["change_24h"]) == Decimal("2.5")
+    assert items["ETH"]["quote"] is None
+    assert response.headers["X-SQL-Statements"] == "3"
+
+    response = await client.get("/api/v1/watchlist", headers=auth_headers)
+    assert all("quote" not in item for item in response.json()["data"])
+
+
+@pytest.mark.asyncio
+async def test_evaluator_refreshes_quote_cache(db_session):
+    """Test that prices observed by the evaluator land in the quote cache."""
+    quote_cache.clear()
+    await evaluate_alerts(db_session, {"DOGE": {AlertType.PRICE: Decimal("0.12"), AlertType.VOLUME: Decimal("5")}},
+                          record_quotes=True)
+
+    quote = quote_cache.get("DOGE")
+    assert quote.price == Decimal("0.12")
+    assert quote.volume_24h == Decimal("5")
+
+
+@pytest.mark.asyncio
+async def test_evaluator_keeps_cached_24h_values(db_session):
+    """Test that an observed price does not wipe the 24h change and volume of a provider quote."""
+    quote_cache.clear()
+    quote_cache.put(_quote("BTC", price="64000", age_seconds=5))
+    await evaluate_alerts(db_session, {"BTC": {AlertType.PRICE: Decimal("64100")}}, record_quotes=True)
+
+    quote = quote_cache.get("BTC")
+    assert quote.price == Decimal("64100")
+    assert (quote.change_24h, quote.volume_24h) == (Decimal("2.5"), Decimal("1000"))
+
+
+@pytest.mark.asyncio
+async def test_evaluator_does_not_refresh_old_24h_values(db_session):
+    """Test that an old cached 24h change is not restamped as fresh by an observed price."""
+    quote_cache.clear()
+    old = _quote("BTC", price="64000", age_seconds=3600)
+    quote_cache.put(old)
+    await evaluate_alerts(db_session, {"BTC": {AlertType.PRICE: Decimal("64100")}}, record_quotes=True)
+
+    assert quote_cache.get("BTC").as_of == old.as_of
+    assert quote_cache.get_many(["BTC"]) == {}
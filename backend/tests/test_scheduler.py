@@ -0,0 +1,124 @@
+"""Tests for the background job scheduler."""
+import asyncio
+import pytest
+from datetime import datetime
+from sqlalchemy.pool import NullPool
+from app.services.scheduler import (
+    CronTrigger, FileLeaderLock, IntervalTrigger, Job, LeaderLock, PostgresAdvisoryLock, Scheduler
+)
+
+
+class _Follower(LeaderLock):
+    async def is_leader(self) -> bool:
+        return False
+
+
+def _job(func, **kwargs):
+    return Job(name="test", func=func, trigger=IntervalTrigger(kwargs.pop("every", 60)), **kwargs)
+
+
+def test_cron_trigger():
+    """Test next fire times of cron expressions."""
+    assert CronTrigger("*/15 * * * *").next_after(datetime(2026, 1, 1, 10, 7)) == datetime(2026, 1, 1, 10, 15)
+    assert CronTrigger("15 3 * * *").next_after(datetime(2026, 1, 1, 3, 15)) == datetime(2026, 1, 2, 3, 15)
+    assert CronTrigger("0 0 1 1 *").next_after(datetime(2026, 3, 1)) == datetime(2027, 1, 1)
+    # 2026-01-04 is a Sunday; day-of-month and day-of-week match either way
+    assert CronTrigger("0 12 * * 0").next_after(datetime(2026, 1, 1)) == datetime(2026, 1, 4, 12, 0)
+    assert CronTrigger("0 0 10 * 0").next_after(datetime(2026, 1, 1)) == datetime(2026, 1, 4)
+
+    with pytest.raises(ValueError):
+        CronTrigger("61 * * * *")
+    with pytest.raises(ValueError):
+        CronTrigger("* * *")
+
+
+@pytest.mark.asyncio
+async def test_interval_job_runs_until_stopped():
+    """Test that interval jobs run repeatedly and stop cleanly."""
+    calls = []
+
+    async def tick():
+        calls.append(1)
+
+    job = _job(tick, every=0.02)
+    scheduler = Scheduler(jobs=[job])
+    await scheduler.start()
+    await asyncio.sleep(0.15)
+    await scheduler.stop()
+
+    count = len(calls)
+    assert count >= 2
+    assert job.runs == count
+    await asyncio.sleep(0.05)
+    assert len(calls) == count
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_skips_overlapping_runs():
+    """Test that a job never runs more often in parallel than allowed."""
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+
+    job = _job(slow, max_concurrency=1)
+    scheduler = Scheduler(jobs=[job])
+
+    first = await scheduler.trigger(job)
+    assert await scheduler.trigger(job) is None
+    assert job.skipped == 1
+
+    release.set()
+    await first
+    assert job.running == 0 and job.runs == 1
+
+
+@pytest.mark.asyncio
+async def test_singleton_jobs_only_run_on_leader():
+    """Test that followers skip singleton jobs but run per-worker jobs."""
+    calls = []
+
+    async def work():
+        calls.append(1)
+
+    singleton = _job(work)
+    per_worker = _job(work, singleton=False)
+    scheduler = Scheduler(jobs=[singleton, per_worker], leader=_Follower())
+
+    assert await scheduler.trigger(singleton) is None
+    await (await scheduler.trigger(per_worker))
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_failures_are_recorded():
+    """Test that a failing job is counted and does not break the scheduler."""
+    async def broken():
+        raise RuntimeError("boom")
+
+    job = _job(broken)
+    await (await Scheduler(jobs=[job]).trigger(job))
+
+    assert job.failures == 1
+    assert "boom" in job.status()["last_error"]
+
+
+@pytest.mark.asyncio
+async def test_file_leader_lock(tmp_path):
+    """Test that only one holder of the lock file leads at a time."""
+    path = str(tmp_path / "scheduler.lock")
+    first, second = FileLeaderLock(path), FileLeaderLock(path)
+
+    assert await first.is_leader()
+    assert not await second.is_leader()
+
+    await first.release()
+    assert await second.is_leader()
+    await second.release()
+
+
+def test_advisory_lock_uses_its_own_autocommit_engine():
+    """Test that the advisory lock connection is unpooled and never left idle in transaction."""
+    lock = PostgresAdvisoryLock()
+    assert isinstance(lock.engine.sync_engine.pool, NullPool)
+    assert lock.engine.get_execution_options()["isolation_level"] == "AUTOCOMMIT"
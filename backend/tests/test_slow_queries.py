@@ -0,0 +1,69 @@
+"""Tests for statement fingerprinting and the slow-query log."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from app.config import settings
+from app.utils.slow_queries import BACKGROUND_ROUTE, SlowQueryLog, fingerprint, slow_query_log
+
+
+@pytest.fixture
+def fresh_log():
+    slow_query_log.reset()
+    yield slow_query_log
+    slow_query_log.reset()
+
+
+def test_fingerprint_strips_literals_and_parameters():
+    """Test that statements differing only in values share a fingerprint."""
+    assert fingerprint(
+        "SELECT * FROM alerts WHERE user_id = $1 AND token_symbol = 'BTC' LIMIT 20"
+    ) == "SELECT * FROM alerts WHERE user_id = ? AND token_symbol = ? LIMIT ?"
+    assert fingerprint("SELECT id FROM t2 WHERE id IN (?, ?, ?)") == fingerprint(
+        "SELECT id FROM t2 WHERE id IN (:id_1)"
+    ) == "SELECT id FROM t2 WHERE id IN (...)"
+    assert fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)") == "INSERT INTO t (a, b) VALUES (?, ?)"
+    assert fingerprint("SELECT x::uuid FROM t WHERE y = 'it''s'") == "SELECT x::uuid FROM t WHERE y = ?"
+
+
+def test_aggregates_and_bounds_fingerprints(monkeypatch):
+    """Test count/total/slow aggregation and folding past the fingerprint limit."""
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 50.0)
+    log = SlowQueryLog(max_fingerprints=2)
+    log.record("SELECT 1 FROM a WHERE id = 1", 0.01, "GET /a")
+    log.record("SELECT 1 FROM a WHERE id = 2", 0.09, "GET /a")
+    log.record("SELECT 1 FROM b", 0.02, "GET /b")
+    log.record("SELECT 1 FROM c", 0.03, "GET /b")
+
+    rows = {(row["fingerprint"], row["route"]): row for row in log.top(10)}
+    row = rows[("SELECT ? FROM a WHERE id = ?", "GET /a")]
+    assert row["count"] == 2
+    assert row["slow_count"] == 1
+    assert row["total_seconds"] == pytest.approx(0.1)
+    assert row["slowest"]["statement"] == "SELECT 1 FROM a WHERE id = 2"
+    assert ("[other]", "GET /b") in rows
+    assert log.top(1)[0]["route"] == "GET /a"
+
+
+@pytest.mark.asyncio
+async def test_statements_attributed_to_routes_with_plans(
+    client: AsyncClient, auth_headers, db_session, fresh_log, monkeypatch
+):
+    """Test that request statements are keyed by route template and the slowest is explained."""
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.0)
+    monkeypatch.setattr(settings, "SLOW_QUERY_CAPTURE_PLANS", True)
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "test-admin-key")
+
+    await client.get("/api/v1/alerts", headers=auth_headers)
+    await db_session.execute(text("SELECT count(*) FROM alerts"))
+
+    response = await client.get(
+        "/api/v1/admin/slow-queries",
+        params={"order_by": "count", "limit": 50},
+        headers={"X-Admin-Key": "test-admin-key"}
+    )
+    rows = response.json()["data"]
+    listing = [row for row in rows if row["route"] == "GET /api/v1/alerts" and "FROM alerts" in row["fingerprint"]]
+    assert listing
+    assert all(row["slowest"]["plan"] for row in listing)
+    assert any("users" in row["fingerprint"] for row in rows if row["route"] == "GET /api/v1/alerts")
+    assert any(row["route"] == BACKGROUND_ROUTE and "count(*)" in row["fingerprint"] for row in rows)
@@ -0,0 +1,64 @@
+"""Tests for cold-start behaviour: lazy imports, warmup and profiling."""
+import subprocess
+import sys
+import pytest
+from httpx import AsyncClient
+from app.cli.profile_startup import parse_importtime, summarize_imports
+from app.services.warmup import run_warmup
+
+IMPORTTIME_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     jose.constants
+import time:       300 |        420 |   jose
+import time:      1000 |       1420 | app.services.auth
+"""
+
+
+def test_auth_service_imports_crypto_lazily():
+    """Test that importing the auth service does not import passlib or jose."""
+    code = (
+        "import sys, app.services.auth as auth\n"
+        "assert 'passlib' not in sys.modules and 'jose' not in sys.modules\n"
+        "auth.decode_token(auth.create_access_token({'sub': 'x'}))\n"
+        "assert 'jose' in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_parse_importtime():
+    """Test parsing of `python -X importtime` output."""
+    records = parse_importtime(IMPORTTIME_SAMPLE)
+    assert [r.module for r in records] == ["jose.constants", "jose", "app.services.auth"]
+    assert [r.depth for r in records] == [2, 1, 0]
+
+    summary = summarize_imports(records, top=2)
+    assert summary["by_package"] == {"app": 0.001, "jose": 0.0004}
+    assert summary["slowest_modules"][0]["module"] == "app.services.auth"
+
+
+@pytest.mark.asyncio
+async def test_run_warmup_reports_failures_without_raising():
+    """Test that a failing warmup step is reported and later steps still run."""
+    calls = []
+
+    async def ok_step(app):
+        calls.append("ok")
+
+    async def broken_step(app):
+        raise RuntimeError("pool unavailable")
+
+    report = await run_warmup(None, steps=[("broken", broken_step), ("ok", ok_step)])
+
+    assert calls == ["ok"]
+    assert report["broken"]["ok"] is False
+    assert "pool unavailable" in report["broken"]["error"]
+    assert report["ok"]["ok"] is True
+    assert report["ok"]["seconds"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_readyz_before_startup(client: AsyncClient):
+    """Test that readiness fails until the lifespan warmup has run."""
+    response = await client.get("/readyz")
+    assert response.status_code == 503
@@ -0,0 +1,137 @@
+"""Tests for refresh token rotation and revocation."""
+import pytest
+from datetime import datetime, timedelta
+from uuid import UUID
+from httpx import AsyncClient
+from sqlalchemy import func, select, update
+from app.models.refresh_token import RefreshTokenRecord
+from app.services.auth import decode_token
+from app.services import tokens as token_service
+from app.services.tokens import RevocationList, purge_expired_tokens, revoked_families, sync_revoked_families
+
+
+async def _login(client):
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "TestPassword123!"}
+    )
+    return response.json()["data"]
+
+
+async def _refresh(client, refresh_token):
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _bearer(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_tokens(client: AsyncClient, test_user):
+    """Test that a refresh token yields a new, working token pair."""
+    tokens = await _login(client)
+
+    body = await _refresh(client, tokens["refresh_token"])
+    assert body["success"] is True
+    new_tokens = body["data"]
+    assert new_tokens["refresh_token"] != tokens["refresh_token"]
+
+    response = await client.get("/api/v1/auth/me", headers=_bearer(new_tokens))
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_reuse_revokes_family(client: AsyncClient, test_user):
+    """Test that replaying a used refresh token revokes the whole login."""
+    tokens = await _login(client)
+    rotated = (await _refresh(client, tokens["refresh_token"]))["data"]
+
+    body = await _refresh(client, tokens["refresh_token"])
+    assert body["success"] is False
+    assert body["error"]["code"] == "AUTH_INVALID_REFRESH_TOKEN"
+
+    # The legitimate successor is revoked too, as are its access tokens
+    assert (await _refresh(client, rotated["refresh_token"]))["success"] is False
+    response = await client.get("/api/v1/auth/me", headers=_bearer(rotated))
+    assert response.status_code == 401
+
+    # Other logins are unaffected
+    other = await _login(client)
+    response = await client.get("/api/v1/auth/me", headers=_bearer(other))
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_refresh_rejects_access_token(client: AsyncClient, test_user):
+    """Test that an access token cannot be used as a refresh token."""
+    tokens = await _login(client)
+
+    body = await _refresh(client, tokens["access_token"])
+    assert body["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_login(client: AsyncClient, test_user):
+    """Test that logging out invalidates the refresh and access tokens."""
+    tokens = await _login(client)
+
+    response = await client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.json()["data"]["logged_out"] is True
+
+    assert (await _refresh(client, tokens["refresh_token"]))["success"] is False
+    response = await client.get("/api/v1/auth/me", headers=_bearer(tokens))
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_revocations_reach_other_workers(client: AsyncClient, db_session, test_user, monkeypatch):
+    """Test that a worker picks up logins revoked elsewhere on its next sync."""
+    first, second = await _login(client), await _login(client)
+    monkeypatch.setattr(token_service, "_revocations_synced_at", None)
+    await sync_revoked_families(db_session)  # startup load
+
+    # Another worker logs out the first login
+    family_id = UUID(decode_token(first["refresh_token"])["fam"])
+    await db_session.execute(
+        update(RefreshTokenRecord)
+        .where(RefreshTokenRecord.family_id == family_id)
+        .values(revoked_at=datetime.utcnow())
+    )
+    await db_session.commit()
+    assert (await client.get("/api/v1/auth/me", headers=_bearer(first))).status_code == 200
+
+    assert await sync_revoked_families(db_session) == 1
+    statuses = [(await client.get("/api/v1/auth/me", headers=_bearer(t))).status_code for t in (first, second)]
+    assert statuses == [401, 200]
+    revoked_families.clear()
+
+
+@pytest.mark.asyncio
+async def test_purge_expired_tokens(client: AsyncClient, db_session, test_user, session_factory):
+    """Test that only refresh tokens past their expiry are deleted."""
+    await _login(client)
+    await _login(client)
+    await db_session.execute(update(RefreshTokenRecord).where(
+        RefreshTokenRecord.id == select(RefreshTokenRecord.id).limit(1).scalar_subquery()
+    ).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    await db_session.commit()
+
+    assert await purge_expired_tokens(session_factory, batch_size=1) == 1
+    assert (await db_session.execute(select(func.count()).select_from(RefreshTokenRecord))).scalar() == 1
+
+
+def test_revocation_list_forgets_expired_entries():
+    """Test that revocations are dropped once the tokens have expired."""
+    revocations = RevocationList()
+    revocations.revoke("a", expires_at=100.0)
+    revocations.revoke("b", expires_at=200.0)
+    revocations.revoke("a", expires_at=300.0)
+
+    assert revocations.is_revoked("a", now=150.0)
+    assert revocations.is_revoked("b", now=150.0)
+    assert not revocations.is_revoked("b", now=250.0)
+    assert revocations.is_revoked("a", now=250.0)
+    assert not revocations.is_revoked("a", now=300.0)
+    assert len(revocations) == 0
@@ -0,0 +1,93 @@
+"""Tests for global token popularity and the trending lists."""
+import random
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete
+from app.models.alert import Alert
+from app.services.popularity import TopKCounter, TokenPopularity, popularity, reconcile_popularity
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    fresh = TokenPopularity(size=5)
+    monkeypatch.setattr(popularity, "watched", fresh.watched)
+    monkeypatch.setattr(popularity, "alerted", fresh.alerted)
+    monkeypatch.setattr(popularity, "reconciled_at", None)
+    return popularity
+
+
+def test_top_k_matches_full_sort():
+    """Test that the cached top list stays equal to a full sort under random changes."""
+    rng = random.Random(11)
+    counter = TopKCounter(size=5)
+    expected = {}
+    for _ in range(3000):
+        symbol = f"T{rng.randint(0, 30)}"
+        delta = 1 if rng.random() < 0.6 or not expected.get(symbol) else -1
+        counter.add(symbol, delta)
+        expected[symbol] = expected.get(symbol, 0) + delta
+        ranked = sorted(
+            ((s, c) for s, c in expected.items() if c > 0), key=lambda item: (-item[1], item[0])
+        )
+        k = rng.randint(1, 5)
+        assert counter.top(k) == ranked[:k]
+
+
+def test_replace_replays_changes_made_while_loading():
+    """Test that reconciliation keeps local writes made during the load and reports drift."""
+    counter = TopKCounter(size=3)
+    counter.add("BTC", 4)
+    counter.add("ETH", 2)
+
+    counter.begin_reconcile()
+    counter.add("SOL")  # committed after the counts were read
+    drift = counter.replace([("BTC", 5), ("ETH", 2)])
+
+    assert counter.top(3) == [("BTC", 5), ("ETH", 2), ("SOL", 1)]
+    assert drift == 1
+
+
+@pytest.mark.asyncio
+async def test_trending_follows_writes(client: AsyncClient, auth_headers, counters):
+    """Test that creates, symbol changes and deletes move the trending lists."""
+    for symbol in ("ETH", "SOL"):
+        await client.post("/api/v1/watchlist", json={"token_symbol": symbol}, headers=auth_headers)
+    alert_ids = []
+    for symbol in ("BTC", "BTC", "ETH"):
+        response = await client.post(
+            "/api/v1/alerts",
+            json={"token_symbol": symbol, "alert_type": "price", "condition": "above", "threshold_value": "1"},
+            headers=auth_headers
+        )
+        alert_ids.append(response.json()["data"]["id"])
+
+    response = await client.get("/api/v1/tokens/trending", headers=auth_headers)
+    data = response.json()["data"]
+    assert data["most_watched"] == [{"token_symbol": "ETH", "count": 1}, {"token_symbol": "SOL", "count": 1}]
+    assert data["most_alerted"] == [{"token_symbol": "BTC", "count": 2}, {"token_symbol": "ETH", "count": 1}]
+
+    await client.put(f"/api/v1/alerts/{alert_ids[0]}", json={"token_symbol": "ETH"}, headers=auth_headers)
+    await client.delete(f"/api/v1/alerts/{alert_ids[1]}", headers=auth_headers)
+
+    response = await client.get("/api/v1/tokens/trending?limit=1", headers=auth_headers)
+    assert response.json()["data"]["most_alerted"] == [{"token_symbol": "ETH", "count": 2}]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_corrects_drift(db_session, client: AsyncClient, auth_headers, counters):
+    """Test that reconciliation picks up writes the counters did not see."""
+    await client.post("/api/v1/watchlist", json={"token_symbol": "ETH"}, headers=auth_headers)
+    for _ in range(2):
+        await client.post(
+            "/api/v1/alerts",
+            json={"token_symbol": "BTC", "alert_type": "price", "condition": "above", "threshold_value": "1"},
+            headers=auth_headers
+        )
+    # Another worker deletes the alerts
+    await db_session.execute(delete(Alert))
+    await db_session.commit()
+
+    assert await reconcile_popularity(db_session) == 2
+    assert counters.alerted.top(5) == []
+    assert counters.watched.top(5) == [("ETH", 1)]
+    assert counters.reconciled_at is not None
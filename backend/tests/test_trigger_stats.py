@@ -0,0 +1,112 @@
+"""Tests for the trigger statistics job."""
+import asyncio
+import gzip
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.cli import trigger_stats
+from app.database import Base
+from app.models.alert import Alert, AlertType, AlertCondition
+from app.models.alert_archive import ArchivedAlert
+from app.models.user import User
+from app.services.trigger_stats import QuantileSketch, TriggerStats, key_ranges
+
+
+def test_quantile_sketch_accuracy_and_merge():
+    """Test that quantiles stay within the relative accuracy and merging is exact."""
+    rng = random.Random(7)
+    values = [rng.lognormvariate(8, 2) for _ in range(20000)]
+    whole, left, right = QuantileSketch(0.01), QuantileSketch(0.01), QuantileSketch(0.01)
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    assert left.bins == whole.bins and left.count == whole.count == 20000
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(whole.quantile(q) - exact) <= 0.01 * exact * 1.001
+
+
+def test_key_ranges_cover_the_key_space():
+    """Test that key ranges are contiguous and cover every UUID."""
+    ranges = key_ranges(8)
+    assert ranges[0][0] == uuid.UUID(int=0)
+    assert ranges[-1][1] is None
+    assert all(high == next_low for (_, high), (next_low, _) in zip(ranges, ranges[1:]))
+
+
+async def _seed(database_url: str, now: datetime) -> None:
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        user_id = uuid.uuid4()
+        await conn.execute(insert(User), [{
+            "id": user_id, "email": "stats@example.com", "password_hash": "x", "created_at": now, "updated_at": now
+        }])
+        rows = [
+            {
+                "id": uuid.uuid4(), "user_id": user_id, "token_symbol": "BTC" if i % 3 else "ETH",
+                "alert_type": AlertType.PRICE if i % 2 else AlertType.VOLUME, "condition": AlertCondition.ABOVE,
+                "threshold_value": Decimal(100 + i % 4), "is_active": True,
+                "triggered_at": now + timedelta(seconds=60 * (i + 1)) if i % 4 == 0 else None,
+                "created_at": now, "updated_at": now,
+            }
+            for i in range(40)
+        ]
+        await conn.execute(insert(Alert), rows[:30])
+        await conn.execute(insert(ArchivedAlert), [{**row, "archived_at": now} for row in rows[30:]])
+    await engine.dispose()
+
+
+def test_trigger_stats_job(tmp_path):
+    """Test that pooled and inline runs over key ranges agree and the report is written."""
+    database_url = f"sqlite+aiosqlite:///{tmp_path / 'stats.db'}"
+    asyncio.run(_seed(database_url, datetime(2026, 1, 1)))
+
+    inline = trigger_stats.run(database_url, workers=0, chunks=4, partition_size=7)
+    pooled = trigger_stats.run(database_url, workers=2, chunks=4, partition_size=7)
+
+    assert inline.rows == pooled.rows == 40
+    assert inline.summary() == pooled.summary()
+    summary = inline.summary(min_alerts=1)
+    assert summary["by_token"]["BTC"]["alerts"] == 26
+    volume = summary["by_type"]["volume"]
+    assert (volume["alerts"], volume["triggered"], volume["trigger_rate"]) == (20, 10, 0.5)
+    assert summary["time_to_trigger_seconds"]["count"] == 10
+    assert summary["time_to_trigger_seconds"]["min"] == 60
+
+    output = tmp_path / "stats.json.gz"
+    assert trigger_stats.main(["--database-url", database_url, "--output", str(output), "--workers", "0"]) == 0
+    report = json.loads(gzip.decompress(output.read_bytes()))
+    assert report["rows"] == 40
+    clusters = {(c["token_symbol"], c["alert_type"]): c for c in report["threshold_clusters"]}
+    assert sum(band["alerts"] for band in clusters[("BTC", "price")]["clusters"]) == clusters[("BTC", "price")]["alerts"]
+
+
+def test_trigger_stats_merge_is_order_independent():
+    """Test that merging partials in any order gives the same statistics."""
+    now = datetime(2026, 1, 1)
+    rows = [
+        ("BTC", AlertType.PRICE, AlertCondition.BELOW, Decimal(i + 1), now, now + timedelta(minutes=i) if i % 2 else None)
+        for i in range(10)
+    ]
+    parts = []
+    for start in range(0, 10, 3):
+        part = TriggerStats()
+        part.add_rows(rows[start:start + 3])
+        parts.append(part)
+
+    forward, backward = TriggerStats(), TriggerStats()
+    for part in parts:
+        forward.merge(part)
+    for part in reversed(parts):
+        backward.merge(part)
+
+    assert forward.summary(min_alerts=1) == backward.summary(min_alerts=1)
+    assert forward.by_token["BTC"].triggered == 5
@@ -0,0 +1,82 @@
+"""Tests for compact response encodings."""
+import msgpack
+import pytest
+from httpx import AsyncClient
+from app.utils.wire_format import COLUMNAR_JSON, JSON, MSGPACK, negotiate, to_columnar
+
+
+async def _add_items(client, auth_headers, count):
+    for i in range(count):
+        await client.post("/api/v1/watchlist", json={"token_symbol": f"T{i}"}, headers=auth_headers)
+
+
+def test_negotiate():
+    """Test that only explicitly requested compact types are selected."""
+    assert negotiate(None) == JSON
+    assert negotiate("*/*") == JSON
+    assert negotiate("application/json") == JSON
+    assert negotiate("application/x-msgpack") == MSGPACK
+    assert negotiate(f"{COLUMNAR_JSON}, {MSGPACK};q=0.5") == COLUMNAR_JSON
+    assert negotiate(f"{MSGPACK};q=0, application/json") == JSON
+
+
+def test_to_columnar_fills_missing_fields():
+    """Test that rows with different fields produce equal-length columns."""
+    result = to_columnar([{"a": 1, "b": 2}, {"a": 3}])
+    assert result == {"count": 2, "columns": {"a": [1, 3], "b": [2, None]}}
+
+
+@pytest.mark.asyncio
+async def test_default_stays_json(client: AsyncClient, auth_headers):
+    """Test that clients without a compact Accept type get the usual envelope."""
+    await _add_items(client, auth_headers, 2)
+
+    response = await client.get("/api/v1/watchlist", headers=auth_headers)
+    assert response.headers["content-type"] == "application/json"
+    assert "Accept" in response.headers["vary"]
+    assert len(response.json()["data"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_msgpack_columnar_list(client: AsyncClient, auth_headers):
+    """Test that list endpoints send one array per field in msgpack."""
+    await _add_items(client, auth_headers, 3)
+
+    headers = {**auth_headers, "Accept": MSGPACK}
+    response = await client.get("/api/v1/watchlist", headers=headers)
+    assert response.headers["content-type"] == MSGPACK
+
+    body = msgpack.unpackb(response.content)
+    assert body["success"] is True
+    assert body["layout"] == "columnar"
+    assert body["data"]["count"] == 3
+    assert sorted(body["data"]["columns"]["token_symbol"]) == ["T0", "T1", "T2"]
+    assert body["pagination"]["total"] == 3
+
+    plain = await client.get("/api/v1/watchlist", headers=auth_headers)
+    assert len(response.content) < len(plain.content)
+
+
+@pytest.mark.asyncio
+async def test_msgpack_single_object(client: AsyncClient, auth_headers):
+    """Test that non-list payloads keep their shape in msgpack."""
+    headers = {**auth_headers, "Accept": MSGPACK}
+    response = await client.get("/api/v1/auth/me", headers=headers)
+
+    body = msgpack.unpackb(response.content)
+    assert "layout" not in body
+    assert body["data"]["email"] == "test@example.com"
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_compressed(client: AsyncClient, auth_headers):
+    """Test that bodies above the threshold are gzipped on request."""
+    await _add_items(client, auth_headers, 20)
+
+    headers = {**auth_headers, "Accept": COLUMNAR_JSON, "Accept-Encoding": "gzip"}
+    response = await client.get("/api/v1/watchlist?per_page=20", headers=headers)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["data"]["count"] == 20
+
+    small = await client.get("/api/v1/auth/me", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers